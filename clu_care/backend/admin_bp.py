@@ -1,83 +1,167 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from pymongo import MongoClient
+from flask import Blueprint, request, jsonify
 from bson import ObjectId
 import datetime
-import bcrypt
+import os
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.utils.assignment import DoctorAvailability, claim_doctor, release_doctor
+from app.utils.bed_index import BedIndex, bed_key, load_ward_layout
+from app.utils.broadcast import Broadcaster
+from app.utils.identity import patient_email, register_identity, remove_identity, restore_identity, update_identity
+from app.utils.logs import get_logger
+from app.utils.mongo import mongo
+from app.utils.passwords import HashingBusy, password_hasher
+from app.utils.patients import (
+    IMPORT_BATCH_SIZE, IMPORT_MAX_BATCH_SIZE, READERS, duplicate_key_message, import_patients, new_patient,
+    patient_ids, save_upload
+)
+from app.utils.queries import (
+    DASHBOARD_FACETS, SECRET_PROJECTION, STAFF_LIST_PROJECTION, attach_doctor_names, dashboard_stats,
+    doctor_names_query, facet_pipeline, facet_values, field_projection, includes_doctor, patient_page_query
+)
+from app.utils.response_cache import collection_versions, response_cache
+from app.utils.snapshot import Snapshot
+from app.utils.streaming import STREAM_BATCH_SIZE, chunked, ndjson_response, wants_stream
+from app.utils.triage import (
+    CASE_STATUSES, SEVERITY, TriageQueue, case_ids, next_case, peek_next_case, severity_rank
+)
 # from bson import ObjectId
 
-# Initialize Flask
-app = Flask(__name__)
-CORS(app)  # Allow React frontend to connect
+# Hospital API (/api/*, /staff/*); registered at the root of the app in app.py
+admin_bp = Blueprint("hospital", __name__)
+log = get_logger(__name__)
 
-# MongoDB Connection
-client = MongoClient("mongodb://localhost:27017/")
-db = client["hospital_db"]
+# MongoDB Connection (shared pooled client, created on first use in each worker)
+db = mongo.lazy_database()
 staff_collection = db["staff"]
 departments_collection = db["departments"]
 patients_collection = db["patients"]
 emergency_collection = db["emergency_cases"]
-# Helper functions
-def serialize_doc(doc):
-    doc["_id"] = str(doc["_id"])
-    return doc
+inventory_collection = db["inventory"]
+
+# In-memory (ward, bed) occupancy, kept current by the patient write endpoints
+bed_index = BedIndex(load_ward_layout())
+# Live bed board: one producer (the index's write hooks and periodic rebuild) fans out to every screen
+bed_events = Broadcaster(
+    refresh=lambda: bed_index.load(patients_collection, staff_collection),
+    refresh_interval=bed_index.max_age or 60
+)
+bed_index.add_listener(lambda bed: bed_events.publish("bed", bed))
+# Active doctors and caseloads per department, kept current by claims and releases
+doctor_availability = DoctorAvailability()
+# Open emergency cases by severity and arrival, kept current by the emergency endpoints
+triage_queue = TriageQueue()
 
 # ================== STAFF ENDPOINTS ==================
 
-# Get all staff
-@app.route("/api/staff", methods=["GET"])
+# Get all staff (NDJSON stream with ?stream=1 or Accept: application/x-ndjson;
+# ?fields= narrows the list columns)
+@admin_bp.route("/api/staff", methods=["GET"])
+@response_cache.cached("staff")
 def get_staff():
-    staff = list(staff_collection.find({}, {"_id": 1, "name": 1, "role": 1, "department": 1, "email": 1, "phone": 1, "status": 1, "staffId": 1}))
-    staff = [serialize_doc(s) for s in staff]
+    try:
+        projection = field_projection(request.args.get("fields"), STAFF_LIST_PROJECTION, STAFF_LIST_PROJECTION)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if wants_stream(request):
+        cursor = staff_collection.find({}, projection).batch_size(STREAM_BATCH_SIZE)
+        return ndjson_response(cursor)
+
+    staff = list(staff_collection.find({}, projection))
     return jsonify(staff)
 
 # Get staff by ID
-@app.route("/staff/<id>", methods=["GET"])
+@admin_bp.route("/staff/<id>", methods=["GET"])
 def get_staff_by_id(id):
-    staff = staff_collection.find_one({"_id": ObjectId(id)})
+    if not ObjectId.is_valid(id):
+        return jsonify({"error": "Invalid staff id"}), 400
+    staff = staff_collection.find_one({"_id": ObjectId(id)}, SECRET_PROJECTION)
     if not staff:
         return jsonify({"error": "Staff not found"}), 404
-    return jsonify(serialize_doc(staff))
+    return jsonify(staff)
 
 # Add new staff
-@app.route("/api/staff", methods=["POST"])
+@admin_bp.route("/api/staff", methods=["POST"])
 def add_staff():
     data = request.json
     if not data or "name" not in data or "role" not in data:
         return jsonify({"error": "Missing required fields"}), 400
+    data["_id"] = ObjectId()
+    if data["role"] == "doctor":
+        data.setdefault("caseload", 0)
+    if data.get("email") and not register_identity(db, data["email"], "staff", data["_id"], data["role"]):
+        return jsonify({"error": "Email already registered"}), 409
     staff_collection.insert_one(data)
+    collection_versions.bump("staff")
+    doctor_availability.invalidate()
+    dashboard_snapshot.invalidate()
     return jsonify({"message": "Staff added successfully"}), 201
 
 # Update staff
-@app.route("/staff/<id>", methods=["PUT"])
+@admin_bp.route("/staff/<id>", methods=["PUT"])
 def update_staff(id):
-    data = request.json
-    update_data = {k: v for k, v in data.items() if v is not None}
+    if not ObjectId.is_valid(id):
+        return jsonify({"error": "Invalid staff id"}), 400
+    staff_id = ObjectId(id)
+    data = request.json or {}
+    update_data = {k: v for k, v in data.items() if v is not None and k != "_id"}
+    if not update_data:
+        return jsonify({"error": "Nothing to update"}), 400
+    current = staff_collection.find_one({"_id": staff_id}, {"email": 1, "role": 1})
+    if not current:
+        return jsonify({"error": "Staff not found"}), 404
     if "password" in update_data:
-        update_data["password"] = bcrypt.hashpw(update_data["password"].encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-    result = staff_collection.update_one({"_id": ObjectId(id)}, {"$set": update_data})
+        try:
+            update_data["password"] = password_hasher.hash(update_data["password"])
+        except HashingBusy:
+            return jsonify({"error": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
+    # Claim the new email first (the unique index decides), and put the old identity
+    # back if the staff document can't be updated after all
+    try:
+        update_identity(db, "staff", staff_id, update_data.get("email"), update_data.get("role"))
+    except DuplicateKeyError:
+        return jsonify({"error": "Email already registered"}), 409
+    try:
+        result = staff_collection.update_one({"_id": staff_id}, {"$set": update_data})
+    except Exception:
+        restore_identity(db, "staff", current)
+        raise
+    if result.matched_count == 0:
+        restore_identity(db, "staff", current)
+        return jsonify({"error": "Staff not found"}), 404
     if result.modified_count == 0:
         return jsonify({"error": "Staff not updated"}), 404
-    updated_staff = staff_collection.find_one({"_id": ObjectId(id)})
-    return jsonify(serialize_doc(updated_staff))
+    collection_versions.bump("staff")
+    doctor_availability.invalidate()
+    dashboard_snapshot.invalidate()
+    updated_staff = staff_collection.find_one({"_id": staff_id}, SECRET_PROJECTION)
+    return jsonify(updated_staff)
 
 # Delete staff
-@app.route("/staff/<id>", methods=["DELETE"])
+@admin_bp.route("/staff/<id>", methods=["DELETE"])
 def delete_staff(id):
+    if not ObjectId.is_valid(id):
+        return jsonify({"error": "Invalid staff id"}), 400
     result = staff_collection.delete_one({"_id": ObjectId(id)})
     if result.deleted_count == 0:
         return jsonify({"error": "Staff not found"}), 404
+    remove_identity(db, ObjectId(id))
+    collection_versions.bump("staff")
+    doctor_availability.invalidate()
+    dashboard_snapshot.invalidate()
     return jsonify({"message": "Staff deleted successfully"})
 
 # Get departments
-@app.route("/api/departments", methods=["GET"])
+@admin_bp.route("/api/departments", methods=["GET"])
+@response_cache.cached("departments")
 def get_departments():
     departments = list(departments_collection.find({}, {"_id": 1, "name": 1}))
-    departments = [serialize_doc(d) for d in departments]
     return jsonify(departments)
 
 # # Get available doctors by specialty
-# @app.route("/staff/available", methods=["GET"])
+# @admin_bp.route("/staff/available", methods=["GET"])
 # def get_available_doctors():
 #     specialty = request.args.get("specialty")
 #     docs = list(staff_collection.find({"role": "doctor", "department": specialty, "status": "active"}))
@@ -88,182 +172,369 @@ def get_departments():
 
 
 # ================== PATIENT ENDPOINTS ==================
-def serialize_doc(doc):
-    if "_id" in doc:
-        doc["_id"] = str(doc["_id"])
-    if "assignedDoctor" in doc and doc["assignedDoctor"] is not None:
-        doc["assignedDoctor"] = str(doc["assignedDoctor"])
-    return doc
-
 
-# Get all patients
-@app.route("/api/patients", methods=["GET"])
+# Get patients (keyset pagination on _id)
+# Query params: limit (default 100, max 500), after (last _id of the previous page).
+# The id to pass as `after` for the next page is returned in the X-Next-Cursor header.
+# With ?stream=1 or Accept: application/x-ndjson the whole table (from `after`) is streamed instead.
+# ?fields=name,status,contact.phone returns only those fields (plus _id); assignedDoctorName is
+# added whenever assignedDoctor is returned. Passwords are never returned.
+@admin_bp.route("/api/patients", methods=["GET"])
 def get_patients():
-    patients = list(patients_collection.find())
-    for patient in patients:
-        # assigned doctor name
-        if patient.get("assignedDoctor"):
-            doctor = staff_collection.find_one({"_id": ObjectId(patient["assignedDoctor"])})
-            patient["assignedDoctorName"] = doctor["name"] if doctor else None
-        else:
-            patient["assignedDoctorName"] = None
-        
-        serialize_doc(patient)  # convert ObjectIds to string
-
-    return jsonify(patients)
+    try:
+        query, limit = patient_page_query(request.args)
+        projection = field_projection(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if wants_stream(request):
+        return ndjson_response(stream_patients(query, projection, request.args.get("limit", type=int)))
+
+    patients = list(patients_collection.find(query, projection).sort("_id", 1).limit(limit))
+
+    # Resolve all assigned doctor names with a single $in query
+    if includes_doctor(projection):
+        doctor_query = doctor_names_query(patients)
+        doctors = staff_collection.find(doctor_query, {"name": 1}) if doctor_query else []
+        attach_doctor_names(patients, doctors)
+
+    response = jsonify(patients)
+    response.vary.add("Accept")
+    if len(patients) == limit:
+        response.headers["X-Next-Cursor"] = str(patients[-1]["_id"])
+    return response
+
+
+def stream_patients(query, projection=SECRET_PROJECTION, limit=None):
+    """Yield serialized patients batch by batch, resolving doctor names once per batch."""
+    cursor = patients_collection.find(query, projection).sort("_id", 1).batch_size(STREAM_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    if not includes_doctor(projection):
+        yield from cursor
+        return
+    for batch in chunked(cursor, STREAM_BATCH_SIZE):
+        doctor_query = doctor_names_query(batch)
+        doctors = staff_collection.find(doctor_query, {"name": 1}) if doctor_query else []
+        yield from attach_doctor_names(batch, doctors)
 
 
 # Add new patient
-@app.route("/api/patients", methods=["POST"])
+@admin_bp.route("/api/patients", methods=["POST"])
 def add_patient():
     data = request.json
-    patient_type = data.get("type", "OPD")
-    status = "admitted" if patient_type == "IPD" else "registered"
-    admission_date = datetime.datetime.now() if patient_type == "IPD" else None
-
-    patient_doc = {
-        "patientId": f"P-{str(ObjectId())[:8]}",
-        "name": data.get("name"),
-        "age": data.get("age"),
-        "gender": data.get("gender"),
-        "bloodGroup": data.get("bloodGroup"),
-        "type": patient_type,
-        "medicalSpecialty": data.get("medicalSpecialty"),
-        "description": data.get("description"),
-        "password": data.get("password"),
-        "contact": data.get("contact", {}),
-        "insurance": data.get("insurance", {}),
-        "status": status,
-        "admissionDate": admission_date,
-        "assignedDoctor": ObjectId(data["assignedDoctor"]) if data.get("assignedDoctor") else None,
-        "wardNumber": data.get("wardNumber"),      # Added field
-        "cartNumber": data.get("cartNumber")       # Added field
-    }
-
-    patients_collection.insert_one(patient_doc)
-
-    # Update doctor status if IPD
-    if data.get("assignedDoctor") and patient_type == "IPD":
-        staff_collection.update_one(
-            {"_id": ObjectId(data["assignedDoctor"])},
-            {"$set": {"status": "unavailable"}}
-        )
+    try:
+        password = password_hasher.hash(data["password"]) if data.get("password") else None
+    except HashingBusy:
+        return jsonify({"error": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+    patient_doc = new_patient(data, password)
+    patient_type = patient_doc["type"]
+
+    bed_index.ensure_loaded(patients_collection, staff_collection)
+    if bed_key(patient_doc["wardNumber"], patient_doc["cartNumber"]) and \
+            bed_index.is_occupied(patient_doc["wardNumber"], patient_doc["cartNumber"]):
+        return jsonify({"error": "Bed is already occupied"}), 409
+
+    email = patient_email(patient_doc)
+    if email and not register_identity(db, email, "patients", patient_doc["_id"], "patient"):
+        return jsonify({"error": "Email already registered"}), 409
+
+    # Inpatients take a slot on a doctor's caseload in one atomic update: the
+    # requested doctor if they still have room, else the least-loaded doctor
+    # in the patient's specialty
+    doctor = None
+    if patient_type == "IPD" and (patient_doc["assignedDoctor"] or patient_doc["medicalSpecialty"]):
+        doctor = claim_doctor(staff_collection, patient_doc["medicalSpecialty"], patient_doc["assignedDoctor"])
+        if doctor is None and patient_doc["assignedDoctor"]:
+            if email:
+                remove_identity(db, patient_doc["_id"])
+            return jsonify({"error": "Doctor is no longer available"}), 409
+        doctor_availability.record(doctor)
+        patient_doc["assignedDoctor"] = doctor["_id"] if doctor else None
+
+    # The unique bed index settles races the in-memory check can't see (other workers).
+    # Allocated ids never repeat, but one kept by a concurrent import can already be taken.
+    # If the patient is not written, the email and the caseload slot are given back.
+    try:
+        for attempt in range(3):
+            try:
+                patients_collection.insert_one(patient_doc)
+                break
+            except DuplicateKeyError as e:
+                if duplicate_key_message(e.details) == "Bed is already occupied":
+                    release_patient_claims(patient_doc, doctor, email)
+                    return jsonify({"error": "Bed is already occupied"}), 409
+                if attempt == 2:
+                    raise
+                patient_doc["patientId"] = patient_ids.next()
+    except Exception:
+        release_patient_claims(patient_doc, doctor, email)
+        raise
+
+    # Keep the bed board current
+    if bed_key(patient_doc["wardNumber"], patient_doc["cartNumber"]):
+        doctor_name = doctor["name"] if doctor else None
+        if doctor is None and patient_doc["assignedDoctor"]:
+            doctor = staff_collection.find_one({"_id": patient_doc["assignedDoctor"]}, {"name": 1})
+            doctor_name = doctor["name"] if doctor else None
+        bed_index.admit(patient_doc["wardNumber"], patient_doc["cartNumber"], patient_doc, doctor_name)
+    dashboard_snapshot.invalidate()
 
     return jsonify({
         "message": "Patient added successfully", 
-        "patientId": patient_doc["patientId"]
+        "patientId": patient_doc["patientId"],
+        "assignedDoctor": patient_doc["assignedDoctor"]
     }), 201
 
-# Get available doctors by specialty
-@app.route("/staff/available", methods=["GET"])
+def release_patient_claims(patient_doc, doctor, email):
+    """Undo what add_patient claimed before a failed insert: the doctor's caseload slot and the email."""
+    if doctor:
+        doctor_availability.record(release_doctor(staff_collection, doctor["_id"]))
+    if email:
+        remove_identity(db, patient_doc["_id"])
+
+# Bulk import from CSV or NDJSON, sent as multipart field "file" or as the raw body.
+# The format comes from ?format=, the file extension or the Content-Type. Rows get the same
+# defaults as POST /api/patients and are written in batches of ?batchSize= (default 1000);
+# the response lists the rows that were rejected and why.
+@admin_bp.route("/api/patients/import", methods=["POST"])
+def import_patients_file():
+    upload = request.files.get("file")
+    source = upload.stream if upload else request.stream
+    extension = os.path.splitext(upload.filename or "")[1].lstrip(".") if upload else ""
+    mimetype = request.mimetype or ""
+    fmt = (request.args.get("format") or extension or
+           ("ndjson" if "ndjson" in mimetype or "jsonl" in mimetype else "csv" if "csv" in mimetype else "")).lower()
+    fmt = {"jsonl": "ndjson"}.get(fmt, fmt)
+    if fmt not in READERS:
+        return jsonify({"error": "Send a .csv or .ndjson file, or set ?format=csv|ndjson"}), 400
+    batch_size = request.args.get("batchSize", IMPORT_BATCH_SIZE, type=int)
+    batch_size = max(1, min(batch_size, IMPORT_MAX_BATCH_SIZE))
+
+    path = save_upload(source, fmt)
+    try:
+        bed_index.ensure_loaded(patients_collection, staff_collection)
+        report = import_patients(db, READERS[fmt](path), batch_size, bed_taken=bed_index.is_occupied)
+    finally:
+        os.remove(path)
+
+    if report.inserted:
+        # One rebuild picks up the new admissions (and pushes their bed deltas)
+        bed_index.load(patients_collection, staff_collection)
+        doctor_availability.invalidate()
+        dashboard_snapshot.invalidate()
+    return jsonify({"file": os.path.basename(path), **report.to_dict()})
+
+# Discharge patient and free their bed
+@admin_bp.route("/api/patients/<id>/discharge", methods=["PUT"])
+def discharge_patient(id):
+    if not ObjectId.is_valid(id):
+        return jsonify({"error": "Invalid patient id"}), 400
+    patient = patients_collection.find_one_and_update(
+        {"_id": ObjectId(id), "status": {"$ne": "discharged"}},
+        {"$set": {"status": "discharged", "dischargeDate": datetime.datetime.now()}},
+        projection={"wardNumber": 1, "cartNumber": 1, "status": 1, "assignedDoctor": 1}
+    )
+    if not patient:
+        return jsonify({"error": "Patient not found or already discharged"}), 404
+
+    bed_index.discharge(patient.get("wardNumber"), patient.get("cartNumber"))
+    if patient.get("status") == "admitted" and patient.get("assignedDoctor"):
+        doctor_availability.record(release_doctor(staff_collection, patient["assignedDoctor"]))
+    dashboard_snapshot.invalidate()
+    return jsonify({"message": "Patient discharged successfully"})
+
+# Doctors in a specialty with room for another inpatient, least loaded first
+@admin_bp.route("/staff/available", methods=["GET"])
 def get_available_doctors():
     specialty = request.args.get("specialty")
-    docs = list(staff_collection.find({"role": "doctor", "department": specialty, "status": "active"}))
-    docs = [serialize_doc(d) for d in docs]
-    return jsonify(docs)
+    doctor_availability.ensure_loaded(staff_collection)
+    return jsonify(doctor_availability.available(specialty))
 
 # ================== WARD & BED MANAGEMENT ==================
-@app.route("/api/beds", methods=["GET"])
+@admin_bp.route("/api/beds", methods=["GET"])
 def get_beds():
-    # Fetch all patients
-    patients = list(patients_collection.find())
-    patients_dict = {}
-
-    # Create a lookup using wardNumber and cartNumber
-    for p in patients:
-        ward = int(p.get("wardNumber", 0))
-        bed = int(p.get("cartNumber", 0))
-        if ward > 0 and bed > 0:
-            # Resolve doctor name if assigned
-            doctor_name = None
-            if p.get("assignedDoctor"):
-                doctor = staff_collection.find_one({"_id": ObjectId(p["assignedDoctor"])})
-                doctor_name = doctor["name"] if doctor else None
-            p["doctorName"] = doctor_name
-            # Also serialize admissionDate to string
-            if p.get("admissionDate"):
-                p["admissionDate"] = str(p["admissionDate"])
-            patients_dict[(ward, bed)] = p
-
-    # Generate 5 wards with 10 beds each
-    wards = []
-    for ward_num in range(1, 6):
-        beds = []
-        for bed_num in range(1, 11):
-            patient = patients_dict.get((ward_num, bed_num))
-            bed = {
-                "bedNumber": bed_num,
-                "status": "Admitted" if patient else "Available",
-                "admissionDate": patient.get("admissionDate") if patient else None,
-                "patient": {
-                    "name": patient.get("name"),
-                    "age": patient.get("age"),
-                    "gender": patient.get("gender"),
-                    "diagnosis": patient.get("medicalSpecialty"),
-                    "doctor": patient.get("doctorName")  # <-- use doctor name
-                } if patient else None
-            }
-            beds.append(bed)
-        ward = {
-            "_id": f"ward{ward_num}",
-            "name": f"Ward {ward_num}",
-            "specialty": f"Ward{ward_num}",
-            "beds": beds
-        }
-        wards.append(ward)
-
-    return jsonify(wards)
+    bed_index.ensure_loaded(patients_collection, staff_collection)
+    return jsonify(bed_index.wards())
+
+# Server-Sent Events: a "snapshot" event with the full board, then a "bed" event per changed bed
+@admin_bp.route("/api/beds/stream", methods=["GET"])
+def stream_beds():
+    bed_index.ensure_loaded(patients_collection, staff_collection)
+    return bed_events.stream(lambda: ("snapshot", bed_index.wards()))
+
+# Wards with free-bed counts
+@admin_bp.route("/api/wards", methods=["GET"])
+def get_wards():
+    bed_index.ensure_loaded(patients_collection, staff_collection)
+    return jsonify(bed_index.availability())
+
+# Available beds in one ward
+@admin_bp.route("/api/wards/<ward_id>/available-beds", methods=["GET"])
+def get_ward_available_beds(ward_id):
+    if not bed_index.has_ward(ward_id):
+        return jsonify({"error": "Ward not found"}), 404
+    bed_index.ensure_loaded(patients_collection, staff_collection)
+    return jsonify(bed_index.availability(ward_id)[0])
 
 # ================== DASHBOARD STATS ==================
-@app.route("/api/dashboard/stats", methods=["GET"])
+DASHBOARD_STATS_TTL = float(os.getenv("DASHBOARD_STATS_TTL", "5"))
+
+def compute_dashboard_stats():
+    # One $facet aggregation per collection
+    counts = {
+        name: facet_values(next(db[name].aggregate(facet_pipeline(facets)), None), facets)
+        for name, facets in DASHBOARD_FACETS.items()
+    }
+
+    # Beds come from the in-memory occupancy index
+    bed_index.ensure_loaded(patients_collection, staff_collection)
+    return dashboard_stats(counts, bed_index.total_beds, bed_index.occupied_beds)
+
+# Shared by all pollers; patient/staff writes call invalidate()
+dashboard_snapshot = Snapshot(compute_dashboard_stats, ttl=DASHBOARD_STATS_TTL)
+
+@admin_bp.route("/api/dashboard/stats", methods=["GET"])
 def get_dashboard_stats():
     try:
-        # Patients
-        total_patients = patients_collection.count_documents({})
-        admitted = patients_collection.count_documents({"status": "admitted"})
-        discharged = patients_collection.count_documents({"status": "discharged"})
-
-        # Staff
-        total_staff = staff_collection.count_documents({})
-        doctors = staff_collection.count_documents({"role": "doctor"})
-        nurses = staff_collection.count_documents({"role": "nurse"})
-
-        # Beds
-        total_beds = 5 * 10  # 5 wards * 10 beds
-        occupied_beds = patients_collection.count_documents({"wardNumber": {"$ne": None}})
-
-        # Inventory (replace with real inventory collection if you have one)
-        inventory_items = 100
-        low_stock = 10
-
-        # Alerts (example static, replace with real logic if needed)
-        alerts = 5
-        critical_alerts = 2
-
-        # Bed occupancy percentage
-        bed_occupancy = f"{int((occupied_beds / total_beds) * 100)}%"
-
-        return jsonify({
-            "patients": total_patients,
-            "admitted": admitted,
-            "discharged": discharged,
-            "staff": total_staff,
-            "doctors": doctors,
-            "nurses": nurses,
-            "bedOccupancy": bed_occupancy,
-            "totalBeds": total_beds,
-            "occupiedBeds": occupied_beds,
-            "inventoryItems": inventory_items,
-            "lowStock": low_stock,
-            "alerts": alerts,
-            "criticalAlerts": critical_alerts
-        })
+        stats, age = dashboard_snapshot.get()
+        return jsonify({**stats, "snapshotAge": round(age, 3)})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Hit/miss/304 counts and collection versions of the /api/staff and /api/departments cache
+@admin_bp.route("/api/cache/stats", methods=["GET"])
+def get_cache_stats():
+    return jsonify(response_cache.stats())
 
-# ================== WARD MANAGEMENT ENDPOINTS ==================
 
-if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+# ================== EMERGENCY TRIAGE ==================
+EMERGENCY_EDITABLE_FIELDS = ("patientName", "condition", "location", "priority", "description",
+                             "assignedDoctor", "criticalWard", "bedNumber", "status")
+
+def emergency_case_query(case_id):
+    """Cases are addressed by _id (what the frontend sends) or by caseId."""
+    return {"_id": ObjectId(case_id)} if ObjectId.is_valid(case_id) else {"caseId": case_id}
+
+# Open cases in triage order (most severe, then longest waiting), then cases being treated
+@admin_bp.route("/api/emergency", methods=["GET"])
+def get_emergency_cases():
+    triage_queue.ensure_loaded(emergency_collection)
+    return jsonify(triage_queue.cases())
+
+# Open a new case; it joins the queue behind earlier cases of the same severity
+@admin_bp.route("/api/emergency", methods=["POST"])
+def add_emergency_case():
+    data = request.json
+    if not data or not data.get("patientName"):
+        return jsonify({"error": "Missing required fields"}), 400
+    priority = data.get("priority") or "medium"
+    if priority not in SEVERITY:
+        return jsonify({"error": f"priority must be one of {', '.join(SEVERITY)}"}), 400
+
+    case_oid = ObjectId()
+    case = {
+        "_id": case_oid,
+        "caseId": case_ids.next(),
+        "patientName": data.get("patientName"),
+        "condition": data.get("condition"),
+        "location": data.get("location"),
+        "priority": priority,
+        "severityRank": severity_rank(priority),
+        "description": data.get("description"),
+        "assignedDoctor": ObjectId(data["assignedDoctor"]) if ObjectId.is_valid(data.get("assignedDoctor") or "") else None,
+        "criticalWard": data.get("criticalWard"),
+        "bedNumber": data.get("bedNumber"),
+        "status": "open",
+        "createdAt": datetime.datetime.now()
+    }
+    # Allocated ids never repeat; a clash means the id was written outside the allocator
+    for attempt in range(3):
+        try:
+            emergency_collection.insert_one(case)
+            break
+        except DuplicateKeyError:
+            if attempt == 2:
+                raise
+            case["caseId"] = case_ids.next()
+    triage_queue.ensure_loaded(emergency_collection)
+    triage_queue.push(case)
+    dashboard_snapshot.invalidate()
+    return jsonify({"message": "Emergency case created", "_id": case_oid, "caseId": case["caseId"]}), 201
+
+# Most urgent open case, without taking it. Read from the collection, not this
+# worker's queue, so a case opened on another worker is never skipped.
+@admin_bp.route("/api/emergency/next", methods=["GET"])
+def peek_emergency_case():
+    case = peek_next_case(emergency_collection)
+    if case is None:
+        return jsonify({"error": "No open emergency cases"}), 404
+    return jsonify(case)
+
+# Take the most urgent open case and mark it in_progress: one atomic
+# find_one_and_update sorted by severity rank, so every worker agrees on the order
+@admin_bp.route("/api/emergency/next", methods=["POST"])
+def dequeue_emergency_case():
+    case = next_case(emergency_collection)
+    if case is None:
+        return jsonify({"error": "No open emergency cases"}), 404
+    triage_queue.ensure_loaded(emergency_collection)
+    triage_queue.update(case)
+    dashboard_snapshot.invalidate()
+    return jsonify(case)
+
+# Reprioritize, edit, start or resolve a case
+@admin_bp.route("/api/emergency/<case_id>", methods=["PUT"])
+def update_emergency_case(case_id):
+    data = request.json or {}
+    update_data = {k: data[k] for k in EMERGENCY_EDITABLE_FIELDS if k in data}
+    if not update_data:
+        return jsonify({"error": "Nothing to update"}), 400
+    if "priority" in update_data:
+        if update_data["priority"] not in SEVERITY:
+            return jsonify({"error": f"priority must be one of {', '.join(SEVERITY)}"}), 400
+        update_data["severityRank"] = severity_rank(update_data["priority"])
+    if "status" in update_data:
+        if update_data["status"] not in CASE_STATUSES:
+            return jsonify({"error": f"status must be one of {', '.join(CASE_STATUSES)}"}), 400
+        if update_data["status"] == "resolved":
+            update_data["resolvedAt"] = datetime.datetime.now()
+    if "assignedDoctor" in update_data:
+        doctor = update_data["assignedDoctor"]
+        update_data["assignedDoctor"] = ObjectId(doctor) if ObjectId.is_valid(doctor or "") else None
+
+    case = emergency_collection.find_one_and_update(
+        emergency_case_query(case_id), {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if not case:
+        return jsonify({"error": "Emergency case not found"}), 404
+    triage_queue.ensure_loaded(emergency_collection)
+    triage_queue.update(case)
+    dashboard_snapshot.invalidate()
+    return jsonify(case)
+
+
+
+# ================== WARM-UP ==================
+
+def warm_up():
+    """Build this process's in-memory indexes so the first requests don't pay for them.
+
+    Run by each server worker before it accepts connections. Each step is
+    independent; one that fails is logged and left to load on first use.
+    """
+    steps = {
+        "beds": lambda: bed_index.load(patients_collection, staff_collection),
+        "doctors": lambda: doctor_availability.load(staff_collection),
+        "triage": lambda: triage_queue.load(emergency_collection),
+        "dashboard": dashboard_snapshot.get,
+    }
+    loaded = []
+    for name, step in steps.items():
+        try:
+            step()
+            loaded.append(name)
+        except Exception:
+            log.exception("Warm-up step failed", extra={"event": "app.warm_up_failed", "step": name})
+    return loaded
@@ -1,8 +1,7 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash
 import jwt
-import datetime
 import os
 from functools import wraps
 from bson.objectid import ObjectId
@@ -11,45 +10,55 @@ from datetime import datetime as dt
 # Initialize Flask app
 app = Flask(__name__)
 
-# Configure CORS properly
-CORS(app, 
-     origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:5173"],
-     supports_credentials=True,
-     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-     allow_headers=["Content-Type", "Authorization"])
+# Configure CORS properly (same policy as asgi.py)
+from app.utils.cors import flask_cors_options
+CORS(app, **flask_cors_options())
 
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-here')
 
-# Import and initialize database
+from app.utils.json_provider import init_json
+init_json(app)
+
+from app.utils.logs import get_logger, init_request_ids
+init_request_ids(app)
+log = get_logger('app')
+
+from app.utils.compression import init_compression
+init_compression(app)
+
+# Before any database use, so the command listener is on the client
+from app.utils.metrics import database_health, init_metrics, request_metrics
+init_metrics(app)
+
+from app.utils.auth import account_role, build_user_data, issue_token, login_response
+from app.utils.token_cache import token_cache
+from app.utils.passwords import HashingBusy, needs_rehash, password_hasher
+from app.utils.streaming import STREAM_BATCH_SIZE, ndjson_response, wants_stream
+
+# Database handle (lazy); connecting and seeding run on the readiness thread so
+# importing the app and serving /health never wait on MongoDB
 try:
-    from app.utils.db import initialize_db, get_db
+    from app.utils.db import get_db
+    from app.utils.identity import find_identity
+    from app.utils.readiness import readiness
     db = get_db().db
-    initialize_db()
-    print("✅ Database initialized successfully")
+    readiness.start()
 except ImportError as e:
-    print(f"❌ Database import error: {e}")
-    # Create mock database for fallback
-    class MockDB:
-        def __init__(self):
-            self.users = MockCollection()
-            self.patients = MockCollection()
-            self.staff = MockCollection()
-            self.departments = MockCollection()
-    class MockCollection:
-        def find_one(self, query=None):
-            # Mock admin user for testing
-            if query and 'email' in query and query['email'] == 'admin@clucare.com':
-                return {
-                    '_id': 'mock_admin_id',
-                    'email': 'admin@clucare.com',
-                    'password': generate_password_hash('admin123'),
-                    'role': 'admin',
-                    'name': 'System Administrator'
-                }
-            return None
-        def insert_one(self, doc):
-            return type('obj', (object,), {'inserted_id': 'mock_id'})()
-    db = MockDB()
+    log.error("Database import error: %s", e, extra={"event": "db.import_failed"})
+    # Fall back to the in-memory store with the default admin seeded
+    from app.utils.memory_store import MemoryDatabase
+    db = MemoryDatabase()
+    db.users.create_index('email', unique=True)
+    db.users.insert_one({
+        'email': 'admin@clucare.com',
+        'password': generate_password_hash('admin123'),
+        'role': 'admin',
+        'name': 'System Administrator'
+    })
+    def find_identity(db, email):
+        user = db.users.find_one({'email': email})
+        return ('users', user) if user else (None, None)
+    readiness = None
 
 # Token required decorator
 def token_required(f):
@@ -65,11 +74,17 @@ def token_required(f):
         if not token:
             return jsonify({'message': 'Token is missing!'}), 401
             
+        # Verified tokens are cached with their user until exp, skipping decode and lookup
+        current_user = token_cache.get(token)
+        if current_user is not None:
+            return f(current_user, *args, **kwargs)
+            
         try:
             data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
             current_user = db.users.find_one({'email': data['user']['email']})
             if not current_user:
                 return jsonify({'message': 'User not found!'}), 401
+            token_cache.put(token, current_user, data['exp'])
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token has expired!'}), 401
         except jwt.InvalidTokenError:
@@ -89,34 +104,56 @@ def test_connection():
         'timestamp': dt.now().isoformat()
     }), 200
 
-# Health check endpoint
+# Health check endpoint: 200 once the database is connected and seeded, 503 until then
+# (or while the background probe can't reach it). ?live=1 pings the database on the spot.
 @app.route('/health', methods=['GET'])
 def health_check():
+    if readiness is None:
+        state = {'ready': True, 'startedUp': True, 'database': database_health()}
+    else:
+        state = readiness.status()
+        if request.args.get('live', '').lower() in ('1', 'true', 'yes'):
+            state['database'] = database_health()
+            state['ready'] = state['startedUp'] and state['database']['status'] != 'unhealthy'
+    database = state.pop('database')
+    ready = state['ready']
+    if ready:
+        message = 'Server is running'
+    elif not state['startedUp']:
+        message = 'Starting up'
+    else:
+        message = 'Database unreachable'
     return jsonify({
-        'status': 'healthy', 
-        'message': 'Server is running',
-        'time': dt.now().isoformat()
-    }), 200
+        'status': database['status'] if database else 'starting',
+        'ready': ready,
+        'message': message,
+        'time': dt.now().isoformat(),
+        'startup': state,
+        'database': database,
+        'tokenCache': token_cache.stats(),
+        'routes': request_metrics.route_summary()
+    }), 200 if ready else 503
 
 @app.route('/debug/all-users', methods=['GET'])
 def debug_all_users():
     """Debug endpoint to list all users from all collections"""
     try:
+        # NDJSON stream (one document per line, tagged with its collection)
+        if wants_stream(request):
+            return ndjson_response(stream_all_users())
+
         users_list = list(db.users.find({}, {'password': 0}))
         staff_list = list(db.staff.find({}, {'password': 0}))
         patients_list = list(db.patients.find({}, {'password': 0}))
         
-        # Convert ObjectId to string
+        # ObjectIds are encoded by the JSON provider; just tag the source collection
         for user in users_list:
-            user['_id'] = str(user['_id'])
             user['collection'] = 'users'
         
         for staff in staff_list:
-            staff['_id'] = str(staff['_id'])
             staff['collection'] = 'staff'
         
         for patient in patients_list:
-            patient['_id'] = str(patient['_id'])
             patient['collection'] = 'patients'
         
         return jsonify({
@@ -127,6 +164,14 @@ def debug_all_users():
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+def stream_all_users():
+    for collection_name in ('users', 'staff', 'patients'):
+        cursor = getattr(db, collection_name).find({}, {'password': 0}).batch_size(STREAM_BATCH_SIZE)
+        for doc in cursor:
+            doc['collection'] = collection_name
+            yield doc
+
 # Login endpoint
 # Login endpoint
 # Login endpoint# Login endpoint
@@ -141,150 +186,76 @@ def login():
         if not auth_data or not auth_data.get('email') or not auth_data.get('password') or not auth_data.get('role'):
             return jsonify({'message': 'Email, password and role are required!'}), 400
         
-        print(f"🔐 Login attempt: {auth_data['email']} as {auth_data['role']}")
-        
-        # Check in all three collections: users, staff, AND patients
-        user = None
-        collection_name = ""
-        
-        if auth_data['role'] == 'admin' or auth_data['role'] == 'pharmacy':
-            user = db.users.find_one({'email': auth_data['email']})
-            collection_name = "users"
+        log.info("Login attempt", extra={"event": "login.attempt", "email": auth_data['email'],
+                                          "role": auth_data['role']})
         
-        elif auth_data['role'] == 'doctor' or auth_data['role'] == 'nurse':
-            user = db.staff.find_one({'email': auth_data['email']})
-            collection_name = "staff"
+        # One indexed lookup on the identity index resolves the account in users, staff or patients
+        collection_name, user = find_identity(db, auth_data['email'])
         
-        elif auth_data['role'] == 'patient':
-            # For patients, check both direct email field AND contact.email field
-            user = db.patients.find_one({
-                '$or': [
-                    {'email': auth_data['email']},
-                    {'contact.email': auth_data['email']}
-                ]
-            })
-            collection_name = "patients"
-        
-        # Fallback: search in all collections if not found by role
-        if not user:
-            user = db.users.find_one({'email': auth_data['email']})
-            collection_name = "users" if user else ""
-            
         if not user:
-            user = db.staff.find_one({'email': auth_data['email']})
-            collection_name = "staff" if user else ""
-            
-        if not user:
-            # For patients fallback, check both email fields
-            user = db.patients.find_one({
-                '$or': [
-                    {'email': auth_data['email']},
-                    {'contact.email': auth_data['email']}
-                ]
-            })
-            collection_name = "patients" if user else ""
-        
-        if not user:
-            print(f"❌ User not found in any collection: {auth_data['email']}")
+            log.info("User not found", extra={"event": "login.unknown_user", "email": auth_data['email']})
             return jsonify({'message': 'User not found!'}), 404
         
-        print(f"✅ User found in {collection_name} collection: {user.get('name', 'Unknown')}")
-        
         # Verify the user's actual role matches the requested role
-        actual_role = user.get('role', 'patient' if collection_name == 'patients' else '')
-        
-        # For patients collection, the role might not be stored, so we infer it
-        if collection_name == 'patients' and not actual_role:
-            actual_role = 'patient'
+        actual_role = account_role(user, collection_name)
         
         if actual_role != auth_data['role']:
-            print(f"❌ Role mismatch: Expected {auth_data['role']}, Found {actual_role}")
+            log.info("Role mismatch", extra={"event": "login.role_mismatch", "email": auth_data['email'],
+                                             "expected": auth_data['role'], "found": actual_role})
             return jsonify({
                 'message': f'Invalid user role. Expected {auth_data["role"]} but found {actual_role}'
             }), 403
         
-        # Check password - handle both hashed and plain text
-        password_matches = False
-        
-        # If password is hashed (starts with scrypt: or pbkdf2:)
-        if user['password'].startswith(('scrypt:', 'pbkdf2:')):
-            password_matches = check_password_hash(user['password'], auth_data['password'])
-            print("🔐 Checking hashed password")
-        else:
-            # For plain text passwords (development only)
-            password_matches = (user['password'] == auth_data['password'])
-            print(f"🔐 Checking plain text password: {password_matches}")
-            if password_matches:
-                print("⚠️  Warning: Using plain text password - hash this in production!")
+        # Check password on the hashing pool (werkzeug, bcrypt or legacy plain text)
+        try:
+            password_matches = password_hasher.verify(user['password'], auth_data['password'])
+        except HashingBusy:
+            return jsonify({'message': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
         
         if not password_matches:
-            print("❌ Password does not match")
+            log.info("Password does not match", extra={"event": "login.bad_password", "email": auth_data['email']})
             return jsonify({'message': 'Invalid password!'}), 401
         
-        print("✅ Password matches!")
+        # Upgrade plain text / bcrypt passwords to the configured hash now that we know the password
+        if needs_rehash(user['password']):
+            try:
+                new_hash = password_hasher.hash(auth_data['password'])
+                getattr(db, collection_name).update_one(
+                    {'_id': user['_id'], 'password': user['password']},
+                    {'$set': {'password': new_hash}}
+                )
+                log.info("Rehashed legacy password", extra={"event": "login.rehash", "collection": collection_name,
+                                                            "userId": user['_id']})
+            except HashingBusy:
+                pass  # try again on the next login
         
         # Prepare user data for token based on collection type
-        user_data = {
-            'email': user.get('email') or user.get('contact', {}).get('email', ''),
-            'role': actual_role,
-            'name': user.get('name', 'User'),
-            'id': str(user.get('_id', 'unknown'))
-        }
-        
-        # Add additional fields for staff members
-        if collection_name == 'staff':
-            user_data['specialization'] = user.get('specialization')
-            user_data['department'] = user.get('department')
-            user_data['qualifications'] = user.get('qualifications')
+        user_data = build_user_data(user, collection_name, actual_role)
+        token = issue_token(user_data, app.config['SECRET_KEY'])
         
-        # Add additional fields for patients
-        elif collection_name == 'patients':
-            user_data['patientId'] = user.get('patientId', '')
-            user_data['age'] = user.get('age', '')
-            user_data['gender'] = user.get('gender', '')
-            user_data['medicalSpecialty'] = user.get('medicalSpecialty', '')
-            user_data['type'] = user.get('type', '')
-            user_data['contact'] = user.get('contact', {})
-            user_data['insurance'] = user.get('insurance', {})
-            user_data['wardNumber'] = user.get('wardNumber', '')
-            user_data['cartNumber'] = user.get('cartNumber', '')
+        log.info("Login successful", extra={"event": "login.success", "collection": collection_name,
+                                            "userId": user['_id'], "role": actual_role})
         
-        token_payload = {
-            'user': user_data,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=8)
-        }
-        
-        token = jwt.encode(token_payload, app.config['SECRET_KEY'])
-        
-        print(f"✅ Login successful for {user['name']} as {actual_role}")
-        
-        return jsonify({
-            'token': token,
-            'user': user_data,
-            'redirect': f'/{actual_role}/dashboard',
-            'message': 'Login successful'
-        }), 200
+        return jsonify(login_response(user_data, token)), 200
         
     except Exception as e:
-        print(f"❌ Login error: {str(e)}")
+        log.exception("Login error", extra={"event": "login.error"})
         return jsonify({
             'message': 'Login error',
             'error': str(e)
         }), 500
-# Register admin blueprint
-try:
-    from admin_bp import admin_bp
-    app.register_blueprint(admin_bp, url_prefix="/admin")
-    print("✅ Admin blueprint registered successfully")
-except ImportError as e:
-    print(f"⚠️  Could not import admin blueprint: {e}")
+# Hospital API (/api/*, /staff/*) and user administration (/admin/*)
+from admin_bp import admin_bp
+from app.routes.admin_routes import admin_bp as admin_users_bp
+app.register_blueprint(admin_bp)
+app.register_blueprint(admin_users_bp)
 
 if __name__ == '__main__':
-    print("🚀 Starting Flask server...")
-    print("📊 Available endpoints:")
-    print("   GET  /health - Health check")
-    print("   GET  /test - Test connection")
-    print("   POST /login - User login")
-    print("   GET  /admin/* - Admin endpoints")
+    # Development only; production runs wsgi:app under gunicorn (see wsgi.py)
+    log.info("Starting Flask development server", extra={
+        "event": "app.start",
+        "endpoints": ["GET /health", "GET /test", "POST /login", "/api/*", "/staff/*", "GET /admin/*",
+                      "GET /metrics"]
+    })
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=int(os.getenv('PORT', '5000')))
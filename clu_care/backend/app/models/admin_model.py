@@ -1,7 +1,78 @@
 # backend/app/models/admin_model.py
+import base64
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from bson import errors as bson_errors
 from bson.objectid import ObjectId
 from werkzeug.security import generate_password_hash, check_password_hash
-from app.utils.db import db  # your MongoDB client instance
+from app.utils.db import db  # shared pooled client (app/utils/mongo.py)
+from app.utils.identity import remove_identity
+from app.utils.queries import SECRET_PROJECTION
+
+# Collections listed by /admin/users, in tie-break order for equal _ids
+USER_COLLECTIONS = ["patients", "doctors", "pharmacies"]
+USER_PROJECTION = SECRET_PROJECTION
+USERS_DEFAULT_LIMIT = 100
+USERS_MAX_LIMIT = 500
+# Threads shared by all requests for the per-collection reads
+USER_READ_WORKERS = int(os.getenv("USER_READ_WORKERS", str(len(USER_COLLECTIONS) * 4)))
+
+_ROLE_ORDER = {coll[:-1]: position for position, coll in enumerate(USER_COLLECTIONS)}
+
+_pool_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+
+
+def _reader_pool():
+    # Created in the process that uses it; a pool inherited across fork() has no threads
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=USER_READ_WORKERS, thread_name_prefix="admin-users")
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _tag(users, coll):
+    for user in users:
+        user["role"] = coll[:-1]  # singular role
+        yield user
+
+
+def _position(user):
+    return user["_id"], _ROLE_ORDER[user["role"]]
+
+
+def encode_user_cursor(user):
+    """Opaque token for the position just after `user`."""
+    return base64.urlsafe_b64encode(f"{user['_id']}:{_ROLE_ORDER[user['role']]}".encode()).decode().rstrip("=")
+
+
+def decode_user_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        user_id, position = raw.split(":", 1)
+        position = int(position)
+        if not 0 <= position < len(USER_COLLECTIONS):
+            raise ValueError(position)
+        return ObjectId(user_id), position
+    except (ValueError, TypeError, UnicodeDecodeError, bson_errors.InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+def _read_page(coll, after, limit):
+    """Up to `limit` users of one collection positioned after `after` ((_id, collection index))."""
+    query = {}
+    if after is not None:
+        after_id, after_coll = after
+        # Same _id in a later collection still comes after the cursor
+        query["_id"] = {"$gte" if USER_COLLECTIONS.index(coll) > after_coll else "$gt": after_id}
+    return list(_tag(db[coll].find(query, USER_PROJECTION).sort("_id", 1).limit(limit), coll))
 
 
 class Admin:
@@ -34,18 +105,43 @@ class Admin:
         return check_password_hash(admin["password"], password)
 
     @staticmethod
-    def get_all_users():
-        users = []
-        for role in ["patients", "doctors", "pharmacies"]:
-            coll = db[role]
-            for user in coll.find():
-                user["_id"] = str(user["_id"])
-                user["role"] = role[:-1]  # singular role
-                users.append(user)
-        return users
+    def iter_all_users(batch_size=500):
+        """Yield every user in (_id, collection) order, merged lazily off the cursors (used for streaming)."""
+        cursors = [
+            _tag(db[coll].find({}, USER_PROJECTION).sort("_id", 1).batch_size(batch_size), coll)
+            for coll in USER_COLLECTIONS
+        ]
+        yield from heapq.merge(*cursors, key=_position)
+
+    @staticmethod
+    def get_all_users(limit=USERS_DEFAULT_LIMIT, cursor=None):
+        """One page of users across all user collections, oldest first.
+
+        The collections are read concurrently, each for at most `limit` + 1
+        documents after the cursor (the extra one tells whether anything is
+        left past the page), and k-way merged. Returns (users,
+        next_cursor); next_cursor is None on the last page. Raises ValueError
+        on a bad cursor.
+        """
+        limit = max(1, min(limit, USERS_MAX_LIMIT))
+        after = decode_user_cursor(cursor) if cursor else None
+        pool = _reader_pool()
+        futures = [pool.submit(_read_page, coll, after, limit + 1) for coll in USER_COLLECTIONS]
+        pages = [future.result() for future in futures]
+
+        users = list(islice(heapq.merge(*pages, key=_position), limit))
+        has_more = sum(len(page) for page in pages) > len(users)
+        next_cursor = encode_user_cursor(users[-1]) if users and has_more else None
+        return users, next_cursor
 
     @staticmethod
     def delete_user(user_id, role):
+        """Delete the account and free its login email. Raises ValueError on a malformed id."""
+        if not ObjectId.is_valid(user_id):
+            raise ValueError("Invalid user id")
         coll = db[role + "s"]
         result = coll.delete_one({"_id": ObjectId(user_id)})
-        return result.deleted_count > 0
+        if result.deleted_count == 0:
+            return False
+        remove_identity(db, ObjectId(user_id))
+        return True
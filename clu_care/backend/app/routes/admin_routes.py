@@ -1,20 +1,40 @@
 # backend/app/routes/admin_routes.py
 from flask import Blueprint, request, jsonify
-from app.models.admin_model import Admin
+from app.models.admin_model import USERS_DEFAULT_LIMIT, Admin
+from app.utils.streaming import STREAM_BATCH_SIZE, ndjson_response, wants_stream
+from app.utils.token_cache import token_cache
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
 
+# Users from every user collection, oldest first, one page at a time.
+# Query params: limit (default 100, max 500), cursor (from the previous page's X-Next-Cursor header).
+# With ?stream=1 or Accept: application/x-ndjson all users are streamed instead.
 @admin_bp.route("/users", methods=["GET"])
 def get_all_users():
-    users = Admin.get_all_users()
-    return jsonify(users), 200
+    if wants_stream(request):
+        return ndjson_response(Admin.iter_all_users(STREAM_BATCH_SIZE))
+    try:
+        users, next_cursor = Admin.get_all_users(
+            request.args.get("limit", USERS_DEFAULT_LIMIT, type=int), request.args.get("cursor")
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    response = jsonify(users)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
 
 @admin_bp.route("/user/<role>/<user_id>", methods=["DELETE"])
 def delete_user(role, user_id):
-    success = Admin.delete_user(user_id, role)
+    try:
+        success = Admin.delete_user(user_id, role)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     if success:
+        # Tokens already issued to the account stop resolving to it
+        token_cache.invalidate_user(user_id)
         return jsonify({"message": f"{role.capitalize()} deleted"}), 200
     else:
         return jsonify({"error": "User not found"}), 404
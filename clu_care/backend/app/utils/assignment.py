@@ -0,0 +1,131 @@
+"""Least-loaded doctor assignment.
+
+Each doctor's current inpatient count is kept in `caseload` on their staff
+document. claim_doctor() is a single find_one_and_update that picks the
+active doctor with the fewest patients (below DOCTOR_MAX_CASELOAD) and
+increments their caseload in the same operation, so concurrent admissions
+cannot both take a doctor's last slot. release_doctor() gives the slot back
+on discharge.
+
+DoctorAvailability mirrors the same numbers per department in process, so
+/staff/available is answered without touching the database.
+"""
+import os
+import threading
+import time
+
+from pymongo import ReturnDocument, UpdateOne
+
+from app.utils.queries import STAFF_LIST_PROJECTION
+
+# Inpatients one doctor takes before they stop being offered
+DOCTOR_MAX_CASELOAD = int(os.getenv("DOCTOR_MAX_CASELOAD", "10"))
+# Each worker process keeps its own copy; rebuild to pick up other workers' claims
+DEFAULT_MAX_AGE = float(os.getenv("DOCTOR_INDEX_MAX_AGE", "30"))
+
+DOCTOR_PROJECTION = {**STAFF_LIST_PROJECTION, "caseload": 1}
+
+
+def available_doctors_query(department=None):
+    """Active doctors with room for another patient (uses the role_department_status_caseload index)."""
+    query = {"role": "doctor", "status": "active", "caseload": {"$lt": DOCTOR_MAX_CASELOAD}}
+    if department is not None:
+        query["department"] = department
+    return query
+
+
+def claim_doctor(staff_collection, department=None, doctor_id=None):
+    """Add one patient to a doctor's caseload and return the updated doctor, or None if nobody has room.
+
+    With doctor_id, claims that doctor if they are still available; otherwise
+    the least-loaded available doctor in `department`.
+    """
+    query = available_doctors_query(None if doctor_id is not None else department)
+    if doctor_id is not None:
+        query["_id"] = doctor_id
+    return staff_collection.find_one_and_update(
+        query,
+        {"$inc": {"caseload": 1}},
+        projection=DOCTOR_PROJECTION,
+        sort=None if doctor_id is not None else [("caseload", 1), ("_id", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def release_doctor(staff_collection, doctor_id):
+    """Take one patient off a doctor's caseload. Returns the updated doctor, or None."""
+    return staff_collection.find_one_and_update(
+        {"_id": doctor_id, "caseload": {"$gt": 0}},
+        {"$inc": {"caseload": -1}},
+        projection=DOCTOR_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def backfill_caseloads(db):
+    """Count admitted patients for doctors that have no caseload yet. Safe to run on every startup."""
+    missing = [d["_id"] for d in db.staff.find({"role": "doctor", "caseload": {"$exists": False}}, {"_id": 1})]
+    if not missing:
+        return 0
+    counts = {
+        row["_id"]: row["n"]
+        for row in db.patients.aggregate([
+            {"$match": {"status": "admitted", "assignedDoctor": {"$in": missing}}},
+            {"$group": {"_id": "$assignedDoctor", "n": {"$sum": 1}}}
+        ])
+    }
+    db.staff.bulk_write([
+        UpdateOne({"_id": doctor_id, "caseload": {"$exists": False}}, {"$set": {"caseload": counts.get(doctor_id, 0)}})
+        for doctor_id in missing
+    ], ordered=False)
+    return len(missing)
+
+
+class DoctorAvailability:
+    """Active doctors per department with their caseloads.
+
+    Built with one indexed query, then kept current by record() with the
+    documents claim_doctor()/release_doctor() return.
+    """
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self._by_department = {}
+        self._lock = threading.Lock()
+        self.max_age = max_age
+        self.loaded_at = None
+
+    def is_stale(self):
+        return self.loaded_at is None or bool(self.max_age and time.time() - self.loaded_at > self.max_age)
+
+    def ensure_loaded(self, staff_collection):
+        if self.is_stale():
+            self.load(staff_collection)
+
+    def load(self, staff_collection):
+        by_department = {}
+        for doctor in staff_collection.find({"role": "doctor", "status": "active"}, DOCTOR_PROJECTION):
+            by_department.setdefault(doctor.get("department"), {})[doctor["_id"]] = doctor
+        with self._lock:
+            self._by_department = by_department
+            self.loaded_at = time.time()
+
+    def invalidate(self):
+        """Rebuild on next use (after staff are added, edited or removed)."""
+        self.loaded_at = None
+
+    def record(self, doctor):
+        """Apply a doctor document returned by a claim or release."""
+        if doctor is None:
+            return
+        with self._lock:
+            doctors = self._by_department.setdefault(doctor.get("department"), {})
+            if doctor["_id"] in doctors or doctor.get("status") == "active":
+                doctors[doctor["_id"]] = doctor
+
+    def available(self, department):
+        """Doctors in `department` with room, least loaded first."""
+        with self._lock:
+            doctors = list(self._by_department.get(department, {}).values())
+        doctors = [d for d in doctors if d.get("caseload", 0) < DOCTOR_MAX_CASELOAD]
+        doctors.sort(key=lambda d: (d.get("caseload", 0), str(d["_id"])))
+        return doctors
@@ -0,0 +1,59 @@
+import datetime
+
+import jwt
+
+TOKEN_LIFETIME = datetime.timedelta(hours=8)
+
+
+def account_role(user, collection_name):
+    """The role stored on the account; patients often have none stored, so infer it."""
+    role = user.get('role', 'patient' if collection_name == 'patients' else '')
+    if collection_name == 'patients' and not role:
+        role = 'patient'
+    return role
+
+
+def build_user_data(user, collection_name, role):
+    """Claims placed in the login token and returned to the client."""
+    user_data = {
+        'email': user.get('email') or user.get('contact', {}).get('email', ''),
+        'role': role,
+        'name': user.get('name', 'User'),
+        'id': str(user.get('_id', 'unknown'))
+    }
+
+    # Add additional fields for staff members
+    if collection_name == 'staff':
+        user_data['specialization'] = user.get('specialization')
+        user_data['department'] = user.get('department')
+        user_data['qualifications'] = user.get('qualifications')
+
+    # Add additional fields for patients
+    elif collection_name == 'patients':
+        user_data['patientId'] = user.get('patientId', '')
+        user_data['age'] = user.get('age', '')
+        user_data['gender'] = user.get('gender', '')
+        user_data['medicalSpecialty'] = user.get('medicalSpecialty', '')
+        user_data['type'] = user.get('type', '')
+        user_data['contact'] = user.get('contact', {})
+        user_data['insurance'] = user.get('insurance', {})
+        user_data['wardNumber'] = user.get('wardNumber', '')
+        user_data['cartNumber'] = user.get('cartNumber', '')
+
+    return user_data
+
+
+def issue_token(user_data, secret_key):
+    return jwt.encode({
+        'user': user_data,
+        'exp': datetime.datetime.utcnow() + TOKEN_LIFETIME
+    }, secret_key)
+
+
+def login_response(user_data, token):
+    return {
+        'token': token,
+        'user': user_data,
+        'redirect': f'/{user_data["role"]}/dashboard',
+        'message': 'Login successful'
+    }
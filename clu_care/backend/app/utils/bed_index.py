@@ -0,0 +1,247 @@
+import json
+import os
+import re
+import threading
+import time
+
+# Ward topology lives in <repo>/uploads/ward.json unless WARD_LAYOUT_PATH is set
+DEFAULT_LAYOUT_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "uploads", "ward.json")
+)
+DEFAULT_BEDS_PER_WARD = int(os.getenv("BEDS_PER_WARD", "10"))
+
+# Each worker process keeps its own index, so rebuild periodically to pick up
+# writes made by other workers
+DEFAULT_MAX_AGE = float(os.getenv("BED_INDEX_MAX_AGE", "60"))
+
+
+def load_ward_layout(path=None, beds_per_ward=DEFAULT_BEDS_PER_WARD):
+    """Read the ward list from ward.json.
+
+    Ward numbers come from an explicit "number" key, else the digits in the
+    name ("Ward-3" -> 3), else the position in the file. Bed count comes from
+    "bedCount", else the length of a non-empty "beds" list, else beds_per_ward.
+    """
+    path = path or os.getenv("WARD_LAYOUT_PATH", DEFAULT_LAYOUT_PATH)
+    try:
+        with open(path) as f:
+            raw_wards = json.load(f)
+    except (OSError, ValueError):
+        raw_wards = [{"name": f"Ward {n}", "specialty": f"Ward{n}"} for n in range(1, 6)]
+
+    layout = []
+    for position, ward in enumerate(raw_wards, start=1):
+        number = ward.get("number")
+        if number is None:
+            match = re.search(r"(\d+)\s*$", ward.get("name", ""))
+            number = int(match.group(1)) if match else position
+        bed_count = ward.get("bedCount") or len(ward.get("beds") or []) or beds_per_ward
+        layout.append({
+            "number": int(number),
+            "_id": str(ward.get("_id", f"ward{number}")),
+            "name": ward.get("name", f"Ward {number}"),
+            "specialty": ward.get("specialty"),
+            "bedCount": int(bed_count),
+        })
+    return layout
+
+
+def bed_key(ward_number, bed_number):
+    """Normalize a (wardNumber, cartNumber) pair to ints, or None if unset/invalid."""
+    try:
+        ward, bed = int(ward_number), int(bed_number)
+    except (TypeError, ValueError):
+        return None
+    if ward <= 0 or bed <= 0:
+        return None
+    return ward, bed
+
+
+class BedIndex:
+    """In-process occupancy map keyed by (ward, bed).
+
+    Built with one scan of the patients collection, then kept current by
+    admit()/discharge() calls from the write endpoints. Listeners added with
+    add_listener() are called with bed_state() of every bed that changes,
+    including beds changed by another worker and picked up by a rebuild.
+    """
+
+    def __init__(self, layout, max_age=DEFAULT_MAX_AGE):
+        self.layout = layout
+        self._by_number = {w["number"]: w for w in layout}
+        self._by_id = {w["_id"]: w for w in layout}
+        self._occupied = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.max_age = max_age
+        self.loaded_at = None
+
+    # Patients that may hold a bed, and the fields the bed board needs
+    OCCUPANT_QUERY = {"wardNumber": {"$nin": [None, ""]}, "status": {"$ne": "discharged"}}
+    OCCUPANT_PROJECTION = {"name": 1, "age": 1, "gender": 1, "medicalSpecialty": 1,
+                           "assignedDoctor": 1, "admissionDate": 1, "wardNumber": 1, "cartNumber": 1}
+
+    def is_stale(self):
+        return self.loaded_at is None or bool(self.max_age and time.time() - self.loaded_at > self.max_age)
+
+    def ensure_loaded(self, patients_collection, staff_collection):
+        if self.is_stale():
+            self.load(patients_collection, staff_collection)
+
+    async def ensure_loaded_async(self, patients_collection, staff_collection):
+        """Same as ensure_loaded() for async (pymongo AsyncMongoClient) collections."""
+        if self.is_stale():
+            occupied, doctor_query = self._collect(
+                await patients_collection.find(self.OCCUPANT_QUERY, self.OCCUPANT_PROJECTION).to_list(None)
+            )
+            doctors = await staff_collection.find(doctor_query, {"name": 1}).to_list(None) if doctor_query else []
+            self._install(occupied, doctors)
+
+    def load(self, patients_collection, staff_collection):
+        """Rebuild the index from the patients collection (doctor names in one $in query)."""
+        occupied, doctor_query = self._collect(
+            patients_collection.find(self.OCCUPANT_QUERY, self.OCCUPANT_PROJECTION)
+        )
+        doctors = staff_collection.find(doctor_query, {"name": 1}) if doctor_query else []
+        self._install(occupied, doctors)
+
+    def _collect(self, patients):
+        occupied = {}
+        doctor_ids = set()
+        for p in patients:
+            key = bed_key(p.get("wardNumber"), p.get("cartNumber"))
+            if key is None or not self._in_layout(key):
+                continue
+            occupied[key] = p
+            if p.get("assignedDoctor"):
+                doctor_ids.add(p["assignedDoctor"])
+        return occupied, ({"_id": {"$in": list(doctor_ids)}} if doctor_ids else None)
+
+    def _install(self, occupied, doctors):
+        doctor_names = {d["_id"]: d.get("name") for d in doctors}
+        entries = {
+            key: self._entry(p, doctor_names.get(p.get("assignedDoctor")))
+            for key, p in occupied.items()
+        }
+        with self._lock:
+            previous, self._occupied = self._occupied, entries
+            first_load = self.loaded_at is None
+            self.loaded_at = time.time()
+        if self._listeners and not first_load:
+            changed = {key for key in previous.keys() | entries.keys() if previous.get(key) != entries.get(key)}
+            for key in sorted(changed):
+                self._notify(key, entries.get(key))
+
+    def admit(self, ward_number, bed_number, patient, doctor_name=None):
+        key = bed_key(ward_number, bed_number)
+        if key is None or not self._in_layout(key):
+            return False
+        entry = self._entry(patient, doctor_name)
+        with self._lock:
+            self._occupied[key] = entry
+        self._notify(key, entry)
+        return True
+
+    def discharge(self, ward_number, bed_number):
+        key = bed_key(ward_number, bed_number)
+        if key is None:
+            return False
+        with self._lock:
+            freed = self._occupied.pop(key, None) is not None
+        if freed:
+            self._notify(key, None)
+        return freed
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, key, entry):
+        if self._listeners:
+            state = self._bed_state(key, entry)
+            for callback in self._listeners:
+                callback(state)
+
+    def _bed_state(self, key, entry):
+        # One bed in the /api/beds shape, plus the ward it belongs to
+        ward = self._by_number[key[0]]
+        return {
+            "wardId": ward["_id"],
+            "bedNumber": key[1],
+            "status": "Admitted" if entry else "Available",
+            "admissionDate": entry["admissionDate"] if entry else None,
+            "patient": entry["patient"] if entry else None
+        }
+
+    def is_occupied(self, ward_number, bed_number):
+        return bed_key(ward_number, bed_number) in self._occupied
+
+    def wards(self):
+        """Full bed board in the /api/beds JSON shape."""
+        with self._lock:
+            occupied = dict(self._occupied)
+
+        wards = []
+        for ward in self.layout:
+            beds = []
+            for bed_num in range(1, ward["bedCount"] + 1):
+                entry = occupied.get((ward["number"], bed_num))
+                beds.append({
+                    "bedNumber": bed_num,
+                    "status": "Admitted" if entry else "Available",
+                    "admissionDate": entry["admissionDate"] if entry else None,
+                    "patient": entry["patient"] if entry else None
+                })
+            wards.append({
+                "_id": ward["_id"],
+                "name": ward["name"],
+                "specialty": ward["specialty"],
+                "beds": beds
+            })
+        return wards
+
+    def availability(self, ward_id=None):
+        """Free-bed counts per ward, optionally for a single ward _id."""
+        with self._lock:
+            occupied = set(self._occupied)
+
+        wards = [self._by_id[ward_id]] if ward_id is not None else self.layout
+        result = []
+        for ward in wards:
+            free = [b for b in range(1, ward["bedCount"] + 1) if (ward["number"], b) not in occupied]
+            result.append({
+                "_id": ward["_id"],
+                "name": ward["name"],
+                "specialty": ward["specialty"],
+                "totalBeds": ward["bedCount"],
+                "availableBeds": len(free),
+                "freeBedNumbers": free
+            })
+        return result
+
+    def has_ward(self, ward_id):
+        return ward_id in self._by_id
+
+    @property
+    def total_beds(self):
+        return sum(w["bedCount"] for w in self.layout)
+
+    @property
+    def occupied_beds(self):
+        return len(self._occupied)
+
+    def _in_layout(self, key):
+        ward = self._by_number.get(key[0])
+        return ward is not None and key[1] <= ward["bedCount"]
+
+    @staticmethod
+    def _entry(patient, doctor_name):
+        return {
+            "admissionDate": patient.get("admissionDate"),
+            "patient": {
+                "name": patient.get("name"),
+                "age": patient.get("age"),
+                "gender": patient.get("gender"),
+                "diagnosis": patient.get("medicalSpecialty"),
+                "doctor": doctor_name
+            }
+        }
@@ -0,0 +1,176 @@
+"""Server-Sent Events fan-out from one producer to many subscribers.
+
+publish() serializes an event once and hands the same bytes to every
+subscriber's bounded queue, so the cost of a change does not grow with the
+number of open screens beyond a queue put each. A subscriber that falls
+QUEUE_SIZE events behind is disconnected; EventSource reconnects on its own
+and starts again from a fresh snapshot.
+
+An optional refresh() runs on a single background thread every
+refresh_interval seconds while anyone is subscribed, e.g. to rebuild an
+index and publish what other workers changed.
+
+Under gunicorn's gthread worker every open stream holds one of the worker's
+threads for as long as the screen stays open. A worker therefore accepts at
+most SSE_MAX_SUBSCRIBERS streams (by default half of GUNICORN_THREADS) and
+answers the next with 503 and Retry-After, so ordinary requests always keep
+some threads. Streams also end when their worker is recycled (max_requests)
+or restarted; EventSource reconnects after the retry: delay and gets a fresh
+snapshot from whichever worker takes it.
+"""
+import os
+import queue
+import threading
+
+from flask import Response, jsonify, stream_with_context
+
+from app.utils.json_provider import dumps_bytes
+from app.utils.logs import get_logger
+
+log = get_logger(__name__)
+
+SSE_MIMETYPE = "text/event-stream"
+# Comment line sent when a stream has been idle this long, so proxies keep it open
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+# Client reconnect delay sent in the retry: field, in milliseconds
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "256"))
+# Open streams per worker process; each one occupies a gthread worker thread
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", str(max(1, int(os.getenv("GUNICORN_THREADS", "8")) // 2))))
+
+_CLOSED = object()
+
+
+def sse_event(event, data, event_id=None):
+    """One event in the text/event-stream format, as bytes."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode("utf-8") + b"data: " + dumps_bytes(data) + b"\n\n"
+
+
+class Broadcaster:
+    def __init__(self, refresh=None, refresh_interval=60.0, queue_size=QUEUE_SIZE,
+                 max_subscribers=SSE_MAX_SUBSCRIBERS):
+        self.refresh = refresh
+        self.refresh_interval = refresh_interval
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.event_id = 0
+        self.dropped_subscribers = 0
+        self.rejected_subscribers = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._wake = threading.Event()
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+    def publish(self, event, data):
+        with self._lock:
+            if not self._subscribers:
+                return
+            self.event_id += 1
+            payload = sse_event(event, data, self.event_id)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(payload)
+            except queue.Full:
+                self._drop(subscriber)
+
+    def subscribe(self):
+        """A new subscriber queue, or None if max_subscribers streams are already open."""
+        subscriber = queue.Queue(self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected_subscribers += 1
+                return None
+            self._subscribers.add(subscriber)
+            if self.refresh is not None and self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="sse-refresh", daemon=True)
+                self._refresher.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                self._wake.set()
+
+    def _drop(self, subscriber):
+        with self._lock:
+            if subscriber not in self._subscribers:
+                return
+            self._subscribers.discard(subscriber)
+            self.dropped_subscribers += 1
+        # Make room for the close marker (a concurrent publish may refill the
+        # queue, so retry); the stream ends and the client reconnects
+        while True:
+            try:
+                while True:
+                    subscriber.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                subscriber.put_nowait(_CLOSED)
+                return
+            except queue.Full:
+                continue
+
+    def _refresh_loop(self):
+        while True:
+            self._wake.wait(self.refresh_interval)
+            with self._lock:
+                self._wake.clear()
+                if not self._subscribers:
+                    self._refresher = None
+                    return
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving deltas from local writes; the next round retries
+                log.exception("Broadcast refresh failed", extra={"event": "sse.refresh_failed"})
+
+    def stream(self, snapshot):
+        """Response for one subscriber: `snapshot()`'s (event, data) first, then every published event.
+
+        The subscription starts before the snapshot is taken so no change is
+        missed between them. Events should carry full state, not increments,
+        so one the snapshot already reflects is harmless to replay. When the
+        worker already has max_subscribers streams open, the answer is a 503
+        with Retry-After instead.
+        """
+        subscriber = self.subscribe()
+        if subscriber is None:
+            log.warning("SSE subscriber limit reached", extra={
+                "event": "sse.rejected", "subscribers": self.max_subscribers
+            })
+            response = jsonify({"error": "Too many open streams, please retry"})
+            response.status_code = 503
+            response.headers["Retry-After"] = str(max(1, SSE_RETRY_MS // 1000))
+            return response
+
+        def generate():
+            try:
+                event, data = snapshot()
+                yield f"retry: {SSE_RETRY_MS}\n".encode("utf-8") + sse_event(event, data, self.event_id)
+                while True:
+                    try:
+                        payload = subscriber.get(timeout=SSE_HEARTBEAT)
+                    except queue.Empty:
+                        yield b": keepalive\n\n"
+                        continue
+                    if payload is _CLOSED:
+                        return
+                    yield payload
+            finally:
+                self.unsubscribe(subscriber)
+
+        response = Response(stream_with_context(generate()), mimetype=SSE_MIMETYPE, headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx: flush each event instead of buffering
+        })
+        # Frees the slot even if the client leaves before the first chunk
+        response.call_on_close(lambda: self.unsubscribe(subscriber))
+        return response
@@ -0,0 +1,108 @@
+"""Negotiated gzip/brotli compression of JSON responses.
+
+init_compression(app) adds an after_request hook that compresses complete
+JSON bodies of at least COMPRESS_MIN_SIZE bytes with the best encoding the
+client's Accept-Encoding allows: brotli when the optional `brotli` package
+is installed, else gzip. Small bodies go out as they are, because the
+encoding overhead outweighs the saving. Streamed responses (NDJSON,
+Server-Sent Events) are also left alone, since each chunk has to reach the
+client as soon as it is written.
+"""
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# Moderate levels: most of the size win for a fraction of the CPU of the maximum
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_MIMETYPES = ("application/json",)
+
+
+def _compress_gzip(body):
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def _compress_brotli(body):
+    return brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+
+
+# Server preference when the client accepts several equally
+ENCODERS = {"gzip": _compress_gzip}
+if brotli is not None:
+    ENCODERS = {"br": _compress_brotli, **ENCODERS}
+
+
+def choose_encoding(accept_encoding):
+    """The preferred encoding in ENCODERS the Accept-Encoding header allows, or None."""
+    weights = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODERS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress_response(response, accept_encoding):
+    """Compress `response` in place if it qualifies; returns it either way."""
+    if response.status_code == 304:
+        # Validates a representation that may have been compressed
+        response.vary.add("Accept-Encoding")
+        return response
+    if (response.status_code < 200 or response.status_code in (204, 206)
+            or response.is_streamed or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    response.set_data(ENCODERS[encoding](body))
+    response.headers["Content-Encoding"] = encoding
+    # The compressed bytes are a different representation: weaken a strong
+    # validator (as nginx does) so If-None-Match still compares the content
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        response.headers["ETag"] = "W/" + etag
+    return response
+
+
+def init_compression(app):
+    """Compress qualifying JSON responses with the encoding each client asks for."""
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, request.headers.get("Accept-Encoding"))
+
+    return app
@@ -0,0 +1,33 @@
+"""Cross-origin policy shared by the Flask app (via flask_cors) and the async app (asgi.py).
+
+Only the frontend's origins may call the API, with credentials.
+"""
+
+CORS_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:5173"]
+CORS_METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+CORS_ALLOW_HEADERS = ["Content-Type", "Authorization", "X-Request-ID"]
+CORS_EXPOSE_HEADERS = ["X-Request-ID", "X-Next-Cursor", "ETag"]
+
+
+def flask_cors_options():
+    """Keyword arguments for flask_cors.CORS()."""
+    return {
+        "origins": CORS_ORIGINS,
+        "supports_credentials": True,
+        "methods": CORS_METHODS,
+        "allow_headers": CORS_ALLOW_HEADERS,
+        "expose_headers": CORS_EXPOSE_HEADERS,
+    }
+
+
+def cors_headers(origin):
+    """Response headers for a request from `origin` (the Origin header); empty if it isn't allowed."""
+    if origin not in CORS_ORIGINS:
+        return {}
+    return {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Allow-Methods": ", ".join(CORS_METHODS),
+        "Access-Control-Allow-Headers": ", ".join(CORS_ALLOW_HEADERS),
+        "Access-Control-Expose-Headers": ", ".join(CORS_EXPOSE_HEADERS),
+    }
@@ -1,99 +1,152 @@
-from pymongo import MongoClient
-from werkzeug.security import generate_password_hash
 import os
+import threading
+
+from bson import ObjectId
+from werkzeug.security import generate_password_hash
 from datetime import datetime
+from app.utils.assignment import backfill_caseloads
+from app.utils.identity import ensure_identity_index, register_identity
+from app.utils.indexes import ensure_indexes
+from app.utils.logs import get_logger
+from app.utils.mongo import MONGODB_MEMORY_FALLBACK, mongo
+from app.utils.patients import ensure_patient_ids
+from app.utils.triage import ensure_case_ranks
+
+log = get_logger(__name__)
+
+DEFAULT_ADMIN_EMAIL = 'admin@clucare.com'
 
 class Database:
+    """Handle on the shared client. Nothing touches the network until connect() or first use."""
+
     def __init__(self):
-        self.client = None
-        self.db = None
-        self.connect()
+        self.db = mongo.lazy_database()
+
+    @property
+    def client(self):
+        return mongo.client
 
     def connect(self):
+        """Check the server is reachable. Raises if it isn't, so the readiness
+        thread keeps the app not-ready and retries; only with
+        MONGODB_MEMORY_FALLBACK set does it switch to the in-memory store."""
         try:
-            # MongoDB connection
-            mongodb_uri = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-            self.client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=5000)
-            self.db = self.client['hospital_db']
+            # MongoDB connection (shared, fork-safe client)
             self.client.server_info()
-            print("✅ Successfully connected to MongoDB")
+            if mongo.uses_memory_engine:
+                log.info("Using in-memory collections", extra={"event": "db.connected", "engine": "memory"})
+            else:
+                log.info("Successfully connected to MongoDB", extra={"event": "db.connected", "engine": "mongodb"})
             
         except Exception as e:
-            print(f"❌ MongoDB connection error: {e}")
+            if not MONGODB_MEMORY_FALLBACK:
+                raise  # logged by the readiness thread, which retries
+            log.error("MongoDB connection error: %s", e, extra={"event": "db.connect_failed"})
             self._create_mock_collections()
 
     def _create_mock_collections(self):
-        """Create mock collections for development"""
-        print("⚠️  Using mock collections for development")
-        
-        class MockCollection:
-            def __init__(self, name):
-                self.name = name
-                self.data = []
-                
-            def find_one(self, query=None):
-                if query and 'email' in query:
-                    return next((item for item in self.data if item.get('email') == query['email']), None)
-                return None if not self.data else self.data[0]
-                
-            def find(self, query=None):
-                return self.data
-                
-            def insert_one(self, document):
-                document['_id'] = f"mock_{len(self.data) + 1}"
-                self.data.append(document)
-                return type('obj', (object,), {'inserted_id': document['_id']})()
-                
-            def count_documents(self, query=None):
-                return len(self.data)
-                
-            def update_one(self, filter, update):
-                return type('obj', (object,), {'modified_count': 1})()
-                
-            def delete_one(self, filter):
-                return type('obj', (object,), {'deleted_count': 1})()
+        """Serve from the in-memory store for development"""
+        log.warning("Using in-memory collections for development", extra={"event": "db.fallback"})
+        mongo.use_memory_engine()
 
-        self.db = type('obj', (object,), {
-            'users': MockCollection('users'),
-            'patients': MockCollection('patients'),
-            'staff': MockCollection('staff'),
-            'departments': MockCollection('departments')
-        })
+    def initialize_indexes(self):
+        """Create all registered indexes (no-op for those that exist); one that fails is logged and skipped"""
+        try:
+            created, failed = ensure_indexes(self.db)
+            log.info("Indexes ready", extra={"event": "db.indexes", "created": len(created),
+                                             "failed": [f"{collection}.{name}" for collection, name, _ in failed]})
+        except Exception as e:
+            log.error("Error creating indexes: %s", e, extra={"event": "db.indexes_failed"})
+
+    def initialize_patient_ids(self):
+        """Renumber duplicate patient ids so the unique index can be built, and seed the id counter"""
+        try:
+            renumbered = ensure_patient_ids(self.db)
+            if renumbered:
+                log.info("Duplicate patient ids renumbered", extra={"event": "db.patient_ids", "patients": renumbered})
+        except Exception as e:
+            log.error("Error preparing patient ids: %s", e, extra={"event": "db.patient_ids_failed"})
+
+    def initialize_identity_index(self):
+        """Create the login identity index and add entries for accounts that have none"""
+        try:
+            added = ensure_identity_index(self.db)
+            log.info("Identity index ready", extra={"event": "db.identity_index", "added": added})
+        except Exception as e:
+            log.error("Error creating identity index: %s", e, extra={"event": "db.identity_index_failed"})
+
+    def initialize_caseloads(self):
+        """Count each doctor's admitted patients the first time assignment runs"""
+        try:
+            backfilled = backfill_caseloads(self.db)
+            if backfilled:
+                log.info("Doctor caseloads backfilled", extra={"event": "db.caseloads", "doctors": backfilled})
+        except Exception as e:
+            log.error("Error backfilling doctor caseloads: %s", e, extra={"event": "db.caseloads_failed"})
+
+    def initialize_case_ranks(self):
+        """Rank emergency cases written before severityRank existed, and seed the caseId counter"""
+        try:
+            ranked = ensure_case_ranks(self.db)
+            if ranked:
+                log.info("Emergency case ranks backfilled", extra={"event": "db.case_ranks", "cases": ranked})
+        except Exception as e:
+            log.error("Error backfilling emergency case ranks: %s", e, extra={"event": "db.case_ranks_failed"})
 
     def initialize_default_admin(self):
-        """Create default admin user"""
+        """Create the default admin once. Safe to run from several workers at the same time:
+        the unique identity index lets exactly one of them claim the email."""
         try:
-            admin_user = {
-                'email': 'admin@clucare.com',
+            if self.db.users.find_one({'email': DEFAULT_ADMIN_EMAIL}, {'_id': 1}):
+                log.info("Admin user already exists", extra={"event": "db.admin_seeded"})
+                return
+            admin_id = ObjectId()
+            if not register_identity(self.db, DEFAULT_ADMIN_EMAIL, 'users', admin_id, 'admin'):
+                log.info("Admin user already exists", extra={"event": "db.admin_seeded"})
+                return
+            self.db.users.insert_one({
+                '_id': admin_id,
+                'email': DEFAULT_ADMIN_EMAIL,
                 'password': generate_password_hash('admin123'),
                 'role': 'admin',
                 'name': 'System Administrator',
                 'permissions': ['all'],
                 'created_at': datetime.utcnow()
-            }
-            
-            existing_admin = self.db.users.find_one({'email': 'admin@clucare.com'})
-            if not existing_admin:
-                self.db.users.insert_one(admin_user)
-                print("✅ Default admin user created")
-            else:
-                print("✅ Admin user already exists")
+            })
+            log.info("Default admin user created", extra={"event": "db.admin_seeded"})
                 
         except Exception as e:
-            print(f"❌ Error creating admin user: {e}")
+            log.error("Error creating admin user: %s", e, extra={"event": "db.admin_seed_failed"})
 
 # Global database instance
 db_instance = None
+_init_lock = threading.Lock()
+_initialized_pid = None
 
 def initialize_db():
-    """Initialize the database connection"""
-    global db_instance
-    db_instance = Database()
-    db_instance.initialize_default_admin()
-    return db_instance
+    """Connect, create indexes and seed, once per process (later calls return at once).
+
+    Blocks while connecting; app.py runs it on the readiness thread
+    (app/utils/readiness.py) so imports and the first requests don't wait.
+    """
+    global _initialized_pid
+    database = get_db()
+    with _init_lock:
+        if _initialized_pid == os.getpid():
+            return database
+        database.connect()
+        database.initialize_patient_ids()
+        database.initialize_indexes()
+        database.initialize_identity_index()
+        database.initialize_caseloads()
+        database.initialize_case_ranks()
+        database.initialize_default_admin()
+        _initialized_pid = os.getpid()
+    log.info("Database initialized", extra={"event": "db.initialized"})
+    return database
 
 def get_db():
-    """Get the database instance"""
+    """Get the database instance (does not connect)"""
     global db_instance
     if db_instance is None:
         db_instance = Database()
@@ -105,5 +158,5 @@ def find_user_by_email(email):
         user = db.staff.find_one({'email': email})
     return user
 
-# Export the database instance
-db = get_db().db
\ No newline at end of file
+# Export the database instance (lazy: safe to import before the server forks)
+db = get_db().db
@@ -0,0 +1,167 @@
+"""Login identities: one entry per account email in `identities`, unique on email.
+
+/login resolves an email with a single indexed read on this collection, so
+every account must have its entry. The write paths keep it in step
+(register_identity, update_identity, remove_identity, the bulk importer),
+and backfill_identities() adds entries on startup for accounts written
+around them (seed scripts, direct imports, data older than the index).
+"""
+from itertools import islice
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.utils.indexes import ensure_indexes
+
+# Collections that hold login accounts; on a duplicate email the first one keeps it
+IDENTITY_SOURCES = ["users", "staff", "patients"]
+IDENTITY_BACKFILL_BATCH_SIZE = 1000
+
+_HAS_EMAIL = {"$nin": [None, ""]}
+# Accounts that should have an identity entry, per source collection
+ACCOUNT_EMAIL_FILTERS = {
+    "users": {"email": _HAS_EMAIL},
+    "staff": {"email": _HAS_EMAIL},
+    "patients": {"$or": [{"email": _HAS_EMAIL}, {"contact.email": _HAS_EMAIL}]},
+}
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def patient_email(patient):
+    """Patients may store their email at the top level or under contact.email."""
+    return patient.get("email") or (patient.get("contact") or {}).get("email")
+
+
+def ensure_identity_index(db):
+    """Create the unique email index and add the entries any account is missing."""
+    ensure_indexes(db, ["identities"])
+    return backfill_identities(db)
+
+
+def account_email(collection, account):
+    return patient_email(account) if collection == "patients" else account.get("email")
+
+
+def backfill_identities(db, batch_size=IDENTITY_BACKFILL_BATCH_SIZE):
+    """Add identity entries for accounts that have none. Returns the number added.
+
+    A collection is only scanned when it has more accounts with an email than
+    identity entries, so a complete index costs two counts per collection.
+    Safe to run from several workers at once: the unique index drops repeats.
+    """
+    added = 0
+    for collection in IDENTITY_SOURCES:
+        accounts = db[collection].count_documents(ACCOUNT_EMAIL_FILTERS[collection])
+        if db.identities.count_documents({"collection": collection}) >= accounts:
+            continue
+        cursor = db[collection].find(ACCOUNT_EMAIL_FILTERS[collection], {"email": 1, "contact.email": 1, "role": 1})
+        cursor = cursor.sort("_id", 1).batch_size(batch_size)
+        while batch := list(islice(cursor, batch_size)):
+            known = {entry["userId"] for entry in db.identities.find(
+                {"userId": {"$in": [account["_id"] for account in batch]}}, {"userId": 1}
+            )}
+            entries = [
+                entry for entry in (
+                    identity_document(account_email(collection, account), collection, account["_id"],
+                                      account.get("role"))
+                    for account in batch if account["_id"] not in known
+                ) if entry is not None
+            ]
+            if not entries:
+                continue
+            try:
+                added += len(db.identities.insert_many(entries, ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                # Emails already claimed by another account (or another worker's backfill)
+                added += e.details["nInserted"]
+    return added
+
+
+def identity_document(email, collection, user_id, role=None):
+    """The identities entry for an account, or None if it has no email."""
+    email = normalize_email(email)
+    if not email:
+        return None
+    if collection == "patients" and not role:
+        role = "patient"
+    return {"email": email, "collection": collection, "userId": user_id, "role": role}
+
+
+def register_identity(db, email, collection, user_id, role=None):
+    """Claim an email for an account. Returns False if the email is already taken."""
+    entry = identity_document(email, collection, user_id, role)
+    if entry is None:
+        return False
+    try:
+        db.identities.insert_one(entry)
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+def update_identity(db, collection, user_id, email=None, role=None):
+    """Sync an account's email/role change. Raises DuplicateKeyError if the new email is taken."""
+    changes = {}
+    if email is not None:
+        changes["email"] = normalize_email(email)
+    if role is not None:
+        changes["role"] = role
+    if changes:
+        db.identities.update_one(
+            {"userId": user_id},
+            {"$set": changes, "$setOnInsert": {"collection": collection}},
+            upsert=email is not None
+        )
+
+
+def restore_identity(db, collection, account):
+    """Undo update_identity(): point the identity back at `account`'s stored email and role."""
+    if account.get("email"):
+        update_identity(db, collection, account["_id"], account["email"], account.get("role"))
+    else:
+        remove_identity(db, account["_id"])
+
+
+def remove_identity(db, user_id):
+    db.identities.delete_one({"userId": user_id})
+
+
+def identity_pipeline(email):
+    """Match the identity entry and join it to its account by _id, one $lookup per source
+    collection; ObjectIds are unique, so only the owning collection matches."""
+    pipeline = [{"$match": {"email": normalize_email(email)}}, {"$limit": 1}]
+    for collection in IDENTITY_SOURCES:
+        pipeline.append({"$lookup": {
+            "from": collection,
+            "localField": "userId",
+            "foreignField": "_id",
+            "as": collection
+        }})
+    return pipeline
+
+
+def identity_account(identity):
+    """Turn an identity_pipeline() result into (collection_name, user_doc)."""
+    if not identity or not identity.get(identity["collection"]):
+        return None, None
+    return identity["collection"], identity[identity["collection"]][0]
+
+
+def find_identity(db, email):
+    """Resolve an email to (collection_name, user_doc) with one indexed round trip.
+
+    An email without an identity entry is unknown; nothing else is searched.
+    """
+    if not normalize_email(email):
+        return None, None
+    return identity_account(next(db.identities.aggregate(identity_pipeline(email)), None))
+
+
+async def find_identity_async(db, email):
+    """find_identity() for an async (pymongo AsyncMongoClient) database."""
+    if not normalize_email(email):
+        return None, None
+    cursor = await db.identities.aggregate(identity_pipeline(email))
+    return identity_account(await anext(cursor, None))
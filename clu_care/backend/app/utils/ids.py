@@ -0,0 +1,140 @@
+"""Sequential, human-readable ids (P-0000042) from block-reserved counters.
+
+Each counter is one document in the `counters` collection. An allocator
+reserves a block of ID_BLOCK_SIZE numbers with a single atomic
+find_one_and_update ($inc) and then hands them out from memory. Workers
+never receive overlapping blocks, so the ids are unique across processes
+without a round trip per id. They are increasing within a process but not
+gap-free: numbers left in a block when a worker exits are never used.
+
+The unique index on the id field (app/utils/indexes.py) is the backstop
+for ids assigned outside the allocator, e.g. ones kept by an import.
+seed_counter() moves a counter past the highest id already stored.
+
+An id of this format has exactly `width` digits. Older ids made of eight
+characters of an ObjectId (P-65123456) are therefore never mistaken for
+counter values, and among matching ids string order is numeric order.
+
+run_once() lets one worker run a startup migration (renumbering duplicate
+ids) while the others wait for it, using a lease document in the same
+collection.
+"""
+import os
+import re
+import threading
+import time
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "100"))
+COUNTERS_COLLECTION = "counters"
+
+
+class IdAllocator:
+    def __init__(self, counters, name, prefix, width=7, block_size=ID_BLOCK_SIZE):
+        self.counters = counters
+        self.name = name
+        self.prefix = prefix
+        self.width = width
+        self.block_size = block_size
+        self.pattern = re.compile(rf"^{re.escape(prefix)}(\d{{{width}}})$")
+        self.blocks_reserved = 0
+        self._next = 0
+        self._end = 0   # one past the last number of the current block
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def format(self, number):
+        return f"{self.prefix}{number:0{self.width}d}"
+
+    def number(self, value):
+        """The counter value behind an id of this format, or None for anything else."""
+        match = self.pattern.match(str(value or ""))
+        return int(match.group(1)) if match else None
+
+    def next(self):
+        """One new id."""
+        return self.take(1)[0]
+
+    def take(self, count):
+        """`count` new ids: the rest of the current block, plus one reservation for the remainder."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # A block reserved before a fork would be handed out by every child
+                self._next = self._end = 0
+                self._pid = os.getpid()
+            numbers = list(range(self._next, min(self._end, self._next + count)))
+            self._next += len(numbers)
+            missing = count - len(numbers)
+            if missing:
+                # Whole blocks, so the leftover serves the next calls without a round trip
+                size = -(-missing // self.block_size) * self.block_size
+                start = self._reserve(size)
+                numbers.extend(range(start, start + missing))
+                self._next, self._end = start + missing, start + size
+        return [self.format(n) for n in numbers]
+
+    def _reserve(self, size):
+        counter = self.counters.find_one_and_update(
+            {"_id": self.name},
+            {"$inc": {"seq": size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.blocks_reserved += 1
+        return counter["seq"] - size + 1
+
+    def observe(self, values):
+        """Move the counter past ids assigned elsewhere (imports). Returns the highest number seen."""
+        highest = max((n for n in map(self.number, values) if n is not None), default=None)
+        if highest is not None:
+            self.counters.update_one({"_id": self.name}, {"$max": {"seq": highest}}, upsert=True)
+        return highest
+
+
+def seed_counter(collection, field, allocator):
+    """Start `allocator`'s counter after the highest id of its format already in `collection`.
+
+    Safe to run on every startup and from several workers: $max only ever
+    raises the counter. Matching ids all have the allocator's width, so the
+    last one in index order is also the numerically highest.
+    """
+    highest = collection.find_one(
+        {field: {"$regex": allocator.pattern.pattern}}, {field: 1}, sort=[(field, -1)]
+    )
+    return allocator.observe([highest[field]] if highest else [])
+
+
+MIGRATION_LEASE_SECONDS = float(os.getenv("MIGRATION_LEASE_SECONDS", "300"))
+
+
+def run_once(counters, name, migrate, lease=MIGRATION_LEASE_SECONDS, poll=0.5):
+    """Run `migrate()` once for the whole deployment and return its result, or None if it already ran.
+
+    The first worker to claim the "migration:<name>" document runs it and
+    marks it done. The others wait until it is done, so nothing that depends
+    on the migration (a unique index) starts early. A worker that dies
+    mid-run leaves a lease that expires after `lease` seconds; the next
+    worker to start takes over.
+    """
+    key = f"migration:{name}"
+    while True:
+        now = time.time()
+        try:
+            # Matches only a pending migration whose lease has run out; if there is no
+            # document yet, the upsert creates it. Otherwise the insert hits the _id.
+            counters.find_one_and_update(
+                {"_id": key, "done": False, "leaseUntil": {"$lt": now}},
+                {"$set": {"leaseUntil": now + lease, "pid": os.getpid()}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            state = counters.find_one({"_id": key}) or {}
+            if state.get("done"):
+                return None
+            time.sleep(poll)
+            continue
+        result = migrate()
+        counters.update_one({"_id": key}, {"$set": {"done": True, "finishedAt": time.time()}})
+        return result
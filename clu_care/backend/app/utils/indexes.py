@@ -0,0 +1,135 @@
+"""Declarative index registry for hospital_db.
+
+ensure_indexes() creates everything in INDEXES at startup; an index that can't
+be built (e.g. a unique one over legacy duplicates) is logged and skipped
+without holding up the rest. check_query_plans()
+explains each of HOT_QUERIES and reports any that would run as a COLLSCAN;
+`python -m app.utils.indexes --check` exits non-zero if one does.
+"""
+import sys
+
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+from app.utils.assignment import available_doctors_query
+from app.utils.logs import get_logger
+from app.utils.triage import NEXT_CASE_SORT
+
+log = get_logger(__name__)
+
+# Patients occupying a bed (ward and bed are stored as positive ints)
+ADMITTED_BED_FILTER = {"status": "admitted", "wardNumber": {"$gt": 0}, "cartNumber": {"$gt": 0}}
+
+# collection -> list of (keys, options)
+INDEXES = {
+    "identities": [
+        ([("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+        ([("userId", ASCENDING)], {"name": "userId"}),
+    ],
+    "users": [
+        ([("email", ASCENDING)], {"name": "email"}),
+    ],
+    "staff": [
+        ([("email", ASCENDING)], {"name": "email"}),
+        # Equality on role/department/status, then least caseload first for doctor assignment
+        ([("role", ASCENDING), ("department", ASCENDING), ("status", ASCENDING), ("caseload", ASCENDING)],
+         {"name": "role_department_status_caseload"}),
+    ],
+    "patients": [
+        ([("email", ASCENDING)], {"name": "email", "sparse": True}),
+        ([("contact.email", ASCENDING)], {"name": "contact_email", "sparse": True}),
+        ([("wardNumber", ASCENDING), ("cartNumber", ASCENDING)], {"name": "ward_bed"}),
+        ([("status", ASCENDING)], {"name": "status"}),
+        ([("assignedDoctor", ASCENDING)], {"name": "assignedDoctor"}),
+        # Sparse: patients created before ids were assigned have none
+        ([("patientId", ASCENDING)], {"name": "patientId_unique", "unique": True, "sparse": True}),
+        # One admitted patient per bed, across every worker
+        ([("wardNumber", ASCENDING), ("cartNumber", ASCENDING)],
+         {"name": "ward_bed_admitted_unique", "unique": True, "partialFilterExpression": ADMITTED_BED_FILTER}),
+    ],
+    "emergency_cases": [
+        # Open cases by numeric severity, then arrival: the next-case sort
+        ([("status", ASCENDING), ("severityRank", ASCENDING), ("createdAt", ASCENDING)],
+         {"name": "status_severity_arrival"}),
+        ([("caseId", ASCENDING)], {"name": "caseId_unique", "unique": True, "sparse": True}),
+    ],
+}
+
+# (collection, filter, sort) for the queries the endpoints issue on every request
+HOT_QUERIES = [
+    ("identities", {"email": "check@example.com"}, None),
+    ("identities", {"userId": ObjectId()}, None),
+    ("users", {"email": "check@example.com"}, None),
+    ("staff", {"email": "check@example.com"}, None),
+    ("staff", available_doctors_query("general"), [("caseload", ASCENDING), ("_id", ASCENDING)]),
+    ("patients", {"_id": {"$gt": ObjectId()}}, [("_id", ASCENDING)]),
+    ("patients", {"contact.email": "check@example.com"}, None),
+    ("patients", {"wardNumber": {"$nin": [None, ""]}, "status": {"$ne": "discharged"}}, None),
+    ("patients", {"assignedDoctor": ObjectId()}, None),
+    ("patients", {"status": "admitted"}, None),
+    ("patients", {"patientId": "P-0000000"}, None),
+    ("emergency_cases", {"status": {"$ne": "resolved"}}, None),
+    ("emergency_cases", {"status": "open"}, NEXT_CASE_SORT),
+    ("emergency_cases", {"caseId": "E-0000000"}, None),
+]
+
+
+def ensure_indexes(db, collections=None):
+    """Create every registered index. Safe to call on each startup.
+
+    Returns (created, failed): the names of the indexes now in place, and
+    (collection, name, error) for each one that could not be built.
+    """
+    created, failed = [], []
+    for collection, specs in INDEXES.items():
+        if collections is not None and collection not in collections:
+            continue
+        for keys, options in specs:
+            try:
+                created.append(db[collection].create_index(keys, **options))
+            except PyMongoError as e:
+                log.error("Index %s.%s not created: %s", collection, options["name"], e,
+                          extra={"event": "db.index_failed", "collection": collection, "index": options["name"]})
+                failed.append((collection, options["name"], str(e)))
+    return created, failed
+
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def check_query_plans(db, queries=HOT_QUERIES):
+    """Explain each hot query and return the ones whose winning plan is a COLLSCAN."""
+    failures = []
+    for collection, query, sort in queries:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in set(_plan_stages(winning_plan)):
+            failures.append((collection, query))
+    return failures
+
+
+if __name__ == "__main__":
+    from app.utils.db import get_db
+
+    database = get_db().db
+    _, failed = ensure_indexes(database)
+    for collection, name, error in failed:
+        print(f"❌ Index {collection}.{name} not created: {error}")
+    if "--check" in sys.argv:
+        scans = check_query_plans(database)
+        for collection, query in scans:
+            print(f"❌ COLLSCAN on {collection}: {query}")
+        if scans:
+            sys.exit(1)
+        print(f"✅ All {len(HOT_QUERIES)} hot queries use an index")
@@ -0,0 +1,80 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+from bson import Decimal128, ObjectId
+from bson.binary import Binary
+from bson.timestamp import Timestamp
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+def bson_default(o):
+    """Encode the BSON types pymongo hands back, at any depth in a document."""
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (datetime.datetime, datetime.date)):
+        return o.isoformat()
+    if isinstance(o, Decimal128):
+        return str(o.to_decimal())
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, Timestamp):
+        return o.as_datetime().isoformat()
+    if isinstance(o, Binary):
+        return o.hex()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class BSONJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes raw Mongo documents without copying them.
+
+    Handlers can return cursor results as-is; ObjectId, datetime, Decimal128
+    and friends are encoded by orjson's `default` hook during serialization.
+    Keys are emitted in document order.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+
+    def _dumps_bytes(self, obj, indent=False):
+        return dumps_bytes(obj, indent)
+
+
+def dumps_bytes(obj, indent=False):
+    """Serialize with the provider's encoder outside a request (background threads, broadcasts)."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=bson_default, option=option)
+    return json.dumps(obj, default=bson_default, indent=2 if indent else None,
+                      separators=None if indent else (",", ":")).encode("utf-8")
+
+
+def init_json(app):
+    """Install the BSON-aware provider on a Flask (or Quart) app."""
+    app.json_provider_class = BSONJSONProvider
+    app.json = BSONJSONProvider(app)
+    return app
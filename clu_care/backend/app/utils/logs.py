@@ -0,0 +1,263 @@
+"""Structured, non-blocking logging.
+
+Handlers only put records on a bounded queue; a background QueueListener
+formats them as JSON lines and writes them to stdout. Records carry the
+current request id and an `event` name. Per-event sampling (LOG_SAMPLE) and
+rate limiting (LOG_RATE_LIMIT per second, per event) drop repetitive records
+before they are queued, and a full queue drops rather than blocks.
+
+    log = get_logger(__name__)
+    log.info("Login attempt", extra={"event": "login.attempt", "email": email})
+
+    LOG_LEVEL=INFO LOG_FORMAT=json|text LOG_SAMPLE="login.attempt=0.1,login.success=0.1"
+"""
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+
+from flask import g, request
+
+from app.utils.json_provider import bson_default
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Records per second allowed for any one event; the excess is counted and dropped
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "20"))
+LOG_RATE_BURST = float(os.getenv("LOG_RATE_BURST", str(max(LOG_RATE_LIMIT, 1))))
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def parse_sample_rates(spec):
+    """"login.attempt=0.1,login.success=0.5" -> {"login.attempt": 0.1, "login.success": 0.5}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        event, _, rate = item.partition("=")
+        try:
+            rates[event.strip()] = max(0.0, min(1.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the request id (and a default event name) onto records in the caller's thread."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        if not hasattr(record, "event"):
+            record.event = record.name
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Per-event sampling and token-bucket rate limiting.
+
+    Warnings and errors are never sampled, only rate limited. The next record
+    let through for an event reports how many were suppressed before it.
+    """
+
+    def __init__(self, sample_rates=None, rate=LOG_RATE_LIMIT, burst=LOG_RATE_BURST):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        event = record.event
+        if record.levelno < logging.WARNING:
+            rate = self.sample_rates.get(event)
+            if rate is not None and random.random() >= rate:
+                return False
+            if rate is not None:
+                record.sample_rate = rate
+
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(event, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[event] = (tokens, now)
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                return False
+            self._buckets[event] = (tokens - 1, now)
+            suppressed = self._suppressed.pop(event, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller: a full queue drops the record and counts it."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, event, message, request_id, then extras."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", record.name),
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in entry and key != "request_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if orjson is not None:
+            return orjson.dumps(entry, default=bson_default).decode("utf-8")
+        return json.dumps(entry, default=bson_default)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development: time level [request] message key=value..."""
+
+    def format(self, record):
+        extras = " ".join(
+            f"{key}={value}" for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS and key not in ("event", "request_id")
+        )
+        request_id = getattr(record, "request_id", None)
+        line = (f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:7s} "
+                f"{'[' + request_id[:8] + '] ' if request_id else ''}{record.getMessage()}")
+        if extras:
+            line += f"  {extras}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _LoggingState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.handler = None
+        self.listener = None
+        self.pid = None
+
+
+_state = _LoggingState()
+
+
+def _start_listener():
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JSONFormatter())
+    _state.listener = logging.handlers.QueueListener(_state.handler.queue, output, respect_handler_level=False)
+    _state.listener.start()
+    _state.pid = os.getpid()
+
+
+def _stop_listener():
+    if _state.listener is not None and _state.pid == os.getpid():
+        _state.listener.stop()  # drains whatever is still queued
+    _state.listener = None
+
+
+def _restart_in_child():
+    # The listener thread does not survive fork(); start a fresh one with a fresh queue
+    if _state.handler is not None:
+        _state.handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+        _state.listener = None
+        _start_listener()
+
+
+def configure_logging():
+    """Install the queue handler on the "clucare" logger. Safe to call repeatedly."""
+    with _state.lock:
+        if _state.handler is not None:
+            return _state.handler
+
+        handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        handler.addFilter(RequestContextFilter())
+        handler.addFilter(SamplingFilter(parse_sample_rates(os.getenv("LOG_SAMPLE"))))
+        # Records are queued as-is; formatting happens on the listener thread
+        handler.prepare = lambda record: record
+
+        root = logging.getLogger("clucare")
+        root.setLevel(LOG_LEVEL)
+        root.addHandler(handler)
+        root.propagate = False
+
+        _state.handler = handler
+        _start_listener()
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_restart_in_child)
+        return handler
+
+
+def get_logger(name):
+    configure_logging()
+    return logging.getLogger(f"clucare.{name}")
+
+
+def dropped_records():
+    return _state.handler.dropped if _state.handler is not None else 0
+
+
+def init_request_ids(app):
+    """Give each request an id (from X-Request-ID or a new uuid), for logs and the response header."""
+
+    @app.before_request
+    def assign_request_id():
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.request_id = request_id
+        g.request_id_token = request_id_var.set(request_id)
+
+    @app.after_request
+    def add_request_id_header(response):
+        if g.get("request_id"):
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
+
+    @app.teardown_request
+    def clear_request_id(exc):
+        token = g.pop("request_id_token", None)
+        if token is not None:
+            try:
+                request_id_var.reset(token)
+            except ValueError:
+                request_id_var.set(None)  # reset from a different context (streamed response)
+
+    return app
@@ -0,0 +1,1413 @@
+"""In-process document store with the subset of the pymongo API this app uses.
+
+Used when MongoDB is unreachable (development) and for load tests via
+MONGODB_URI=memory://. Supports query operators ($eq $ne $gt $gte $lt $lte
+$in $nin $exists $regex $not $and $or $nor $expr), dotted paths, projections,
+sort/skip/limit, update operators ($set $unset $inc $max $min $setOnInsert
+$push $pull), unique, sparse and partial hash indexes, and the aggregation stages
+$match $project $sort $skip $limit $count $facet $lookup $group. Command
+listeners passed as event_listeners get started/succeeded/failed events per
+operation.
+"""
+import datetime
+import functools
+import heapq
+import itertools
+import re
+import threading
+import time
+from itertools import islice
+from bisect import bisect_left, bisect_right, insort
+
+from bson import ObjectId
+from pymongo import ReturnDocument, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+
+# ================== VALUE HELPERS ==================
+def _clone(value):
+    """Fast deep copy for plain BSON-like documents (dicts, lists, scalars)."""
+    kind = type(value)
+    if kind is dict:
+        return {k: _clone(v) if type(v) in _CONTAINERS else v for k, v in value.items()}
+    if kind is list:
+        return [_clone(v) if type(v) in _CONTAINERS else v for v in value]
+    return value
+
+
+_CONTAINERS = (dict, list)
+
+
+def _freeze(value):
+    """Hashable form of a value, for index keys."""
+    if isinstance(value, dict):
+        return ("__dict__",) + tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return ("__list__",) + tuple(_freeze(v) for v in value)
+    return value
+
+
+def _get_path(doc, path):
+    """All values at a dotted path, fanning out through arrays. [_MISSING] if absent."""
+    if "." not in path:
+        return [doc.get(path, _MISSING)] if isinstance(doc, dict) else [_MISSING]
+    values = [doc]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict):
+                if part in value:
+                    found.append(value[part])
+            elif isinstance(value, list):
+                if part.isdigit() and int(part) < len(value):
+                    found.append(value[int(part)])
+                else:
+                    found.extend(v[part] for v in value if isinstance(v, dict) and part in v)
+        values = found
+        if not values:
+            return [_MISSING]
+    return values
+
+
+def _hashable(value):
+    return type(value) not in _CONTAINERS
+
+
+def _expand(values):
+    """Values plus the elements of any arrays, so {"tags": "x"} matches ["x", "y"]."""
+    if len(values) == 1 and type(values[0]) is not list:
+        return values
+    out = []
+    for value in values:
+        out.append(value)
+        if isinstance(value, list):
+            out.extend(value)
+    return out
+
+
+def _set_path(doc, path, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset_path(doc, path):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _first(doc, path):
+    value = _get_path(doc, path)[0]
+    return None if value is _MISSING else value
+
+
+_TYPE_ORDER = [
+    (type(None), 0), (bool, 8), (int, 1), (float, 1), (str, 2), (dict, 3), (list, 4),
+    (ObjectId, 6), (datetime.datetime, 9),
+]
+
+
+def _sort_key(value):
+    """Order values across types the way MongoDB does (null < numbers < strings < ...)."""
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if type(value) is ObjectId:
+        return (6, value.binary)  # same order as ObjectId, compared in C
+    for kind, rank in _TYPE_ORDER:
+        if isinstance(value, kind):
+            if rank == 3:
+                return (rank, str(sorted(value.items(), key=lambda kv: kv[0])))
+            if rank == 4:
+                return (rank, tuple(_sort_key(v) for v in value))
+            return (rank, value)
+    return (10, str(value))
+
+
+class _Reverse:
+    """Wraps a sort key so it orders descending inside a tuple key."""
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+def _sort_spec(key_or_list, direction=None):
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+def _doc_sort_key(spec):
+    def key(doc):
+        return tuple(
+            _sort_key(_first(doc, field)) if direction == 1 else _Reverse(_sort_key(_first(doc, field)))
+            for field, direction in spec
+        )
+    return key
+
+
+# ================== QUERY MATCHING ==================
+def _compare(op):
+    def check(value, target):
+        if value is _MISSING or value is None or target is None:
+            return False
+        try:
+            return op(value, target)
+        except TypeError:
+            return False
+    return check
+
+
+_COMPARATORS = {
+    "$gt": _compare(lambda a, b: a > b),
+    "$gte": _compare(lambda a, b: a >= b),
+    "$lt": _compare(lambda a, b: a < b),
+    "$lte": _compare(lambda a, b: a <= b),
+}
+
+
+def _equals(value, target):
+    if isinstance(target, re.Pattern):
+        return isinstance(value, str) and target.search(value) is not None
+    if value is _MISSING:
+        return target is None
+    return value == target
+
+
+def _operator_predicate(path, ops):
+    if len(ops) == 1:
+        op, target = next(iter(ops.items()))
+        if op in ("$ne", "$eq") and _is_scalar(target):
+            negate = op == "$ne"
+            return lambda vals: any(_equals(v, target) for v in vals) != negate
+        if op in ("$in", "$nin") and all(_is_scalar(t) for t in target):
+            targets = set(target)
+            has_null = None in targets
+            negate = op == "$nin"
+
+            def membership(vals):
+                found = any((v is _MISSING and has_null) or (v is not _MISSING and _hashable(v) and v in targets)
+                            for v in vals)
+                return found != negate
+            return membership
+    checks = []
+    options = ops.get("$options", "")
+    for op, target in ops.items():
+        if op == "$eq":
+            checks.append(lambda vals, t=target: any(_equals(v, t) for v in vals))
+        elif op == "$ne":
+            checks.append(lambda vals, t=target: not any(_equals(v, t) for v in vals))
+        elif op in _COMPARATORS:
+            cmp = _COMPARATORS[op]
+            checks.append(lambda vals, t=target, c=cmp: any(c(v, t) for v in vals))
+        elif op == "$in":
+            checks.append(lambda vals, t=target: any(_equals(v, x) for v in vals for x in t))
+        elif op == "$nin":
+            checks.append(lambda vals, t=target: not any(_equals(v, x) for v in vals for x in t))
+        elif op == "$exists":
+            checks.append(lambda vals, t=target: (vals[0] is not _MISSING) == bool(t))
+        elif op == "$regex":
+            flags = (re.I if "i" in options else 0) | (re.M if "m" in options else 0)
+            pattern = target if isinstance(target, re.Pattern) else re.compile(target, flags)
+            checks.append(lambda vals, p=pattern: any(isinstance(v, str) and p.search(v) for v in vals))
+        elif op == "$options":
+            continue
+        elif op == "$not":
+            inner = _operator_predicate(path, target) if isinstance(target, dict) else \
+                (lambda vals, t=target: any(_equals(v, t) for v in vals))
+            checks.append(lambda vals, f=inner: not f(vals))
+        elif op == "$size":
+            checks.append(lambda vals, t=target: any(isinstance(v, list) and len(v) == t for v in vals))
+        elif op == "$all":
+            checks.append(lambda vals, t=target: all(any(_equals(v, x) for v in vals) for x in t))
+        elif op == "$elemMatch":
+            inner = compile_filter(target)
+            checks.append(lambda vals, f=inner: any(
+                isinstance(v, list) and any(isinstance(e, dict) and f(e) for e in v) for v in vals
+            ))
+        else:
+            raise ValueError(f"Unsupported query operator {op}")
+
+    def predicate(vals):
+        return all(check(vals) for check in checks)
+    return predicate
+
+
+def _is_scalar(value):
+    return value is None or type(value) in (str, int, float, bool, ObjectId, datetime.datetime)
+
+
+def compile_filter(query):
+    """Compile a query document into a predicate over documents."""
+    if not query:
+        return lambda doc: True
+
+    predicates = []
+    for key, condition in query.items():
+        if key == "$and":
+            subs = [compile_filter(q) for q in condition]
+            predicates.append(lambda doc, s=subs: all(f(doc) for f in s))
+        elif key == "$or":
+            subs = [compile_filter(q) for q in condition]
+            predicates.append(lambda doc, s=subs: any(f(doc) for f in s))
+        elif key == "$nor":
+            subs = [compile_filter(q) for q in condition]
+            predicates.append(lambda doc, s=subs: not any(f(doc) for f in s))
+        elif key == "$expr":
+            predicates.append(lambda doc, e=condition: bool(evaluate_expression(e, doc)))
+        elif isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            check = _operator_predicate(key, condition)
+            predicates.append(lambda doc, p=key, c=check: c(_expand(_get_path(doc, p))))
+        elif "." not in key and _is_scalar(condition):
+            # Flat field compared to a scalar: skip the path machinery unless the field is an array
+            def equals(doc, p=key, t=condition):
+                value = doc.get(p, _MISSING)
+                if type(value) is list:
+                    return t in value
+                return value == t if value is not _MISSING else t is None
+            predicates.append(equals)
+        else:
+            predicates.append(
+                lambda doc, p=key, t=condition: any(_equals(v, t) for v in _expand(_get_path(doc, p)))
+            )
+
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda doc: all(p(doc) for p in predicates)
+
+
+def evaluate_expression(expr, doc):
+    """Evaluate the aggregation expressions used in $expr/$project/$group."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        return _first(doc, expr[1:])
+    if isinstance(expr, list):
+        return [evaluate_expression(e, doc) for e in expr]
+    if not isinstance(expr, dict) or len(expr) != 1 or not next(iter(expr)).startswith("$"):
+        if isinstance(expr, dict):
+            return {k: evaluate_expression(v, doc) for k, v in expr.items()}
+        return expr
+
+    op, args = next(iter(expr.items()))
+    if not isinstance(args, list):
+        args = [args]
+    values = [evaluate_expression(a, doc) for a in args]
+
+    if op == "$ifNull":
+        return next((v for v in values if v is not None), None)
+    if op in ("$eq", "$ne"):
+        result = values[0] == values[1]
+        return result if op == "$eq" else not result
+    if op in _COMPARATORS:
+        return _COMPARATORS[op](values[0], values[1])
+    if op == "$and":
+        return all(values)
+    if op == "$or":
+        return any(values)
+    if op == "$not":
+        return not values[0]
+    if op == "$add":
+        return sum(v or 0 for v in values)
+    if op == "$subtract":
+        return values[0] - values[1]
+    if op == "$multiply":
+        result = 1
+        for v in values:
+            result *= v
+        return result
+    if op == "$size":
+        return len(values[0] or [])
+    if op == "$toString":
+        return None if values[0] is None else str(values[0])
+    if op == "$cond":
+        condition, then, otherwise = values
+        return then if condition else otherwise
+    raise ValueError(f"Unsupported expression operator {op}")
+
+
+# ================== PROJECTION / UPDATE ==================
+def apply_projection(doc, projection):
+    if not projection:
+        return _clone(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    inclusive = any(v for v in fields.values()) or (not fields and include_id)
+
+    if inclusive:
+        out = {}
+        if include_id and "_id" in doc:
+            out["_id"] = doc["_id"]
+        for path in fields:
+            value = _get_path(doc, path)[0] if "." in path else doc.get(path, _MISSING)
+            if value is not _MISSING:
+                _set_path(out, path, _clone(value))
+        return out
+
+    out = _clone(doc)
+    for path in fields:
+        _unset_path(out, path)
+    if not include_id:
+        out.pop("_id", None)
+    return out
+
+
+def _seed_from_filter(query):
+    """Equality fields of a filter, used to build the document on upsert."""
+    seed = {}
+    for key, condition in (query or {}).items():
+        if key.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            if "$eq" in condition:
+                _set_path(seed, key, _clone(condition["$eq"]))
+            continue
+        _set_path(seed, key, _clone(condition))
+    return seed
+
+
+def apply_update(doc, update, inserting=False):
+    """Apply update operators in place. Returns True if the document changed."""
+    if not any(k.startswith("$") for k in update):
+        replacement = _clone(update)
+        replacement["_id"] = doc["_id"]
+        changed = replacement != doc
+        doc.clear()
+        doc.update(replacement)
+        return changed
+
+    before = _clone(doc)
+    for op, fields in update.items():
+        if op == "$set":
+            for path, value in fields.items():
+                _set_path(doc, path, _clone(value))
+        elif op == "$setOnInsert":
+            if inserting:
+                for path, value in fields.items():
+                    _set_path(doc, path, _clone(value))
+        elif op == "$unset":
+            for path in fields:
+                _unset_path(doc, path)
+        elif op == "$inc":
+            for path, amount in fields.items():
+                current = _first(doc, path) or 0
+                _set_path(doc, path, current + amount)
+        elif op in ("$max", "$min"):
+            for path, value in fields.items():
+                current = _first(doc, path)
+                if current is None or (_sort_key(value) > _sort_key(current) if op == "$max"
+                                       else _sort_key(value) < _sort_key(current)):
+                    _set_path(doc, path, _clone(value))
+        elif op == "$push":
+            for path, value in fields.items():
+                current = _first(doc, path)
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                _set_path(doc, path, (current or []) + _clone(items))
+        elif op == "$pull":
+            for path, value in fields.items():
+                current = _first(doc, path) or []
+                match = compile_filter(value) if isinstance(value, dict) else None
+                _set_path(doc, path, [
+                    v for v in current
+                    if not (match(v) if match and isinstance(v, dict) else v == value)
+                ])
+        else:
+            raise ValueError(f"Unsupported update operator {op}")
+    return doc != before
+
+
+# ================== INDEXES ==================
+class HashIndex:
+    """Equality index: key tuple -> set of _ids. Arrays index each element (multikey)."""
+
+    def __init__(self, name, fields, unique=False, sparse=False, partial_filter=None):
+        self.name = name
+        self.fields = fields
+        self.unique = unique
+        self.sparse = sparse
+        # partialFilterExpression: only documents matching it are indexed
+        self.partial_filter = partial_filter
+        self._partial = compile_filter(partial_filter) if partial_filter else None
+        self.entries = {}
+        self._flat = not any("." in field for field in fields)
+
+    def covers(self, query):
+        """Whether every document `query` can match is in the index (always, unless partial)."""
+        if not self.partial_filter:
+            return True
+        return all(query.get(field) == condition for field, condition in self.partial_filter.items())
+
+    def keys_for(self, doc):
+        if self._partial is not None and not self._partial(doc):
+            return []
+        if self._flat:
+            key = tuple([doc.get(field, _MISSING) for field in self.fields])
+            if all(type(v) not in _CONTAINERS and v is not _MISSING for v in key):
+                return [key]
+        per_field = []
+        for field in self.fields:
+            values = _get_path(doc, field)
+            if values == [_MISSING]:
+                if self.sparse:
+                    return []
+                values = [None]
+            expanded = set()
+            for value in values:
+                if isinstance(value, list):
+                    expanded.update(_freeze(v) for v in value)
+                    if not value:
+                        expanded.add(_freeze(value))
+                else:
+                    expanded.add(_freeze(value))
+            per_field.append(expanded)
+
+        keys = [()]
+        for values in per_field:
+            keys = [k + (v,) for k in keys for v in values]
+        return keys
+
+    def check(self, doc, ignore_id=None):
+        if not self.unique:
+            return
+        for key in self.keys_for(doc):
+            owners = self.entries.get(key, ())
+            if any(owner != ignore_id for owner in owners):
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error index: {self.name} dup key: {key}",
+                    11000, {"keyPattern": dict.fromkeys(self.fields, 1), "keyValue": key}
+                )
+
+    def add(self, doc):
+        doc_id = doc["_id"]
+        for key in self.keys_for(doc):
+            bucket = self.entries.get(key)
+            if bucket is None:
+                self.entries[key] = {doc_id}
+            else:
+                bucket.add(doc_id)
+
+    def remove(self, doc):
+        for key in self.keys_for(doc):
+            bucket = self.entries.get(key)
+            if bucket is not None:
+                bucket.discard(doc["_id"])
+                if not bucket:
+                    del self.entries[key]
+
+    def lookup(self, values_per_field):
+        ids = set()
+        combos = [()]
+        for values in values_per_field:
+            combos = [c + (_freeze(v),) for c in combos for v in values]
+        if len(combos) == 1:
+            return self.entries.get(combos[0], ids)  # read-only view of the bucket
+        for combo in combos:
+            ids |= self.entries.get(combo, set())
+        return ids
+
+    def lookup_prefix(self, values_per_field):
+        """Ids whose leading fields equal the given values (the rest may be anything)."""
+        combos = [()]
+        for values in values_per_field:
+            combos = [c + (_freeze(v),) for c in combos for v in values]
+        combos, width = set(combos), len(values_per_field)
+        ids = set()
+        for key, bucket in self.entries.items():
+            if key[:width] in combos:
+                ids |= bucket
+        return ids
+
+
+def _index_name(fields):
+    return "_".join(f"{field}_{direction}" for field, direction in fields)
+
+
+# ================== COMMAND MONITORING ==================
+_request_ids = itertools.count(1)
+
+
+class CommandEvent:
+    """Stand-in for pymongo's CommandStarted/Succeeded/FailedEvent (same attribute names)."""
+
+    def __init__(self, command_name, database_name, command):
+        self.command_name = command_name
+        self.database_name = database_name
+        self.command = command
+        self.request_id = self.operation_id = next(_request_ids)
+        self.connection_id = ("memory", 0)
+        self.server_connection_id = None
+        self.service_id = None
+        self.duration_micros = 0
+        self.reply = None
+        self.failure = None
+
+
+def _reply(result):
+    """Reply shaped like the server's, so listeners can count returned documents."""
+    if isinstance(result, MemoryCommandCursor):
+        return {"ok": 1.0, "cursor": {"firstBatch": result.docs}}
+    if isinstance(result, list):
+        return {"ok": 1.0, "cursor": {"firstBatch": result}}
+    if isinstance(result, dict) or result is None:
+        return {"ok": 1.0, "value": result}
+    return {"ok": 1.0}
+
+
+def _monitored(command_name):
+    """Publish command events for a collection method, as the driver does for each round trip."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            listeners = self.database.command_listeners()
+            if not listeners:
+                return method(self, *args, **kwargs)
+
+            event = CommandEvent(command_name, self.database.name, {command_name: self.name})
+            for listener in listeners:
+                listener.started(event)
+            start = time.perf_counter()
+            try:
+                result = method(self, *args, **kwargs)
+            except Exception as e:
+                event.duration_micros = int((time.perf_counter() - start) * 1e6)
+                event.failure = {"errmsg": str(e), "ok": 0.0}
+                for listener in listeners:
+                    listener.failed(event)
+                raise
+            event.duration_micros = int((time.perf_counter() - start) * 1e6)
+            event.reply = _reply(result)
+            for listener in listeners:
+                listener.succeeded(event)
+            return result
+        return wrapper
+    return decorator
+
+
+# ================== CURSORS ==================
+class MemoryCursor:
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+        self._iterator = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, n):
+        self._skip = n
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def hint(self, index):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = iter(self._collection._find_batch(
+                self._query, self._projection, self._sort, self._skip, self._limit
+            ))
+        return next(self._iterator)
+
+    def to_list(self, length=None):
+        items = list(self)
+        return items if length is None else items[:length]
+
+    def close(self):
+        self._iterator = iter(())
+
+    def explain(self):
+        index, _ = self._collection._plan(self._query)
+        stage = "IXSCAN" if index else "COLLSCAN"
+        plan = {"stage": "FETCH", "inputStage": {"stage": stage, "indexName": index}} if index else {"stage": stage}
+        return {"queryPlanner": {"winningPlan": plan}}
+
+
+class MemoryCommandCursor:
+    """Iterator over aggregation results, shaped like pymongo's CommandCursor."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self._iterator = iter(docs)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def batch_size(self, n):
+        return self
+
+    def to_list(self, length=None):
+        items = list(self)
+        return items if length is None else items[:length]
+
+    def close(self):
+        self._iterator = iter(())
+
+
+# ================== COLLECTION ==================
+class MemoryCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self._docs = {}            # _id -> document, in insertion order
+        self._ids_sorted = []      # _id sort keys, for _id range scans and sorts
+        self._ids_in_order = True  # _ids arrived in increasing order, so _docs is sorted
+        self._indexes = {}
+        self._lock = threading.RLock()
+
+    # ---------- indexes ----------
+    @_monitored("createIndexes")
+    def create_index(self, keys, name=None, unique=False, sparse=False, partialFilterExpression=None, **kwargs):
+        return self._create_index(keys, name=name, unique=unique, sparse=sparse,
+                                  partialFilterExpression=partialFilterExpression)
+
+    def _create_index(self, keys, name=None, unique=False, sparse=False, partialFilterExpression=None, **kwargs):
+        fields = _sort_spec(keys, 1)
+        name = name or _index_name(fields)
+        with self._lock:
+            if name in self._indexes:
+                return name
+            index = HashIndex(name, [field for field, _ in fields], unique=unique, sparse=sparse,
+                              partial_filter=partialFilterExpression)
+            for doc in self._docs.values():
+                index.check(doc)
+                index.add(doc)
+            self._indexes[name] = index
+        return name
+
+    def create_indexes(self, models):
+        return [self._create_index(m.document["key"], **{k: v for k, v in m.document.items() if k != "key"})
+                for m in models]
+
+    def drop_index(self, name):
+        with self._lock:
+            self._indexes.pop(name, None)
+
+    def drop_indexes(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def index_information(self):
+        info = {"_id_": {"key": [("_id", 1)]}}
+        for name, index in self._indexes.items():
+            info[name] = {"key": [(f, 1) for f in index.fields], "unique": index.unique}
+            if index.partial_filter:
+                info[name]["partialFilterExpression"] = index.partial_filter
+        return info
+
+    def list_indexes(self):
+        return iter([{"name": name, **spec} for name, spec in self.index_information().items()])
+
+    # ---------- planning ----------
+    def _plan(self, query):
+        """Pick the index that narrows `query` the most. Returns (index_name, candidate _ids)."""
+        if not query:
+            return None, None
+
+        equalities = {}
+        for key, condition in query.items():
+            if key.startswith("$"):
+                continue
+            if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+                if "$eq" in condition:
+                    equalities[key] = [condition["$eq"]]
+                elif "$in" in condition and not any(isinstance(v, re.Pattern) for v in condition["$in"]):
+                    equalities[key] = list(condition["$in"])
+            elif not isinstance(condition, (dict, list, re.Pattern)):
+                equalities[key] = [condition]
+
+        if "_id" in equalities:
+            return "_id_", {v for v in equalities["_id"] if v in self._docs}
+
+        indexes = [index for index in self._indexes.values() if index.covers(query)]
+        best = None
+        for index in indexes:
+            if all(field in equalities for field in index.fields):
+                ids = index.lookup([equalities[field] for field in index.fields])
+                if best is None or len(ids) < len(best[1]):
+                    best = (index.name, ids)
+        if best:
+            return best
+
+        # Otherwise the index with the longest run of leading equality fields
+        prefix = None
+        for index in indexes:
+            width = 0
+            while width < len(index.fields) and index.fields[width] in equalities:
+                width += 1
+            if width and (prefix is None or width > prefix[1]):
+                prefix = (index, width)
+        if prefix:
+            index, width = prefix
+            return index.name, index.lookup_prefix([equalities[field] for field in index.fields[:width]])
+
+        id_range = query.get("_id")
+        if isinstance(id_range, dict) and set(id_range) & set(_COMPARATORS):
+            return "_id_", None
+        return None, None
+
+    def _candidates(self, query, sort=None):
+        """Documents that may match, using an index or the sorted _id list when possible."""
+        index, ids = self._plan(query)
+        if ids is not None:
+            docs = [self._docs[i] for i in ids if i in self._docs]
+            if sort is None and self._ids_in_order:
+                docs.sort(key=lambda d: _sort_key(d["_id"]))
+            return docs, False
+
+        id_range = (query or {}).get("_id")
+        if isinstance(id_range, dict) and set(id_range) & set(_COMPARATORS) and self._ids_in_order:
+            lo, hi = 0, len(self._ids_sorted)
+            for op, target in id_range.items():
+                key = _sort_key(target)
+                if op == "$gt":
+                    lo = max(lo, bisect_right(self._ids_sorted, key))
+                elif op == "$gte":
+                    lo = max(lo, bisect_left(self._ids_sorted, key))
+                elif op == "$lt":
+                    hi = min(hi, bisect_left(self._ids_sorted, key))
+                elif op == "$lte":
+                    hi = min(hi, bisect_right(self._ids_sorted, key))
+            # _docs is in _id order here, so the range is a contiguous slice of it
+            return islice(self._docs.values(), lo, max(lo, hi)), True
+
+        return self._docs.values(), self._ids_in_order
+
+    def _run_find(self, query, projection=None, sort=None, skip=0, limit=0):
+        with self._lock:
+            match = compile_filter(query)
+            candidates, id_ordered = self._candidates(query, sort)
+
+            id_sort = sort is not None and len(sort) == 1 and sort[0][0] == "_id"
+            if sort and not (id_sort and id_ordered):
+                docs = (d for d in candidates if match(d))
+                if limit:
+                    key = _doc_sort_key(sort)
+                    matched = heapq.nsmallest(skip + limit, docs, key=key)
+                else:
+                    matched = sorted(docs, key=_doc_sort_key(sort))
+                matched = matched[skip:]
+            else:
+                if id_sort and sort[0][1] == -1:
+                    candidates = reversed(candidates if hasattr(candidates, "__reversed__") else list(candidates))
+                matched = []
+                skipped = 0
+                for doc in candidates:
+                    if not match(doc):
+                        continue
+                    if skipped < skip:
+                        skipped += 1
+                        continue
+                    matched.append(doc)
+                    if limit and len(matched) >= limit:
+                        break
+
+            if limit:
+                matched = matched[:limit]
+            return [apply_projection(d, projection) for d in matched]
+
+    # ---------- reads ----------
+    @_monitored("find")
+    def _find_batch(self, query, projection, sort, skip, limit):
+        # Everything comes back in the first batch; there are no getMores
+        return self._run_find(query, projection, sort, skip, limit)
+
+    def find(self, filter=None, projection=None, **kwargs):
+        cursor = MemoryCursor(self, filter, projection)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("skip"):
+            cursor.skip(kwargs["skip"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        return cursor
+
+    @_monitored("find")
+    def find_one(self, filter=None, projection=None, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        results = self._run_find(filter, projection, _sort_spec(kwargs["sort"]) if kwargs.get("sort") else None,
+                                 0, 1)
+        return results[0] if results else None
+
+    @_monitored("aggregate")
+    def count_documents(self, filter=None, limit=0, skip=0, **kwargs):
+        count = max(0, self._count(filter) - skip)
+        return min(count, limit) if limit else count
+
+    def _count(self, filter):
+        with self._lock:
+            if not filter:
+                count = len(self._docs)
+            else:
+                index, ids = self._plan(filter)
+                if ids is not None and len(filter) == 1 and not next(iter(filter)).startswith("$"):
+                    count = len(ids)
+                else:
+                    match = compile_filter(filter)
+                    candidates, _ = self._candidates(filter)
+                    count = sum(1 for d in candidates if match(d))
+        return count
+
+    @_monitored("count")
+    def estimated_document_count(self, **kwargs):
+        return len(self._docs)
+
+    @_monitored("distinct")
+    def distinct(self, key, filter=None):
+        seen = []
+        for doc in self._run_find(filter, None):
+            for value in _expand(_get_path(doc, key)):
+                if value is not _MISSING and not isinstance(value, list) and value not in seen:
+                    seen.append(value)
+        return seen
+
+    # ---------- writes ----------
+    def _insert(self, doc):
+        doc = _clone(doc)
+        doc_id = doc.get("_id", _MISSING)
+        if doc_id is _MISSING:
+            doc_id = doc["_id"] = ObjectId()
+        elif doc_id in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error index: _id_ dup key: {doc_id}", 11000)
+        indexes = self._indexes.values()
+        for index in indexes:
+            if index.unique:
+                index.check(doc)
+        for index in indexes:
+            index.add(doc)
+        self._docs[doc_id] = doc
+
+        key = _sort_key(doc_id)
+        if not self._ids_sorted or key > self._ids_sorted[-1]:
+            self._ids_sorted.append(key)
+        else:
+            insort(self._ids_sorted, key)
+            self._ids_in_order = False
+        return doc_id
+
+    @_monitored("insert")
+    def insert_one(self, document, **kwargs):
+        with self._lock:
+            inserted_id = self._insert(document)
+        document.setdefault("_id", inserted_id)
+        return InsertOneResult(inserted_id, True)
+
+    @_monitored("insert")
+    def insert_many(self, documents, ordered=True, **kwargs):
+        inserted, errors = [], []
+        with self._lock:
+            for position, document in enumerate(documents):
+                try:
+                    inserted_id = self._insert(document)
+                except DuplicateKeyError as e:
+                    errors.append({"index": position, "code": 11000, "errmsg": str(e), "op": document,
+                                   **(e.details or {})})
+                    if ordered:
+                        break
+                    continue
+                document.setdefault("_id", inserted_id)
+                inserted.append(inserted_id)
+        if errors:
+            raise BulkWriteError({
+                "writeErrors": errors, "writeConcernErrors": [], "nInserted": len(inserted),
+                "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []
+            })
+        return InsertManyResult(inserted, True)
+
+    def _replace_in_indexes(self, old, new):
+        for index in self._indexes.values():
+            index.check(new, ignore_id=new["_id"])
+        for index in self._indexes.values():
+            index.remove(old)
+            index.add(new)
+
+    def _update(self, filter, update, upsert=False, multi=False, sort=None, array_filters=None):
+        """Returns (matched, modified, upserted_id, before_doc, after_doc) for the first match."""
+        with self._lock:
+            targets = self._run_find(filter, {"_id": 1}, sort, 0, 0 if multi else 1)
+            if not targets and upsert:
+                doc = _seed_from_filter(filter)
+                doc.setdefault("_id", ObjectId())
+                apply_update(doc, update, inserting=True)
+                self._insert(doc)
+                return 0, 0, doc["_id"], None, _clone(self._docs[doc["_id"]])
+
+            matched = modified = 0
+            first_before = first_after = None
+            for target in targets:
+                current = self._docs[target["_id"]]
+                updated = _clone(current)
+                changed = apply_update(updated, update)
+                if first_before is None:
+                    first_before = _clone(current)
+                if changed:
+                    self._replace_in_indexes(current, updated)
+                    self._docs[updated["_id"]] = updated
+                    modified += 1
+                if first_after is None:
+                    first_after = _clone(updated)
+                matched += 1
+            return matched, modified, None, first_before, first_after
+
+    @staticmethod
+    def _update_result(matched, modified, upserted_id):
+        raw = {"n": matched + (1 if upserted_id is not None else 0), "nModified": modified, "ok": 1.0}
+        if upserted_id is not None:
+            raw["upserted"] = upserted_id
+        return UpdateResult(raw, True)
+
+    @_monitored("update")
+    def update_one(self, filter, update, upsert=False, **kwargs):
+        matched, modified, upserted_id, _, _ = self._update(filter, update, upsert=upsert)
+        return self._update_result(matched, modified, upserted_id)
+
+    @_monitored("update")
+    def update_many(self, filter, update, upsert=False, **kwargs):
+        matched, modified, upserted_id, _, _ = self._update(filter, update, upsert=upsert, multi=True)
+        return self._update_result(matched, modified, upserted_id)
+
+    @_monitored("update")
+    def replace_one(self, filter, replacement, upsert=False, **kwargs):
+        matched, modified, upserted_id, _, _ = self._update(filter, replacement, upsert=upsert)
+        return self._update_result(matched, modified, upserted_id)
+
+    @_monitored("findAndModify")
+    def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False,
+                            return_document=ReturnDocument.BEFORE, **kwargs):
+        spec = _sort_spec(sort) if sort else None
+        _, _, _, before, after = self._update(filter, update, upsert=upsert, sort=spec)
+        doc = after if return_document == ReturnDocument.AFTER else before
+        return None if doc is None else apply_projection(doc, projection)
+
+    @_monitored("findAndModify")
+    def find_one_and_delete(self, filter, projection=None, sort=None, **kwargs):
+        with self._lock:
+            found = self._run_find(filter, None, _sort_spec(sort) if sort else None, 0, 1)
+            if not found:
+                return None
+            self._delete(found[0]["_id"])
+        return apply_projection(found[0], projection)
+
+    def _delete(self, doc_id):
+        doc = self._docs.pop(doc_id)
+        for index in self._indexes.values():
+            index.remove(doc)
+        key = _sort_key(doc_id)
+        position = bisect_left(self._ids_sorted, key)
+        if position < len(self._ids_sorted) and self._ids_sorted[position] == key:
+            del self._ids_sorted[position]
+
+    def _delete_matching(self, filter, multi):
+        with self._lock:
+            found = self._run_find(filter, {"_id": 1}, None, 0, 0 if multi else 1)
+            for doc in found:
+                self._delete(doc["_id"])
+        return len(found)
+
+    @_monitored("delete")
+    def delete_one(self, filter, **kwargs):
+        return DeleteResult({"n": self._delete_matching(filter, False), "ok": 1.0}, True)
+
+    @_monitored("delete")
+    def delete_many(self, filter, **kwargs):
+        return DeleteResult({"n": self._delete_matching(filter, True), "ok": 1.0}, True)
+
+    @_monitored("bulkWrite")
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        """Runs InsertOne/UpdateOne/UpdateMany/ReplaceOne/DeleteOne/DeleteMany models."""
+        counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0}
+        errors, upserted = [], []
+        for position, request in enumerate(requests):
+            kind = type(request).__name__
+            doc = request._doc if hasattr(request, "_doc") else None
+            try:
+                if kind == "InsertOne":
+                    with self._lock:
+                        doc.setdefault("_id", self._insert(doc))
+                    counts["nInserted"] += 1
+                elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                    matched, modified, upserted_id, _, _ = self._update(
+                        request._filter, doc, upsert=bool(request._upsert), multi=kind == "UpdateMany"
+                    )
+                    counts["nMatched"] += matched
+                    counts["nModified"] += modified
+                    if upserted_id is not None:
+                        counts["nUpserted"] += 1
+                        upserted.append({"index": position, "_id": upserted_id})
+                elif kind in ("DeleteOne", "DeleteMany"):
+                    counts["nRemoved"] += self._delete_matching(request._filter, kind == "DeleteMany")
+                else:
+                    raise ValueError(f"Unsupported bulk operation {kind}")
+            except DuplicateKeyError as e:
+                errors.append({"index": position, "code": 11000, "errmsg": str(e), "op": doc, **(e.details or {})})
+                if ordered:
+                    break
+
+        result = {**counts, "upserted": upserted, "writeErrors": errors, "writeConcernErrors": []}
+        if errors:
+            raise BulkWriteError(result)
+        return _BulkWriteResult(result)
+
+    @_monitored("drop")
+    def drop(self):
+        with self._lock:
+            self._docs.clear()
+            self._ids_sorted.clear()
+            self._ids_in_order = True
+            self._indexes.clear()
+
+    # ---------- aggregation ----------
+    @_monitored("aggregate")
+    def aggregate(self, pipeline, **kwargs):
+        return MemoryCommandCursor(self._aggregate(list(pipeline)))
+
+    def _aggregate(self, pipeline):
+        docs = None
+        # A leading $match (optionally with $sort/$skip/$limit) runs through the index planner
+        if pipeline and "$match" in pipeline[0]:
+            query = pipeline.pop(0)["$match"]
+            sort = None
+            skip = limit = 0
+            while pipeline and next(iter(pipeline[0])) in ("$sort", "$skip", "$limit"):
+                stage, value = next(iter(pipeline.pop(0).items()))
+                if stage == "$sort":
+                    if skip or limit:
+                        pipeline.insert(0, {"$sort": value})
+                        break
+                    sort = _sort_spec(value)
+                elif stage == "$skip":
+                    skip += value
+                else:
+                    limit = value if not limit else min(limit, value)
+            if pipeline and next(iter(pipeline[0])) == "$count" and not (sort or skip or limit):
+                count = self._count(query)
+                return [{pipeline[0]["$count"]: count}] if count else []
+            docs = self._run_find(query, None, sort, skip, limit)
+        elif pipeline and "$facet" in pipeline[0]:
+            facets = pipeline.pop(0)["$facet"]
+            docs = [{name: self._aggregate(list(sub)) for name, sub in facets.items()}]
+        elif pipeline and "$count" in pipeline[0]:
+            count = len(self._docs)
+            docs = [{pipeline.pop(0)["$count"]: count}] if count else []
+        else:
+            docs = self._run_find({}, None)
+
+        return run_pipeline(docs, pipeline, self.database)
+
+
+class _BulkWriteResult:
+    def __init__(self, raw):
+        self.bulk_api_result = raw
+        self.acknowledged = True
+        self.inserted_count = raw["nInserted"]
+        self.matched_count = raw["nMatched"]
+        self.modified_count = raw["nModified"]
+        self.deleted_count = raw["nRemoved"]
+        self.upserted_count = raw["nUpserted"]
+        self.upserted_ids = {u["index"]: u["_id"] for u in raw["upserted"]}
+
+
+def _group(docs, spec):
+    key_expr = spec["_id"]
+    groups = {}
+    for doc in docs:
+        key = evaluate_expression(key_expr, doc)
+        state = groups.setdefault(_freeze(key), {"_id": key})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            op, expr = next(iter(accumulator.items()))
+            value = evaluate_expression(expr, doc)
+            if op == "$sum":
+                state[field] = state.get(field, 0) + (value if isinstance(value, (int, float)) else 0)
+            elif op == "$count":
+                state[field] = state.get(field, 0) + 1
+            elif op == "$min":
+                state[field] = value if field not in state else min(state[field], value, key=_sort_key)
+            elif op == "$max":
+                state[field] = value if field not in state else max(state[field], value, key=_sort_key)
+            elif op == "$push":
+                state.setdefault(field, []).append(value)
+            elif op == "$addToSet":
+                bucket = state.setdefault(field, [])
+                if value not in bucket:
+                    bucket.append(value)
+            elif op == "$first":
+                state.setdefault(field, value)
+            elif op == "$last":
+                state[field] = value
+            elif op == "$avg":
+                total, n = state.get(field + "__avg", (0, 0))
+                state[field + "__avg"] = (total + (value or 0), n + 1)
+            else:
+                raise ValueError(f"Unsupported accumulator {op}")
+    results = []
+    for state in groups.values():
+        for field in [f for f in state if f.endswith("__avg")]:
+            total, n = state.pop(field)
+            state[field[:-5]] = total / n if n else None
+        results.append(state)
+    return results
+
+
+def run_pipeline(docs, pipeline, database):
+    """Apply aggregation stages to an in-memory list of documents."""
+    for stage in pipeline:
+        name, spec = next(iter(stage.items()))
+        if name == "$match":
+            match = compile_filter(spec)
+            docs = [d for d in docs if match(d)]
+        elif name == "$project":
+            computed = {k: v for k, v in spec.items() if not isinstance(v, (int, bool))}
+            plain = {k: v for k, v in spec.items() if isinstance(v, (int, bool))}
+            projected = []
+            for doc in docs:
+                out = apply_projection(doc, plain) if plain else ({"_id": doc.get("_id")} if computed else _clone(doc))
+                for key, expr in computed.items():
+                    _set_path(out, key, evaluate_expression(expr, doc))
+                projected.append(out)
+            docs = projected
+        elif name == "$addFields" or name == "$set":
+            for doc in docs:
+                for key, expr in spec.items():
+                    _set_path(doc, key, evaluate_expression(expr, doc))
+        elif name == "$sort":
+            docs = sorted(docs, key=_doc_sort_key(_sort_spec(spec)))
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$facet":
+            docs = [{facet: run_pipeline([_clone(d) for d in docs], sub, database)
+                     for facet, sub in spec.items()}]
+        elif name == "$group":
+            docs = _group(docs, spec)
+        elif name == "$unwind":
+            path = (spec if isinstance(spec, str) else spec["path"])[1:]
+            unwound = []
+            for doc in docs:
+                for value in _first(doc, path) or []:
+                    item = _clone(doc)
+                    _set_path(item, path, value)
+                    unwound.append(item)
+            docs = unwound
+        elif name == "$lookup":
+            foreign = database[spec["from"]]
+            for doc in docs:
+                local = _first(doc, spec["localField"])
+                values = local if isinstance(local, list) else [local]
+                doc[spec["as"]] = foreign._run_find({spec["foreignField"]: {"$in": values}}) \
+                    if local is not None else []
+        else:
+            raise ValueError(f"Unsupported aggregation stage {name}")
+    return docs
+
+
+# ================== DATABASE / CLIENT ==================
+class MemoryDatabase:
+    def __init__(self, name="hospital_db", client=None):
+        self.name = name
+        self.client = client
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.setdefault(name, MemoryCollection(self, name))
+        return collection
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def command_listeners(self):
+        return self.client.command_listeners if self.client is not None else ()
+
+    def get_collection(self, name, **kwargs):
+        return self[name]
+
+    def list_collection_names(self, **kwargs):
+        return list(self._collections)
+
+    def drop_collection(self, name):
+        with self._lock:
+            self._collections.pop(getattr(name, "name", name), None)
+
+    def command(self, command, *args, **kwargs):
+        name = command if isinstance(command, str) else next(iter(command))
+        if name in ("ping", "buildInfo", "buildinfo"):
+            return {"ok": 1.0, "version": "memory"}
+        if name == "dbStats":
+            return {"ok": 1.0, "collections": len(self._collections),
+                    "objects": sum(len(c._docs) for c in self._collections.values())}
+        raise ValueError(f"Unsupported command {name}")
+
+
+# One shared set of databases per process, like a server behind every client
+_DATABASES = {}
+_DATABASES_LOCK = threading.Lock()
+
+
+class MemoryClient:
+    """Drop-in for MongoClient; all clients in a process see the same data."""
+
+    def __init__(self, *args, event_listeners=None, **kwargs):
+        self.address = ("memory", 0)
+        self.command_listeners = [
+            listener for listener in (event_listeners or [])
+            if isinstance(listener, monitoring.CommandListener)
+        ]
+
+    def __getitem__(self, name):
+        with _DATABASES_LOCK:
+            if name not in _DATABASES:
+                _DATABASES[name] = MemoryDatabase(name, self)
+            database = _DATABASES[name]
+            database.client = self  # the newest client's listeners (e.g. after a fork) get the events
+            return database
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_database(self, name, **kwargs):
+        return self[name]
+
+    def server_info(self):
+        return {"version": "memory", "ok": 1.0}
+
+    def list_database_names(self):
+        return list(_DATABASES)
+
+    def drop_database(self, name):
+        with _DATABASES_LOCK:
+            _DATABASES.pop(getattr(name, "name", name), None)
+
+    def close(self):
+        pass
+
+
+# ================== ASYNC ==================
+class AsyncMemoryCursor:
+    """MemoryCursor / MemoryCommandCursor with pymongo's async cursor interface."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if name in ("sort", "skip", "limit", "batch_size", "hint"):
+            return lambda *args, **kwargs: (attr(*args, **kwargs), self)[1]
+        return attr
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        return self._cursor.to_list(length)
+
+    async def close(self):
+        self._cursor.close()
+
+
+class AsyncMemoryCollection:
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+
+    def find(self, *args, **kwargs):
+        return AsyncMemoryCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, pipeline, **kwargs):
+        return AsyncMemoryCursor(self._collection.aggregate(pipeline, **kwargs))
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class AsyncMemoryDatabase:
+    def __init__(self, database):
+        self._database = database
+        self.name = database.name
+
+    def __getitem__(self, name):
+        return AsyncMemoryCollection(self._database[name])
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command, *args, **kwargs):
+        return self._database.command(command, *args, **kwargs)
+
+
+class AsyncMemoryClient:
+    """Drop-in for AsyncMongoClient over the same in-process data as MemoryClient (asgi.py on memory://)."""
+
+    def __init__(self, *args, event_listeners=None, **kwargs):
+        self._client = MemoryClient(event_listeners=event_listeners)
+
+    def __getitem__(self, name):
+        return AsyncMemoryDatabase(self._client[name])
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def close(self):
+        self._client.close()
@@ -0,0 +1,288 @@
+"""Per-request Mongo command accounting and Prometheus metrics.
+
+A pymongo CommandListener attributes every command to the Flask request that
+issued it (queries, documents returned, DB time). init_metrics(app) times
+each request, flags routes whose requests repeat one command more than
+N_PLUS_ONE_THRESHOLD times, and serves everything at /metrics in the
+Prometheus text format.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+
+from flask import Response, g, has_request_context, request
+from pymongo import monitoring
+
+from app.utils.logs import get_logger
+from app.utils.mongo import mongo
+
+log = get_logger(__name__)
+
+# A request repeating the same command on the same collection more often than this is an N+1 suspect
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+# Prometheus' default buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Recent command durations kept for /health percentiles
+DB_LATENCY_WINDOW = int(os.getenv("DB_LATENCY_WINDOW", "1000"))
+# /health reports "degraded" when a ping takes longer than this
+HEALTH_PING_DEGRADED_MS = float(os.getenv("HEALTH_PING_DEGRADED_MS", "100"))
+
+
+def _documents_in(reply):
+    """Documents carried by a command reply (find/getMore batches, findAndModify value)."""
+    if not isinstance(reply, dict):
+        return 0
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if "value" in reply:
+        return 1 if reply["value"] is not None else 0
+    return 0
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {running}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.total:.6f}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = Counter()
+        self.queries = 0
+        self.documents = 0
+        self.db_seconds = 0.0
+        self.n_plus_one = 0
+
+
+class RequestMetrics(monitoring.CommandListener):
+    """Command listener plus the per-route registry behind /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes = {}
+        self.commands = {}
+        self._recent = deque(maxlen=DB_LATENCY_WINDOW)
+
+    # ---------- pymongo events ----------
+    def started(self, event):
+        if has_request_context():
+            stats = g.get("mongo_stats")
+            if stats is None:
+                return
+            stats["queries"] += 1
+            collection = event.command.get(event.command_name) if isinstance(event.command, dict) else None
+            stats["shapes"][(event.command_name, collection if isinstance(collection, str) else None)] += 1
+
+    def succeeded(self, event):
+        self._finish(event, _documents_in(event.reply))
+
+    def failed(self, event):
+        self._finish(event, 0)
+
+    def _finish(self, event, documents):
+        seconds = event.duration_micros / 1e6
+        with self._lock:
+            histogram = self.commands.get(event.command_name)
+            if histogram is None:
+                histogram = self.commands[event.command_name] = Histogram()
+            histogram.observe(seconds)
+            self._recent.append(seconds)
+        if has_request_context():
+            stats = g.get("mongo_stats")
+            if stats is not None:
+                stats["documents"] += documents
+                stats["micros"] += event.duration_micros
+
+    # ---------- requests ----------
+    def _route(self, method, rule):
+        key = (method, rule)
+        stats = self.routes.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self.routes.setdefault(key, RouteStats())
+        return stats
+
+    def observe_request(self, method, rule, status, seconds, mongo_stats):
+        stats = self._route(method, rule)
+        suspect = None
+        with self._lock:
+            stats.latency.observe(seconds)
+            stats.statuses[status] += 1
+            if mongo_stats and mongo_stats["queries"]:
+                stats.queries += mongo_stats["queries"]
+                stats.documents += mongo_stats["documents"]
+                stats.db_seconds += mongo_stats["micros"] / 1e6
+                shape, repeats = mongo_stats["shapes"].most_common(1)[0]
+                if repeats > N_PLUS_ONE_THRESHOLD:
+                    stats.n_plus_one += 1
+                    suspect = (shape, repeats)
+        if suspect:
+            (command, collection), repeats = suspect
+            log.warning("N+1 suspect: %s %s sent %s on %s %dx in one request", method, rule, command,
+                        collection, repeats,
+                        extra={"event": "mongo.n_plus_one", "route": rule, "command": command,
+                               "collection": collection, "repeats": repeats})
+
+    # ---------- reporting ----------
+    def db_latency(self):
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return {"samples": 0, "p50Ms": None, "p95Ms": None, "maxMs": None}
+        return {
+            "samples": len(recent),
+            "p50Ms": round(recent[len(recent) // 2] * 1000, 3),
+            "p95Ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 3),
+            "maxMs": round(recent[-1] * 1000, 3),
+        }
+
+    def route_summary(self):
+        with self._lock:
+            return {
+                f"{method} {rule}": {
+                    "requests": stats.latency.count,
+                    "queriesPerRequest": round(stats.queries / stats.latency.count, 2) if stats.latency.count else 0,
+                    "nPlusOneFlagged": stats.n_plus_one,
+                }
+                for (method, rule), stats in self.routes.items()
+            }
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        out = []
+        with self._lock:
+            routes = sorted(self.routes.items())
+            commands = sorted(self.commands.items())
+
+            out += ["# HELP http_request_duration_seconds Request latency by route.",
+                    "# TYPE http_request_duration_seconds histogram"]
+            for (method, rule), stats in routes:
+                out.extend(stats.latency.lines("http_request_duration_seconds", _labels(method=method, route=rule)))
+
+            out += ["# HELP http_requests_total Requests by route and status.",
+                    "# TYPE http_requests_total counter"]
+            for (method, rule), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    out.append(f"http_requests_total{{{_labels(method=method, route=rule, status=status)}}} {count}")
+
+            for name, help_text, attr in (
+                ("mongo_request_queries_total", "Mongo commands issued while serving the route.", "queries"),
+                ("mongo_request_documents_total", "Documents returned to the route by Mongo.", "documents"),
+                ("mongo_request_db_seconds_total", "Time the route spent waiting on Mongo.", "db_seconds"),
+                ("mongo_n_plus_one_requests_total", "Requests that repeated one command past the threshold.",
+                 "n_plus_one"),
+            ):
+                out += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (method, rule), stats in routes:
+                    value = getattr(stats, attr)
+                    value = f"{value:.6f}" if isinstance(value, float) else value
+                    out.append(f"{name}{{{_labels(method=method, route=rule)}}} {value}")
+
+            out += ["# HELP mongo_command_duration_seconds Mongo command latency by command.",
+                    "# TYPE mongo_command_duration_seconds histogram"]
+            for command, histogram in commands:
+                out.extend(histogram.lines("mongo_command_duration_seconds", _labels(command=command)))
+
+        pool = mongo.stats()
+        for name, key, kind in (
+            ("mongo_pool_connections_open", "open", "gauge"),
+            ("mongo_pool_connections_checked_out", "checkedOut", "gauge"),
+            ("mongo_pool_waiters", "waiting", "gauge"),
+            ("mongo_pool_checkout_failures_total", "checkoutFailures", "counter"),
+            ("mongo_pool_cleared_total", "cleared", "counter"),
+        ):
+            out += [f"# TYPE {name} {kind}", f"{name} {pool[key]}"]
+        out += ["# TYPE mongo_pool_max_size gauge", f"mongo_pool_max_size {pool['maxPoolSize']}"]
+        return "\n".join(out) + "\n"
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Registered before the client is built; shared by every app in the process
+request_metrics = RequestMetrics()
+mongo.add_listener(request_metrics)
+
+
+def database_health():
+    """Live ping, recent command latency and pool state. status: healthy | degraded | unhealthy."""
+    try:
+        ping_ms = round(mongo.ping() * 1000, 3)
+        error = None
+    except Exception as e:
+        ping_ms, error = None, str(e)
+
+    pool = mongo.stats()
+    if error:
+        status = "unhealthy"
+    elif ping_ms > HEALTH_PING_DEGRADED_MS or pool["waiting"] > 0:
+        status = "degraded"
+    else:
+        status = "healthy"
+
+    report = {
+        "status": status,
+        "pingMs": ping_ms,
+        "commandLatency": request_metrics.db_latency(),
+        "pool": pool,
+    }
+    if error:
+        report["error"] = error
+    return report
+
+
+def metrics_view():
+    return Response(request_metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app):
+    """Time every request, attribute its Mongo commands, and serve /metrics."""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.mongo_stats = {"queries": 0, "documents": 0, "micros": 0, "shapes": Counter()}
+
+    # Recorded when the response is closed, i.e. after a streamed body has
+    # been generated, so queries made while streaming count too
+    @app.after_request
+    def record_on_close(response):
+        started = g.get("request_started")
+        if started is not None:
+            method = request.method
+            rule = request.url_rule.rule if request.url_rule is not None else "(unmatched)"
+            status, mongo_stats = response.status_code, g.mongo_stats
+            response.call_on_close(lambda: request_metrics.observe_request(
+                method, rule, status, time.perf_counter() - started, mongo_stats
+            ))
+        return response
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+    return app
@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+
+from pymongo import MongoClient, monitoring
+from pymongo.collection import Collection
+
+from app.utils.memory_store import MemoryClient, MemoryCollection
+
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+MONGODB_DB = os.getenv("MONGODB_DB", "hospital_db")
+# MONGODB_URI=memory:// serves everything from the in-process store (dev, load tests)
+MEMORY_URI = "memory://"
+# Development only: switch to the in-memory store when MONGODB_URI is unreachable.
+# Off by default, so a real deployment stays not-ready (503) and keeps retrying instead.
+MONGODB_MEMORY_FALLBACK = os.getenv("MONGODB_MEMORY_FALLBACK", "").lower() in ("1", "true", "yes")
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo's CMAP events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.checked_out = 0
+            self.waiting = 0
+            self.checkout_failures = 0
+            self.cleared = 0
+
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "open": self.open,
+                "checkedOut": self.checked_out,
+                "waiting": self.waiting,
+                "checkoutFailures": self.checkout_failures,
+                "cleared": self.cleared
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add(cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add(open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(open=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._add(checked_out=-1)
+
+
+class MongoConnectionManager:
+    """The one MongoClient for the process.
+
+    The client is built on first use and rebuilt if the process id changes,
+    so workers forked from a pre-loaded parent never share its sockets.
+    """
+
+    def __init__(self, uri=MONGODB_URI, db_name=MONGODB_DB):
+        self.uri = uri
+        self.db_name = db_name
+        self.max_pool_size = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+        self.min_pool_size = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+        self.wait_queue_timeout_ms = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+        self.server_selection_timeout_ms = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+        self.read_preference = os.getenv("MONGO_READ_PREFERENCE", "primary")
+        self.pool_stats = PoolStats()
+        self._client = None
+        self._collections = {}
+        self._pid = None
+        self._lock = threading.Lock()
+        self._extra_listeners = []
+
+    def add_listener(self, listener):
+        """Register a pymongo event listener. An existing client is rebuilt on next use to pick it up."""
+        self._extra_listeners.append(listener)
+        if self._client is not None:
+            self.close()
+
+    @property
+    def client(self):
+        if self._client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    self._connect()
+        return self._client
+
+    def client_options(self):
+        """MongoClient keyword arguments; also used for the async client in asgi.py."""
+        return {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "readPreference": self.read_preference,
+            "event_listeners": [self.pool_stats] + self._extra_listeners
+        }
+
+    def _connect(self):
+        # Drop (without closing) a client inherited from the parent process
+        self._collections = {}
+        self.pool_stats.reset()
+        if self.uses_memory_engine:
+            self._client = MemoryClient(event_listeners=self.client_options()["event_listeners"])
+        else:
+            self._client = MongoClient(self.uri, **self.client_options())
+        self._pid = os.getpid()
+
+    @property
+    def uses_memory_engine(self):
+        return self.uri.startswith(MEMORY_URI)
+
+    def use_memory_engine(self):
+        """Switch the process over to the in-memory store (MONGODB_MEMORY_FALLBACK, when MongoDB is unreachable)."""
+        with self._lock:
+            self.uri = MEMORY_URI
+            self._client = None
+            self._collections = {}
+
+    def database(self):
+        return self.client[self.db_name]
+
+    def collection(self, name):
+        client = self.client
+        coll = self._collections.get(name)
+        if coll is None:
+            coll = self._collections[name] = client[self.db_name][name]
+        return coll
+
+    def ping(self):
+        """Round-trip a ping to the server; returns the latency in seconds."""
+        started = time.perf_counter()
+        self.database().command("ping")
+        return time.perf_counter() - started
+
+    def lazy_database(self):
+        return LazyDatabase(self)
+
+    def stats(self):
+        return {
+            "engine": "memory" if self.uses_memory_engine else "mongodb",
+            "maxPoolSize": self.max_pool_size,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "readPreference": self.read_preference,
+            "pid": self._pid,
+            **self.pool_stats.snapshot()
+        }
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._collections = {}
+
+
+class LazyCollection:
+    """Stand-in for a Collection that resolves the live client on every call."""
+
+    def __init__(self, manager, name):
+        self._manager = manager
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._manager.collection(self.name), attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self.name!r})"
+
+
+class LazyDatabase:
+    """Stand-in for a Database; safe to create at import time, before any fork."""
+
+    def __init__(self, manager):
+        self._manager = manager
+
+    def __getitem__(self, name):
+        return LazyCollection(self._manager, name)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        value = getattr(self._manager.database(), attr)
+        if isinstance(value, (Collection, MemoryCollection)):
+            return LazyCollection(self._manager, attr)
+        return value
+
+
+# Shared by app.py, admin_bp.py and the models
+mongo = MongoConnectionManager()
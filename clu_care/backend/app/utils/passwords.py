@@ -0,0 +1,146 @@
+import asyncio
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import bcrypt
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Every stored password is (re)hashed with this werkzeug method
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# Hash/verify jobs allowed in flight before new requests are turned away
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "5"))
+# Share of those slots bulk jobs (hash_many, e.g. imports) may hold; the rest stay free for logins
+PASSWORD_HASH_BULK_SHARE = float(os.getenv("PASSWORD_HASH_BULK_SHARE", "0.5"))
+
+# Pool processes come from a fork server rather than a fork of the (multi-threaded)
+# worker, which could copy a lock some other thread held and deadlock the child.
+# The server preloads only this module, not the app.
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_MP_CONTEXT = multiprocessing.get_context(_START_METHOD)
+if _START_METHOD == "forkserver":
+    _MP_CONTEXT.set_forkserver_preload([__name__])
+
+WERKZEUG_PREFIXES = ("scrypt:", "pbkdf2:")
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool is saturated; callers should answer 503."""
+
+
+def hash_password(password, method=PASSWORD_HASH_METHOD):
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(stored, password):
+    """Check a password against a werkzeug hash, a bcrypt hash or a legacy plain-text value."""
+    if stored.startswith(WERKZEUG_PREFIXES):
+        return check_password_hash(stored, password)
+    if stored.startswith(BCRYPT_PREFIXES):
+        return bcrypt.checkpw(password.encode("utf-8"), stored.encode("utf-8"))
+    return hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+
+
+def is_plain_text(stored):
+    return not stored.startswith(WERKZEUG_PREFIXES + BCRYPT_PREFIXES)
+
+
+def needs_rehash(stored):
+    return not stored.startswith(PASSWORD_HASH_METHOD + ":")
+
+
+class PasswordHasher:
+    """Runs KDF work on a process pool so it never blocks request threads.
+
+    The pool is created lazily in the process that first uses it (and again
+    after a fork), and at most `max_pending` jobs may be queued at once. Bulk
+    jobs wait for a slot instead of failing, but never hold more than
+    `bulk_share` of them, so an import cannot turn logins away.
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING,
+                 timeout=PASSWORD_HASH_TIMEOUT, bulk_share=PASSWORD_HASH_BULK_SHARE):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._bulk_slots = threading.BoundedSemaphore(max(1, min(max_pending - 1, int(max_pending * bulk_share))))
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def verify(self, stored, password):
+        if is_plain_text(stored):
+            # No KDF involved, so not worth a trip to the pool
+            return verify_password(stored, password)
+        return self._run(verify_password, stored, password)
+
+    async def verify_async(self, stored, password):
+        if is_plain_text(stored):
+            return verify_password(stored, password)
+        return await self._run_async(verify_password, stored, password)
+
+    async def hash_async(self, password):
+        return await self._run_async(hash_password, password)
+
+    def hash_many(self, passwords):
+        """Hash a batch on the pool for bulk jobs: waits for a bulk slot instead of raising HashingBusy."""
+        futures = [self._submit(hash_password, password, bulk=True) for password in passwords]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_MP_CONTEXT)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _submit(self, fn, *args, bulk=False):
+        # Slots are held until the job finishes, even if the caller stops waiting
+        if bulk:
+            self._bulk_slots.acquire()
+            self._slots.acquire()
+        elif not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+
+        def release(_=None):
+            self._slots.release()
+            if bulk:
+                self._bulk_slots.release()
+
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            release()
+            raise
+        future.add_done_callback(release)
+        return future
+
+    def _run(self, fn, *args):
+        try:
+            return self._submit(fn, *args).result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HashingBusy()
+
+    async def _run_async(self, fn, *args):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self._submit(fn, *args)), self.timeout)
+        except asyncio.TimeoutError:
+            raise HashingBusy()
+
+
+password_hasher = PasswordHasher()
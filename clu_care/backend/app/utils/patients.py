@@ -0,0 +1,322 @@
+"""Patient documents and bulk import.
+
+new_patient() applies the defaults every new patient gets (status from
+type, admissionDate, a sequential patientId from patient_ids); add_patient
+and the importer both use it.
+
+import_patients() takes rows from read_csv()/read_ndjson(), which stream a
+file line by line, and writes them in batches: one unordered insert_many for
+the batch's email identities and one for the patients. Inpatients claim a
+caseload slot with claim_doctor() first, exactly as add_patient does: the
+requested doctor if they have room, else the least-loaded doctor in the
+specialty. Rows that fail validation, a claim or a write are reported by
+number and skipped; the rest of the batch still goes in.
+"""
+import csv
+import datetime
+import json
+import os
+import shutil
+import time
+import uuid
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.utils.assignment import claim_doctor, release_doctor
+from app.utils.bed_index import bed_key
+from app.utils.identity import normalize_email, patient_email
+from app.utils.ids import COUNTERS_COLLECTION, IdAllocator, run_once, seed_counter
+from app.utils.mongo import mongo
+from app.utils.passwords import is_plain_text, password_hasher
+
+# Uploads are spooled to <repo>/uploads/imports (or IMPORT_UPLOAD_DIR) while they are imported
+DEFAULT_UPLOAD_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "uploads", "imports")
+)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_BATCH_SIZE = 10_000
+# Per-row errors listed in an import report; the rest are only counted
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+
+PATIENT_TYPES = ("IPD", "OPD")
+_INT_FIELDS = ("age", "wardNumber", "cartNumber")
+
+# P-0000001, P-0000002, ... shared by every worker through the counters collection
+patient_ids = IdAllocator(mongo.lazy_database()[COUNTERS_COLLECTION], "patientId", "P-")
+
+
+def save_upload(stream, extension, chunk_size=1 << 20):
+    """Copy an uploaded file to the import directory chunk by chunk; returns its path."""
+    directory = os.getenv("IMPORT_UPLOAD_DIR", DEFAULT_UPLOAD_DIR)
+    os.makedirs(directory, exist_ok=True)
+    name = f"patients-{datetime.datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}.{extension}"
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(stream, f, chunk_size)
+    return path
+
+
+def new_patient(data, password=None, now=None, patient_id=None):
+    """A new patient document from request/import fields; `password` must already be hashed."""
+    patient_type = data.get("type", "OPD")
+    # Valid beds are stored as ints so the unique bed index compares like with like
+    bed = bed_key(data.get("wardNumber"), data.get("cartNumber"))
+    return {
+        "_id": ObjectId(),
+        "patientId": patient_id or patient_ids.next(),
+        "name": data.get("name"),
+        "age": data.get("age"),
+        "gender": data.get("gender"),
+        "bloodGroup": data.get("bloodGroup"),
+        "type": patient_type,
+        "medicalSpecialty": data.get("medicalSpecialty"),
+        "description": data.get("description"),
+        "password": password,
+        "contact": data.get("contact", {}),
+        "insurance": data.get("insurance", {}),
+        "status": "admitted" if patient_type == "IPD" else "registered",
+        "admissionDate": (now or datetime.datetime.now()) if patient_type == "IPD" else None,
+        "assignedDoctor": ObjectId(data["assignedDoctor"]) if data.get("assignedDoctor") else None,
+        "wardNumber": bed[0] if bed else data.get("wardNumber"),
+        "cartNumber": bed[1] if bed else data.get("cartNumber")
+    }
+
+
+def duplicate_key_message(details):
+    """Error message for a duplicate key error on a patient insert, from its keyPattern."""
+    key_pattern = (details or {}).get("keyPattern") or {}
+    if "wardNumber" in key_pattern:
+        return "Bed is already occupied"
+    return "patientId already exists"
+
+
+# ================== READERS ==================
+
+def read_csv(path):
+    """Yield one dict per data row. Dotted headers (contact.email) become nested fields."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            data = {}
+            for column, value in row.items():
+                if column is None or value is None or not value.strip():
+                    continue
+                parent, _, child = column.strip().partition(".")
+                if child:
+                    data.setdefault(parent, {})[child] = value.strip()
+                else:
+                    data[parent] = value.strip()
+            yield data
+
+
+def read_ndjson(path, loads=json.loads):
+    """Yield one object per non-blank line; a line that does not parse yields the ValueError."""
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON: {e}")
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+# ================== VALIDATION ==================
+
+def clean_row(data):
+    """Normalize an import row in place, or raise ValueError with the reason."""
+    if not isinstance(data, dict):
+        raise ValueError("Row is not an object")
+    if not data.get("name"):
+        raise ValueError("name is required")
+
+    data["type"] = str(data.get("type") or "OPD").upper()
+    if data["type"] not in PATIENT_TYPES:
+        raise ValueError(f"type must be one of {', '.join(PATIENT_TYPES)}")
+
+    for field in _INT_FIELDS:
+        value = data.get(field)
+        if value in (None, ""):
+            data[field] = None
+            continue
+        try:
+            data[field] = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a whole number")
+
+    if data.get("password") is not None:
+        data["password"] = str(data["password"])
+    if data.get("assignedDoctor") and not ObjectId.is_valid(str(data["assignedDoctor"])):
+        raise ValueError("assignedDoctor is not a valid id")
+    if (data["wardNumber"] is not None or data["cartNumber"] is not None) and \
+            bed_key(data["wardNumber"], data["cartNumber"]) is None:
+        raise ValueError("wardNumber and cartNumber must both be positive numbers")
+    return data
+
+
+# ================== IMPORT ==================
+
+class ImportReport:
+    def __init__(self, max_errors=IMPORT_MAX_REPORTED_ERRORS):
+        self.rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self._started = time.perf_counter()
+
+    def error(self, row, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": message})
+
+    def to_dict(self):
+        seconds = time.perf_counter() - self._started
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "batches": self.batches,
+            "seconds": round(seconds, 3),
+            "rowsPerSecond": round(self.rows / seconds, 1) if seconds else None,
+            "errors": self.errors,
+            "errorsTruncated": self.failed > len(self.errors)
+        }
+
+
+def import_patients(db, rows, batch_size=IMPORT_BATCH_SIZE, bed_taken=None):
+    """Validate and insert `rows` (any iterable) in batches; returns an ImportReport.
+
+    Row numbers in the report count data rows from 1. `bed_taken(ward, bed)`
+    reports beds that are already occupied; beds claimed earlier in the same
+    import are rejected too.
+    """
+    report = ImportReport()
+    claimed_beds = set()
+    batch = []
+    for number, data in enumerate(rows, start=1):
+        report.rows += 1
+        try:
+            if isinstance(data, Exception):
+                raise data
+            data = clean_row(data)
+            key = bed_key(data["wardNumber"], data["cartNumber"])
+            if key and (key in claimed_beds or (bed_taken and bed_taken(*key))):
+                raise ValueError("Bed is already occupied")
+        except ValueError as e:
+            report.error(number, str(e))
+            continue
+        if key:
+            claimed_beds.add(key)
+        batch.append((number, data))
+        if len(batch) >= batch_size:
+            _write_batch(db, batch, report)
+            batch = []
+    if batch:
+        _write_batch(db, batch, report)
+    return report
+
+
+def _write_batch(db, batch, report):
+    report.batches += 1
+    now = datetime.datetime.now()
+
+    # Plain-text passwords are hashed together on the shared pool, within its bulk share so
+    # logins keep their slots; existing hashes are kept
+    plain = [i for i, (_, data) in enumerate(batch) if data.get("password") and is_plain_text(data["password"])]
+    hashed = dict(zip(plain, password_hasher.hash_many([batch[i][1]["password"] for i in plain])))
+    # Rows from a source system keep their id; the rest share one block reservation
+    new_ids = iter(patient_ids.take(sum(1 for _, data in batch if not data.get("patientId"))))
+    rows = []
+    for i, (number, data) in enumerate(batch):
+        patient_id = str(data["patientId"]) if data.get("patientId") else next(new_ids)
+        rows.append((number, new_patient(data, hashed.get(i, data.get("password") or None), now, patient_id)))
+
+    # Claim the emails first; a taken email fails only its own row
+    identities = [
+        (position, {"email": normalize_email(patient_email(doc)), "collection": "patients",
+                    "userId": doc["_id"], "role": "patient"})
+        for position, (_, doc) in enumerate(rows) if normalize_email(patient_email(doc))
+    ]
+    rejected = {}
+    if identities:
+        try:
+            db.identities.insert_many([identity for _, identity in identities], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                position = identities[error["index"]][0]
+                rejected[position] = "Email already registered" if error.get("code") == 11000 else error.get("errmsg")
+
+    for position, message in rejected.items():
+        report.error(rows[position][0], message)
+
+    # Inpatients take a caseload slot one atomic claim at a time, so DOCTOR_MAX_CASELOAD holds
+    patients = []
+    for position, (number, doc) in enumerate(rows):
+        if position in rejected:
+            continue
+        if doc["status"] == "admitted" and (doc["assignedDoctor"] or doc["medicalSpecialty"]):
+            doctor = claim_doctor(db.staff, doc["medicalSpecialty"], doc["assignedDoctor"])
+            if doctor is None and doc["assignedDoctor"]:
+                db.identities.delete_one({"userId": doc["_id"]})
+                report.error(number, "Doctor is no longer available")
+                continue
+            doc["assignedDoctor"] = doctor["_id"] if doctor else None
+        patients.append((number, doc))
+    if not patients:
+        return
+
+    failed = {}
+    try:
+        db.patients.insert_many([doc for _, doc in patients], ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            failed[error["index"]] = duplicate_key_message(error) if error.get("code") == 11000 \
+                else error.get("errmsg") or "Write failed"
+    if failed:
+        db.identities.delete_many({"userId": {"$in": [patients[i][1]["_id"] for i in failed]}})
+        for index, message in failed.items():
+            doc = patients[index][1]
+            if doc["status"] == "admitted" and doc["assignedDoctor"]:
+                release_doctor(db.staff, doc["assignedDoctor"])
+            report.error(patients[index][0], message)
+
+    inserted = [doc for index, (_, doc) in enumerate(patients) if index not in failed]
+    report.inserted += len(inserted)
+    # Keep later allocations clear of any kept source ids in the same format
+    if any(data.get("patientId") for _, data in batch):
+        patient_ids.observe(doc["patientId"] for doc in inserted)
+
+
+# ================== IDS ==================
+
+def ensure_patient_ids(db):
+    """Seed the patientId counter and, once per deployment, renumber duplicate patientIds.
+
+    Duplicates were left by the old ObjectId-based ids. The first patient
+    with an id keeps it; the others get new sequential ids. The renumbering
+    runs in one worker (run_once) while the rest wait, and must finish before
+    the unique patientId index is created. Returns the number of patients
+    renumbered by this call.
+    """
+    seed_counter(db.patients, "patientId", patient_ids)
+    return run_once(db[COUNTERS_COLLECTION], "patientIdDuplicates", lambda: _renumber_duplicate_ids(db)) or 0
+
+
+def _renumber_duplicate_ids(db):
+    duplicates = db.patients.aggregate([
+        {"$match": {"patientId": {"$exists": True, "$ne": None}}},
+        {"$group": {"_id": "$patientId", "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}}
+    ])
+    renumber = [patient_oid for group in duplicates for patient_oid in sorted(group["ids"])[1:]]
+    if renumber:
+        db.patients.bulk_write([
+            UpdateOne({"_id": patient_oid}, {"$set": {"patientId": patient_id}})
+            for patient_oid, patient_id in zip(renumber, patient_ids.take(len(renumber)))
+        ], ordered=False)
+    return len(renumber)
@@ -0,0 +1,144 @@
+from bson import ObjectId
+
+# Query builders shared by the Flask views (admin_bp.py) and the async mode (asgi.py)
+
+# ================== PATIENTS ==================
+PATIENTS_DEFAULT_LIMIT = 100
+PATIENTS_MAX_LIMIT = 500
+
+
+def patient_page_query(args):
+    """Build the keyset page filter from ?limit= and ?after=. Raises ValueError on a bad cursor."""
+    limit = args.get("limit", PATIENTS_DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, PATIENTS_MAX_LIMIT))
+
+    query = {}
+    after = args.get("after")
+    if after:
+        if not ObjectId.is_valid(after):
+            raise ValueError("Invalid cursor")
+        query["_id"] = {"$gt": ObjectId(after)}
+    return query, limit
+
+
+def doctor_names_query(patients):
+    """Single $in filter for every doctor assigned to `patients`, or None if there are none."""
+    doctor_ids = {ObjectId(p["assignedDoctor"]) for p in patients if p.get("assignedDoctor")}
+    if not doctor_ids:
+        return None
+    return {"_id": {"$in": list(doctor_ids)}}
+
+
+def includes_doctor(projection):
+    """Whether documents read with `projection` carry assignedDoctor (and so get assignedDoctorName)."""
+    return projection.get("assignedDoctor") == 1 or all(v == 0 for k, v in projection.items() if k != "_id")
+
+
+def attach_doctor_names(patients, doctors):
+    doctor_names = {d["_id"]: d.get("name") for d in doctors}
+    for patient in patients:
+        if patient.get("assignedDoctor"):
+            patient["assignedDoctorName"] = doctor_names.get(ObjectId(patient["assignedDoctor"]))
+        else:
+            patient["assignedDoctorName"] = None
+    return patients
+
+
+# ================== ACCOUNTS ==================
+# Excluded from every document an endpoint returns
+SECRET_FIELDS = ("password",)
+SECRET_PROJECTION = dict.fromkeys(SECRET_FIELDS, 0)
+
+
+def field_projection(fields, default=SECRET_PROJECTION, allowed=None):
+    """Mongo projection for a ?fields=a,b.c parameter, or `default` when it is empty.
+
+    Secret fields (and anything under them) are never included. With
+    `allowed`, names outside it are dropped. _id is always returned.
+    Raises ValueError on a malformed name.
+    """
+    names = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    if not names:
+        return default
+    projection = {}
+    for name in names:
+        if name.startswith("$") or ".." in name or name.startswith(".") or name.endswith("."):
+            raise ValueError(f"Invalid field: {name}")
+        root = name.partition(".")[0]
+        if root in SECRET_FIELDS or (allowed is not None and root not in allowed):
+            continue
+        projection[name] = 1
+    # Mongo rejects a path together with its own parent ("contact" and "contact.email")
+    projection = {
+        name: 1 for name in projection
+        if not any(name.startswith(parent + ".") for parent in projection)
+    }
+    projection["_id"] = 1
+    return projection
+
+
+# ================== STAFF ==================
+STAFF_LIST_PROJECTION = {"_id": 1, "name": 1, "role": 1, "department": 1, "email": 1, "phone": 1,
+                         "status": 1, "staffId": 1}
+
+
+# ================== DASHBOARD ==================
+LOW_STOCK_DEFAULT_THRESHOLD = 10
+
+# collection -> {count name: filter (None counts everything)}
+DASHBOARD_FACETS = {
+    "patients": {
+        "total": None,
+        "admitted": {"status": "admitted"},
+        "discharged": {"status": "discharged"}
+    },
+    "staff": {
+        "total": None,
+        "doctors": {"role": "doctor"},
+        "nurses": {"role": "nurse"}
+    },
+    "inventory": {
+        "total": None,
+        "lowStock": {"$expr": {"$lte": ["$quantity", {"$ifNull": ["$threshold", LOW_STOCK_DEFAULT_THRESHOLD]}]}}
+    },
+    "emergency_cases": {
+        "open": {"status": {"$ne": "resolved"}},
+        "critical": {"status": {"$ne": "resolved"}, "priority": "critical"}
+    }
+}
+
+
+def facet_pipeline(facets):
+    """Run several filtered counts over one collection in a single $facet aggregation."""
+    return [{"$facet": {
+        name: ([{"$match": match}] if match else []) + [{"$count": "n"}]
+        for name, match in facets.items()
+    }}]
+
+
+def facet_values(result, facets):
+    result = result or {}
+    return {name: (result.get(name) or [{"n": 0}])[0]["n"] for name in facets}
+
+
+def dashboard_stats(counts, total_beds, occupied_beds):
+    """Assemble the /api/dashboard/stats body from per-collection facet counts."""
+    patients, staff = counts["patients"], counts["staff"]
+    inventory, alerts = counts["inventory"], counts["emergency_cases"]
+    bed_occupancy = f"{int((occupied_beds / total_beds) * 100) if total_beds else 0}%"
+
+    return {
+        "patients": patients["total"],
+        "admitted": patients["admitted"],
+        "discharged": patients["discharged"],
+        "staff": staff["total"],
+        "doctors": staff["doctors"],
+        "nurses": staff["nurses"],
+        "bedOccupancy": bed_occupancy,
+        "totalBeds": total_beds,
+        "occupiedBeds": occupied_beds,
+        "inventoryItems": inventory["total"],
+        "lowStock": inventory["lowStock"],
+        "alerts": alerts["open"],
+        "criticalAlerts": alerts["critical"]
+    }
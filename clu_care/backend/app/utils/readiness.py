@@ -0,0 +1,103 @@
+"""Background startup and readiness probe.
+
+readiness.start() returns at once. A daemon thread connects and seeds the
+database (initialize_db), retrying with backoff until that succeeds, then
+runs database_health() every READINESS_INTERVAL seconds. /health reports
+the latest result instead of pinging on the request path, so a slow or
+unreachable Mongo makes it answer "not ready" immediately rather than hang.
+"""
+import os
+import threading
+import time
+
+from app.utils.db import initialize_db
+from app.utils.logs import get_logger
+from app.utils.metrics import database_health
+
+log = get_logger(__name__)
+
+READINESS_INTERVAL = float(os.getenv("READINESS_INTERVAL", "10"))
+# Startup retries back off up to this many seconds apart
+READINESS_MAX_BACKOFF = float(os.getenv("READINESS_MAX_BACKOFF", "30"))
+
+
+class Readiness:
+    def __init__(self, startup, check, interval=READINESS_INTERVAL):
+        self.startup = startup
+        self.check = check
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        self._ready.clear()
+        self.started_at = time.time()
+        self.startup_seconds = None
+        self.attempts = 0
+        self.error = None
+        self.database = None
+        self.checked_at = None
+
+    def start(self):
+        """Start the probe thread for this process (again in each forked worker)."""
+        with self._lock:
+            if self._pid == os.getpid():
+                return self
+            self._reset()
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="readiness", daemon=True).start()
+        return self
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """Block until ready or `timeout` seconds pass; returns whether it is ready."""
+        return self._ready.wait(timeout)
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "startedUp": self.startup_seconds is not None,
+            "startupSeconds": self.startup_seconds,
+            "startupAttempts": self.attempts,
+            "checkedAt": self.checked_at,
+            "error": self.error,
+            "database": self.database,
+        }
+
+    def _run(self):
+        backoff = 1.0
+        while True:
+            self.attempts += 1
+            try:
+                self.startup()
+                break
+            except Exception as e:
+                self.error = str(e)
+                log.exception("Startup failed; retrying in %.0fs", backoff,
+                              extra={"event": "app.startup_failed", "attempt": self.attempts})
+                time.sleep(backoff)
+                backoff = min(backoff * 2, READINESS_MAX_BACKOFF)
+        self.startup_seconds = round(time.time() - self.started_at, 3)
+        log.info("Startup complete", extra={"event": "app.startup", "seconds": self.startup_seconds,
+                                            "attempts": self.attempts})
+
+        while True:
+            report = self.check()
+            self.database, self.checked_at = report, time.time()
+            self.error = report.get("error")
+            if report["status"] == "unhealthy":
+                if self._ready.is_set():
+                    log.warning("Database unreachable; not ready", extra={"event": "app.not_ready"})
+                self._ready.clear()
+            else:
+                self._ready.set()
+            time.sleep(self.interval)
+
+
+# Started by app.py; /health and the gunicorn warm-up read it
+readiness = Readiness(initialize_db, database_health)
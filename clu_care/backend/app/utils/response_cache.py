@@ -0,0 +1,172 @@
+"""Whole-response cache with strong ETags for rarely-changing reference data.
+
+Responses are keyed by route, query string and the current version of every
+collection the view reads. NDJSON requests (Accept or ?stream=) bypass the
+cache, and every response carries Vary: Accept, so a stream and a JSON body
+for the same URL never stand in for each other. Write endpoints call versions.bump("staff") and
+so on, which retires every entry built from the old data without having to
+find it; the LRU bound pushes the orphans out.
+
+The ETag is a digest of the response body, so two workers serving the same
+data agree on it. A request whose If-None-Match matches a cached entry gets
+a 304 without running the view or touching Mongo.
+
+Versions live in process memory: a worker does not see another worker's
+bump. Entries therefore also expire after RESPONSE_CACHE_TTL seconds, the
+same bound the in-process indexes use.
+"""
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import make_response, request
+
+from app.utils.streaming import wants_stream
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+
+def etag_for(body):
+    """Strong ETag for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(header, etag):
+    """True if an If-None-Match header value names `etag` (or is "*")."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Clients may send back the weak form (W/"...") after a proxy recompressed the body
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def revalidation(etag, if_none_match):
+    """(status, headers) for a GET whose current body has `etag`: 304 if the client's copy is current.
+
+    Shared with asgi.py so both serving modes answer conditional requests alike.
+    """
+    status = 304 if etag_matches(if_none_match, etag) else 200
+    # Let browsers keep the copy but revalidate it on every use
+    return status, {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+class CollectionVersions:
+    """Per-collection change counters; bump() after every write to a collection."""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *collections):
+        with self._lock:
+            for name in collections:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, *collections):
+        return tuple(self._versions.get(name, 0) for name in collections)
+
+    def snapshot(self):
+        return dict(self._versions)
+
+
+class ResponseCache:
+    """LRU of (etag, body, mimetype) by route, query string and collection versions."""
+
+    def __init__(self, versions, maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL):
+        self.versions = versions
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, etag, body, mimetype)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, etag, body, mimetype):
+        entry = (time.time() + self.ttl, etag, body, mimetype)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 3) if total else 0.0,
+            "notModified": self.not_modified,
+            "evictions": self.evictions,
+            "versions": self.versions.snapshot()
+        }
+
+    def cached(self, *collections):
+        """Decorator for GET views whose body depends only on the query string and `collections`.
+
+        Only complete 200 JSON responses are stored; NDJSON requests, streamed
+        responses and errors pass through untouched.
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if wants_stream(request):
+                    response = make_response(view(*args, **kwargs))
+                    response.vary.add("Accept")
+                    return response
+                key = (request.path, request.query_string, self.versions.get(*collections))
+                entry = self.get(key)
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        response.vary.add("Accept")
+                        return response
+                    body = response.get_data()
+                    entry = self.put(key, etag_for(body), body, response.mimetype)
+                _, etag, body, mimetype = entry
+
+                status, headers = revalidation(etag, request.headers.get("If-None-Match"))
+                if status == 304:
+                    with self._lock:
+                        self.not_modified += 1
+                    response = make_response("", 304)
+                else:
+                    response = make_response(body)
+                    response.mimetype = mimetype
+                response.headers.update(headers)
+                response.vary.add("Accept")
+                return response
+            return wrapper
+        return decorator
+
+
+# Bumped by the write endpoints; shared by every cached view in the process
+collection_versions = CollectionVersions()
+response_cache = ResponseCache(collection_versions)
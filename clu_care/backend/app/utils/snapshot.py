@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+
+class Snapshot:
+    """Caches the result of `loader()` for `ttl` seconds.
+
+    Only one thread recomputes at a time; the others wait and reuse the
+    fresh value. Call invalidate() after a write so the next read reloads.
+    invalidate() also bumps a generation counter: a load that was already
+    running when it came may have read data from before the write, so its
+    result goes to its caller but is not kept as fresh.
+    """
+
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self._value = None
+        self._taken_at = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return (value, age_in_seconds)."""
+        value, taken_at = self._value, self._taken_at
+        if taken_at is not None and time.time() - taken_at < self.ttl:
+            return value, time.time() - taken_at
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._taken_at is None or time.time() - self._taken_at >= self.ttl:
+                generation = self._generation
+                value = self.loader()
+                # Kept as fresh only if no invalidate() came in while loading
+                self._value = value
+                self._taken_at = time.time() if generation == self._generation else None
+                return value, 0.0
+            return self._value, time.time() - self._taken_at
+
+    def invalidate(self):
+        self._generation += 1
+        self._taken_at = None
+
+
+class AsyncSnapshot:
+    """Snapshot for a coroutine loader, shared by the tasks of one event loop."""
+
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self._value = None
+        self._taken_at = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        if self._taken_at is None or time.time() - self._taken_at >= self.ttl:
+            async with self._lock:
+                if self._taken_at is None or time.time() - self._taken_at >= self.ttl:
+                    generation = self._generation
+                    value = await self.loader()
+                    # Kept as fresh only if no invalidate() came in while loading
+                    self._value = value
+                    self._taken_at = time.time() if generation == self._generation else None
+                    return value, 0.0
+        return self._value, time.time() - self._taken_at
+
+    def invalidate(self):
+        self._generation += 1
+        self._taken_at = None
@@ -0,0 +1,70 @@
+import os
+from itertools import islice
+
+from flask import Response, current_app, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+# Documents fetched per getMore while streaming
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+# Serialized lines are buffered up to this many bytes before each write
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", "65536"))
+
+
+def wants_stream(request):
+    """True for `?stream=1` or an Accept header asking for NDJSON."""
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return True
+    return NDJSON_MIMETYPE in request.headers.get("Accept", "")
+
+
+def chunked(iterable, size):
+    """Yield lists of up to `size` items without materializing the whole iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ndjson_chunks(docs, dumps):
+    """One JSON document per line, buffered into chunks of about STREAM_CHUNK_BYTES."""
+    buffer, size = [], 0
+    for doc in docs:
+        line = dumps(doc) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_BYTES:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+async def ndjson_chunks_async(docs, dumps):
+    """ndjson_chunks() over an async iterable (an AsyncMongoClient cursor); used by asgi.py."""
+    buffer, size = [], 0
+    async for doc in docs:
+        line = dumps(doc) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_BYTES:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def ndjson_response(docs, headers=None):
+    """Stream `docs` (any iterable, typically a cursor) as one JSON document per line.
+
+    Memory stays bounded by the cursor batch and the write buffer, and the
+    first bytes go out as soon as the first batch arrives.
+    """
+    def generate():
+        yield from ndjson_chunks(docs, current_app.json.dumps)
+
+    response = Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE, headers=headers)
+    # The same URL answers JSON without the Accept header
+    response.vary.add("Accept")
+    return response
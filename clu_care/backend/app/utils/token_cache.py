@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+# Upper bound on how long a resolved user is trusted before re-reading it. Each worker
+# has its own cache and invalidate_user() only reaches the calling one, so this is also
+# how long other workers keep honouring a deleted account's tokens.
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+
+
+class TokenCache:
+    """LRU cache of verified JWTs and the user document each one resolved to.
+
+    token_required resolves tokens against db.users only, so only writes to
+    users need to call invalidate_user() (with the users _id).
+
+    Entries are keyed by a SHA-256 digest of the token (the raw token is never
+    stored) and expire at the earlier of the token's `exp` and `ttl`.
+    """
+
+    def __init__(self, maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # digest -> (expires_at, user_id, user)
+        self._by_user = {}              # user_id -> set of digests
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token):
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self._remove(digest)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, token, user, exp):
+        """Cache `user` for `token` until min(exp, now + ttl). `exp` is a unix timestamp."""
+        expires_at = min(float(exp), time.time() + self.ttl)
+        digest = self._digest(token)
+        user_id = str(user.get("_id"))
+        with self._lock:
+            if digest in self._entries:
+                self._remove(digest)
+            self._entries[digest] = (expires_at, user_id, user)
+            self._by_user.setdefault(user_id, set()).add(digest)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        """Drop every cached token for a user (call after the user is updated or deleted)."""
+        with self._lock:
+            digests = self._by_user.pop(str(user_id), set())
+            for digest in digests:
+                self._entries.pop(digest, None)
+            self.invalidations += len(digests)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 3) if total else 0.0,
+            "invalidations": self.invalidations
+        }
+
+    def _remove(self, digest):
+        _, user_id, _ = self._entries.pop(digest)
+        digests = self._by_user.get(user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._by_user[user_id]
+
+
+# Shared by token_required and the endpoints that modify or delete users (app/routes/admin_routes.py)
+token_cache = TokenCache()
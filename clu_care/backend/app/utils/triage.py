@@ -0,0 +1,184 @@
+"""Emergency triage order: severity, then arrival.
+
+Each case stores its severity as a number (severityRank) next to the
+priority name, so MongoDB can sort by it. next_case() takes the most urgent
+open case with one find_one_and_update over the status_severity_arrival
+index; that is atomic across every worker and is what decides who is
+treated next. TriageQueue is a per-worker copy that only orders the board
+listing; it may lag other workers' writes by up to TRIAGE_MAX_AGE seconds,
+so it has no way to pick or take a case.
+"""
+import datetime
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateMany
+
+from app.utils.ids import COUNTERS_COLLECTION, IdAllocator, seed_counter
+from app.utils.mongo import mongo
+
+# Lower rank is treated first; unknown priorities queue behind "low"
+SEVERITY = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+CASE_STATUSES = ("open", "in_progress", "resolved")
+# Most urgent first, then longest waiting (status_severity_arrival index)
+NEXT_CASE_SORT = [("severityRank", 1), ("createdAt", 1), ("_id", 1)]
+
+# Each worker process keeps its own queue, so rebuild periodically to pick up
+# cases opened or closed by other workers
+DEFAULT_MAX_AGE = float(os.getenv("TRIAGE_MAX_AGE", "60"))
+
+# E-0000001, E-0000002, ... shared by every worker through the counters collection
+case_ids = IdAllocator(mongo.lazy_database()[COUNTERS_COLLECTION], "caseId", "E-")
+
+
+def severity_rank(priority):
+    return SEVERITY.get(priority, len(SEVERITY))
+
+
+def arrival_time(case):
+    """Seconds since the epoch the case arrived: createdAt, else the _id timestamp."""
+    created = case.get("createdAt")
+    if isinstance(created, datetime.datetime):
+        return created.timestamp()
+    if isinstance(case.get("_id"), ObjectId):
+        return case["_id"].generation_time.timestamp()
+    return 0.0
+
+
+def peek_next_case(cases_collection):
+    """Most urgent open case, straight from the collection."""
+    return cases_collection.find_one({"status": "open"}, sort=NEXT_CASE_SORT)
+
+
+def next_case(cases_collection, now=None):
+    """Atomically take the most urgent open case (status -> in_progress). Returns it, or None."""
+    return cases_collection.find_one_and_update(
+        {"status": "open"},
+        {"$set": {"status": "in_progress", "startedAt": now or datetime.datetime.now()}},
+        sort=NEXT_CASE_SORT,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def ensure_case_ranks(db):
+    """Give cases written before severityRank existed their rank, and seed the caseId counter.
+
+    Safe to run on every startup. Returns the number of cases updated.
+    """
+    missing = {}
+    for case in db.emergency_cases.find({"severityRank": {"$exists": False}}, {"priority": 1}):
+        missing.setdefault(severity_rank(case.get("priority")), []).append(case["_id"])
+    if missing:
+        db.emergency_cases.bulk_write([
+            UpdateMany({"_id": {"$in": ids}}, {"$set": {"severityRank": rank}}) for rank, ids in missing.items()
+        ], ordered=False)
+    seed_counter(db.emergency_cases, "caseId", case_ids)
+    return sum(len(ids) for ids in missing.values())
+
+
+class TriageQueue:
+    """In-process emergency board ordered by severity, then arrival.
+
+    Waiting ("open") cases sit in a binary heap; cases being treated
+    ("in_progress") are kept aside in arrival order; resolved cases are
+    dropped. Built with one indexed scan of emergency_cases, then kept
+    current by the emergency endpoints after each write. Reprioritizing or
+    closing a case marks its heap entry dead instead of searching for it, so
+    each write is O(log n). cases() lists the board; the next case is
+    always taken from MongoDB (next_case), never from here.
+    """
+
+    # Every case that is not closed (status prefix of the status_severity_arrival index)
+    OPEN_QUERY = {"status": {"$ne": "resolved"}}
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE):
+        self._heap = []
+        self._entries = {}   # case key -> live heap entry
+        self._active = {}    # case key -> in_progress case
+        self._sequence = itertools.count()
+        self._dead = 0
+        self._lock = threading.Lock()
+        self.max_age = max_age
+        self.loaded_at = None
+
+    def is_stale(self):
+        return self.loaded_at is None or bool(self.max_age and time.time() - self.loaded_at > self.max_age)
+
+    def ensure_loaded(self, cases_collection):
+        if self.is_stale():
+            self.load(cases_collection)
+
+    def load(self, cases_collection):
+        """Rebuild from the collection: one scan, then an O(n) heapify."""
+        heap, entries, active = [], {}, {}
+        for case in cases_collection.find(self.OPEN_QUERY):
+            key = str(case["_id"])
+            if case.get("status") == "in_progress":
+                active[key] = case
+            else:
+                entries[key] = entry = self._entry(case)
+                heap.append(entry)
+        heapq.heapify(heap)
+        active = dict(sorted(active.items(), key=lambda item: arrival_time(item[1])))
+        with self._lock:
+            self._heap, self._entries, self._active = heap, entries, active
+            self._dead = 0
+            self.loaded_at = time.time()
+
+    def update(self, case):
+        """Place a case (new or just written) according to its status and priority."""
+        key = str(case["_id"])
+        with self._lock:
+            self._discard(key)
+            self._active.pop(key, None)
+            status = case.get("status", "open")
+            if status == "in_progress":
+                self._active[key] = case
+            elif status != "resolved":
+                self._entries[key] = entry = self._entry(case)
+                heapq.heappush(self._heap, entry)
+
+    push = update
+
+    def remove(self, case_id):
+        key = str(case_id)
+        with self._lock:
+            self._active.pop(key, None)
+            return self._discard(key)
+
+    def cases(self):
+        """Waiting cases in triage order, then the cases being treated."""
+        with self._lock:
+            waiting = sorted(entry for entry in self._heap if entry[-1] is not None)
+            active = list(self._active.values())
+        return [entry[-1] for entry in waiting] + active
+
+    @property
+    def waiting(self):
+        return len(self._entries)
+
+    @property
+    def in_progress(self):
+        return len(self._active)
+
+    def _entry(self, case):
+        # The sequence number breaks ties so cases themselves are never compared
+        rank = severity_rank(case.get("priority"))
+        return [rank, arrival_time(case), next(self._sequence), str(case["_id"]), case]
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[-1] = None
+        self._dead += 1
+        # Compact once dead entries outnumber live ones, keeping the heap O(live)
+        if self._dead > len(self._entries):
+            self._heap = [e for e in self._heap if e[-1] is not None]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        return True
@@ -0,0 +1,267 @@
+"""Async serving mode for the read-heavy endpoints.
+
+Serves /api/patients, /api/beds, /api/staff, /api/dashboard/stats,
+/debug/all-users and /login with the same contract as the Flask app, on
+pymongo's AsyncMongoClient. The queries, projections (no secret fields),
+page cursors, NDJSON streaming and ETags come from the same helpers in
+app/utils. Queries that don't depend on each other run concurrently.
+MONGODB_URI=memory:// serves from the in-process store, as in the Flask app.
+
+    pip install quart uvicorn
+    uvicorn asgi:app --workers 4 --port 5001
+"""
+import asyncio
+import os
+
+from pymongo import AsyncMongoClient
+from quart import Quart, Response, jsonify, request
+
+from app.utils.auth import account_role, build_user_data, issue_token, login_response
+from app.utils.bed_index import BedIndex, load_ward_layout
+from app.utils.cors import cors_headers
+from app.utils.identity import find_identity_async
+from app.utils.json_provider import init_json
+from app.utils.memory_store import AsyncMemoryClient
+from app.utils.mongo import mongo
+from app.utils.passwords import HashingBusy, needs_rehash, password_hasher
+from app.utils.queries import (
+    DASHBOARD_FACETS, SECRET_PROJECTION, STAFF_LIST_PROJECTION, attach_doctor_names, dashboard_stats,
+    doctor_names_query, facet_pipeline, facet_values, field_projection, includes_doctor, patient_page_query
+)
+from app.utils.response_cache import etag_for, revalidation
+from app.utils.snapshot import AsyncSnapshot
+from app.utils.streaming import NDJSON_MIMETYPE, STREAM_BATCH_SIZE, ndjson_chunks_async, wants_stream
+
+app = Quart(__name__)
+init_json(app)
+app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-here')
+
+DASHBOARD_STATS_TTL = float(os.getenv("DASHBOARD_STATS_TTL", "5"))
+
+# Created per worker once its event loop is running
+client = None
+db = None
+bed_index = BedIndex(load_ward_layout())
+
+
+@app.before_serving
+async def connect():
+    global client, db
+    client_class = AsyncMemoryClient if mongo.uses_memory_engine else AsyncMongoClient
+    client = client_class(mongo.uri, **mongo.client_options())
+    db = client[mongo.db_name]
+
+
+@app.after_serving
+async def disconnect():
+    if client is not None:
+        await client.close()
+
+
+@app.after_request
+async def add_cors_headers(response):
+    # Same origins and credentials policy as the Flask app
+    origin = request.headers.get("Origin")
+    if origin:
+        response.headers.update(cors_headers(origin))
+        response.vary.add("Origin")
+    return response
+
+
+def ndjson_response(docs):
+    """Stream an async iterable of documents as NDJSON (streaming.ndjson_response for Quart)."""
+    response = Response(ndjson_chunks_async(docs, app.json.dumps), mimetype=NDJSON_MIMETYPE)
+    response.vary.add("Accept")
+    return response
+
+
+async def with_etag(response):
+    """Add the body's ETag and answer If-None-Match with a 304, like response_cache in the Flask app."""
+    status, headers = revalidation(etag_for(await response.get_data()), request.headers.get("If-None-Match"))
+    if status == 304:
+        response = Response("", 304)
+    response.headers.update(headers)
+    response.vary.add("Accept")
+    return response
+
+
+# ================== STAFF ==================
+# NDJSON stream with ?stream=1 or Accept: application/x-ndjson; ?fields= narrows the list columns
+@app.route("/api/staff", methods=["GET"])
+async def get_staff():
+    try:
+        projection = field_projection(request.args.get("fields"), STAFF_LIST_PROJECTION, STAFF_LIST_PROJECTION)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if wants_stream(request):
+        return ndjson_response(db.staff.find({}, projection).batch_size(STREAM_BATCH_SIZE))
+    staff = await db.staff.find({}, projection).to_list(None)
+    return await with_etag(jsonify(staff))
+
+
+# ================== PATIENTS ==================
+# Keyset pages (limit, after; X-Next-Cursor), ?fields= and NDJSON streaming, as in admin_bp.py.
+# Passwords are never returned.
+@app.route("/api/patients", methods=["GET"])
+async def get_patients():
+    try:
+        query, limit = patient_page_query(request.args)
+        projection = field_projection(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if wants_stream(request):
+        return ndjson_response(stream_patients(query, projection, request.args.get("limit", type=int)))
+
+    patients = await db.patients.find(query, projection).sort("_id", 1).limit(limit).to_list(None)
+    # Resolve all assigned doctor names with a single $in query
+    await with_doctor_names(patients, projection)
+
+    response = jsonify(patients)
+    response.vary.add("Accept")
+    if len(patients) == limit:
+        response.headers["X-Next-Cursor"] = str(patients[-1]["_id"])
+    return response
+
+
+async def stream_patients(query, projection, limit=None):
+    """Patients batch by batch, resolving doctor names once per batch."""
+    cursor = db.patients.find(query, projection).sort("_id", 1).batch_size(STREAM_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    batch = []
+    async for patient in cursor:
+        batch.append(patient)
+        if len(batch) == STREAM_BATCH_SIZE:
+            for doc in await with_doctor_names(batch, projection):
+                yield doc
+            batch = []
+    for doc in await with_doctor_names(batch, projection):
+        yield doc
+
+
+async def with_doctor_names(patients, projection):
+    if patients and includes_doctor(projection):
+        doctor_query = doctor_names_query(patients)
+        doctors = await db.staff.find(doctor_query, {"name": 1}).to_list(None) if doctor_query else []
+        attach_doctor_names(patients, doctors)
+    return patients
+
+
+# ================== BEDS ==================
+@app.route("/api/beds", methods=["GET"])
+async def get_beds():
+    await bed_index.ensure_loaded_async(db.patients, db.staff)
+    return jsonify(bed_index.wards())
+
+
+# ================== DASHBOARD STATS ==================
+async def facet_counts(name, facets):
+    cursor = await db[name].aggregate(facet_pipeline(facets))
+    return name, facet_values(await anext(cursor, None), facets)
+
+
+async def compute_dashboard_stats():
+    # The four collection aggregations and the bed index refresh run concurrently
+    results = await asyncio.gather(
+        *(facet_counts(name, facets) for name, facets in DASHBOARD_FACETS.items()),
+        bed_index.ensure_loaded_async(db.patients, db.staff)
+    )
+    counts = dict(results[:-1])
+    return dashboard_stats(counts, bed_index.total_beds, bed_index.occupied_beds)
+
+
+dashboard_snapshot = AsyncSnapshot(compute_dashboard_stats, ttl=DASHBOARD_STATS_TTL)
+
+
+@app.route("/api/dashboard/stats", methods=["GET"])
+async def get_dashboard_stats():
+    try:
+        stats, age = await dashboard_snapshot.get()
+        return jsonify({**stats, "snapshotAge": round(age, 3)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# ================== DEBUG ==================
+@app.route('/debug/all-users', methods=['GET'])
+async def debug_all_users():
+    try:
+        # NDJSON stream (one document per line, tagged with its collection)
+        if wants_stream(request):
+            return ndjson_response(stream_all_users())
+
+        names = ['users', 'staff', 'patients']
+        lists = await asyncio.gather(*(db[name].find({}, SECRET_PROJECTION).to_list(None) for name in names))
+        result = {}
+        for name, docs in zip(names, lists):
+            for doc in docs:
+                doc['collection'] = name
+            result[name] = docs
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+async def stream_all_users():
+    for name in ('users', 'staff', 'patients'):
+        async for doc in db[name].find({}, SECRET_PROJECTION).batch_size(STREAM_BATCH_SIZE):
+            doc['collection'] = name
+            yield doc
+
+
+# ================== LOGIN ==================
+@app.route('/login', methods=['POST', 'OPTIONS'])
+async def login():
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200
+
+    try:
+        auth_data = await request.get_json()
+
+        if not auth_data or not auth_data.get('email') or not auth_data.get('password') or not auth_data.get('role'):
+            return jsonify({'message': 'Email, password and role are required!'}), 400
+
+        collection_name, user = await find_identity_async(db, auth_data['email'])
+        if not user:
+            return jsonify({'message': 'User not found!'}), 404
+
+        actual_role = account_role(user, collection_name)
+        if actual_role != auth_data['role']:
+            return jsonify({
+                'message': f'Invalid user role. Expected {auth_data["role"]} but found {actual_role}'
+            }), 403
+
+        try:
+            password_matches = await password_hasher.verify_async(user['password'], auth_data['password'])
+        except HashingBusy:
+            return jsonify({'message': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
+
+        if not password_matches:
+            return jsonify({'message': 'Invalid password!'}), 401
+
+        if needs_rehash(user['password']):
+            try:
+                new_hash = await password_hasher.hash_async(auth_data['password'])
+                await db[collection_name].update_one(
+                    {'_id': user['_id'], 'password': user['password']},
+                    {'$set': {'password': new_hash}}
+                )
+            except HashingBusy:
+                pass  # try again on the next login
+
+        user_data = build_user_data(user, collection_name, actual_role)
+        token = issue_token(user_data, app.config['SECRET_KEY'])
+        return jsonify(login_response(user_data, token)), 200
+
+    except Exception as e:
+        return jsonify({
+            'message': 'Login error',
+            'error': str(e)
+        }), 500
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run("asgi:app", host='0.0.0.0', port=int(os.getenv("PORT", "5001")),
+                workers=int(os.getenv("WEB_CONCURRENCY", "1")))
@@ -0,0 +1,267 @@
+"""Endpoint latency benchmark over a seeded synthetic dataset.
+
+Seeds a deterministic dataset (benchmarks/datasets.py) into the in-process
+store or a local MongoDB, drives the hot endpoints of the combined app (wsgi.py)
+through Flask's test client, and writes p50/p95/p99 latency, throughput and
+Mongo commands per request to a JSON file named after the dataset, engine
+and commit.
+
+    cd clu_care/backend
+    python -m benchmarks.bench_endpoints --dataset 100k
+    python -m benchmarks.bench_endpoints --dataset 1k --engine mongo --concurrency 8
+    python -m benchmarks.bench_endpoints --compare results/a.json results/b.json
+
+The mongo engine uses MONGODB_URI (default localhost) with a separate
+hospital_bench database, which is wiped before seeding.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo import monitoring
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the database (getMores included)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+    def started(self, event):
+        with self._lock:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_samples))))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def configure_environment(args):
+    """Must run before any app module is imported; they read these at import time."""
+    if args.engine == "memory":
+        os.environ["MONGODB_URI"] = "memory://"
+    os.environ["MONGODB_DB"] = args.db_name
+    layout_path = os.path.join(tempfile.mkdtemp(prefix="bench-wards-"), "ward.json")
+    os.environ["WARD_LAYOUT_PATH"] = layout_path
+    # The probe's periodic ping would show up in the per-request command counts
+    os.environ.setdefault("READINESS_INTERVAL", "3600")
+    return layout_path
+
+
+def load_apps():
+    """Import the combined app (wsgi.py) and the admin_bp module whose caches it resets."""
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import admin_bp
+    import wsgi
+
+    return wsgi.main, admin_bp
+
+
+def scenarios(datasets, seeded, requests, login_requests):
+    """(name, method, path, request kwargs, request count)."""
+    credentials = {"password": datasets.BENCH_PASSWORD}
+    middle = str(datasets.object_id("patients", seeded["patients"] // 2))
+    return [
+        ("login_admin", "POST", "/login",
+         {"json": {"email": datasets.ADMIN_EMAIL, "role": "admin", **credentials}}, login_requests),
+        ("login_patient", "POST", "/login",
+         {"json": {"email": datasets.patient_email(0), "role": "patient", **credentials}}, login_requests),
+        ("patients_first_page", "GET", "/api/patients", {}, requests),
+        ("patients_middle_page", "GET", f"/api/patients?after={middle}", {}, requests),
+        ("beds", "GET", "/api/beds", {}, requests),
+        ("staff", "GET", "/api/staff", {}, requests),
+        ("staff_available", "GET", f"/staff/available?specialty={datasets.DEPARTMENTS[0]}", {}, requests),
+        ("dashboard_stats", "GET", "/api/dashboard/stats", {}, requests),
+    ]
+
+
+def run_scenario(flask_app, method, path, kwargs, count, concurrency, warmup, counter):
+    local = threading.local()
+
+    def one(_):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = flask_app.test_client()
+        start = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        response.get_data()
+        return time.perf_counter() - start, response.status_code
+
+    for _ in range(warmup):
+        one(None)
+
+    counter.reset()
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(one, range(count)))
+    else:
+        samples = [one(None) for _ in range(count)]
+    elapsed = time.perf_counter() - started
+    commands = counter.count
+
+    latencies = sorted(latency for latency, _ in samples)
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": count,
+        "p50Ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95Ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99Ms": round(percentile(latencies, 99) * 1000, 3),
+        "meanMs": round(sum(latencies) / len(latencies) * 1000, 3),
+        "throughputRps": round(count / elapsed, 1),
+        "queriesPerRequest": round(commands / count, 2),
+        "statuses": statuses,
+    }
+
+
+def run(args):
+    layout_path = configure_environment(args)
+
+    # App modules read the environment configured above, so import them only now
+    from app.utils.mongo import mongo
+    from benchmarks import datasets
+
+    counter = CommandCounter()
+    mongo.add_listener(counter)
+    datasets.write_layout(layout_path, args.wards, args.beds_per_ward)
+
+    main_app, admin_bp = load_apps()
+    # Let the app's own startup (indexes, default admin) finish before the data is replaced
+    main_app.readiness.wait(60)
+    db = mongo.database()
+
+    print(f"🌱 Seeding {args.dataset} dataset ({args.engine})...")
+    started = time.perf_counter()
+    datasets.clear(db)
+    seeded = datasets.seed(db, datasets.DATASETS[args.dataset], staff=args.staff, seed=args.seed)
+    seed_seconds = time.perf_counter() - started
+    print(f"✅ Seeded in {seed_seconds:.1f}s: {seeded}")
+
+    # Drop anything the apps cached before the data existed
+    admin_bp.bed_index.loaded_at = None
+    admin_bp.dashboard_snapshot.invalidate()
+    main_app.token_cache.clear()
+
+    results = {}
+    for name, method, path, kwargs, count in scenarios(datasets, seeded, args.requests, args.login_requests):
+        result = run_scenario(main_app.app, method, path, kwargs, count, args.concurrency, args.warmup, counter)
+        results[name] = result
+        print(f"  {name:22s} p50 {result['p50Ms']:8.2f} ms  p95 {result['p95Ms']:8.2f} ms  "
+              f"p99 {result['p99Ms']:8.2f} ms  {result['throughputRps']:8.1f} req/s  "
+              f"{result['queriesPerRequest']:5.2f} queries/req")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "dataset": args.dataset,
+            "engine": args.engine,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "seedSeconds": round(seed_seconds, 2),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            **seeded,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{args.dataset}-{args.engine}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results written to {output}")
+    return report
+
+
+def compare(baseline_path, candidate_path, threshold):
+    """Print per-endpoint deltas; returns 1 if any p95 regressed by more than `threshold` percent."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+
+    print(f"{baseline['meta']['commit']} -> {candidate['meta']['commit']} ({candidate['meta']['dataset']})")
+    for key in ("dataset", "engine", "concurrency"):
+        if baseline["meta"].get(key) != candidate["meta"].get(key):
+            print(f"⚠️  runs differ in {key}: {baseline['meta'].get(key)} vs {candidate['meta'].get(key)}")
+    regressed = False
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if not old:
+            print(f"  {name:22s} (new)")
+            continue
+        change = (new["p95Ms"] - old["p95Ms"]) / old["p95Ms"] * 100 if old["p95Ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag, regressed = "  ⚠️  regression", True
+        print(f"  {name:22s} p95 {old['p95Ms']:8.2f} -> {new['p95Ms']:8.2f} ms ({change:+6.1f}%)  "
+              f"queries/req {old['queriesPerRequest']:.2f} -> {new['queriesPerRequest']:.2f}{flag}")
+    return 1 if regressed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", choices=["1k", "100k", "1m"], default="1k")
+    parser.add_argument("--engine", choices=["memory", "mongo"], default="memory")
+    parser.add_argument("--db-name", default="hospital_bench")
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--wards", type=int, default=5)
+    parser.add_argument("--beds-per-ward", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--login-requests", type=int, default=30, help="logins are dominated by password hashing")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--output")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"))
+    parser.add_argument("--threshold", type=float, default=20.0, help="p95 regression %% for --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+    run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
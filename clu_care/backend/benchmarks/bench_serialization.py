@@ -0,0 +1,89 @@
+"""Serialization cost per 10k patients, before and after the BSON JSON provider.
+
+before: copy + serialize_doc() loop, then Flask's default jsonify
+after:  raw cursor documents straight into BSONJSONProvider (orjson)
+
+    cd clu_care/backend && python -m benchmarks.bench_serialization
+"""
+import copy
+import datetime
+import random
+import statistics
+import time
+
+from bson import Decimal128, ObjectId
+from flask import Flask
+
+from app.utils.json_provider import init_json
+
+PATIENTS = 10_000
+ROUNDS = 7
+
+
+def make_patients(n, seed=42):
+    rng = random.Random(seed)
+    doctors = [ObjectId() for _ in range(50)]
+    return [{
+        "_id": ObjectId(),
+        "patientId": f"P-{i:06d}",
+        "name": f"Patient {i}",
+        "age": rng.randint(1, 95),
+        "gender": rng.choice(["male", "female"]),
+        "bloodGroup": rng.choice(["A+", "B+", "O+", "AB-"]),
+        "type": rng.choice(["OPD", "IPD"]),
+        "medicalSpecialty": rng.choice(["cardiology", "neurology", "general"]),
+        "description": "Routine admission",
+        "contact": {"phone": "555-0100", "email": f"patient{i}@example.com"},
+        "insurance": {"provider": "Acme", "policy": f"POL{i}", "cover": Decimal128("25000.00")},
+        "status": "admitted",
+        "admissionDate": datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=i),
+        "assignedDoctor": rng.choice(doctors),
+        "assignedDoctorName": "Dr Example",
+        "wardNumber": rng.randint(1, 5),
+        "cartNumber": rng.randint(1, 10),
+    } for i in range(n)]
+
+
+def serialize_doc(doc):
+    # The per-document conversion admin_bp.py used before the provider
+    doc["_id"] = str(doc["_id"])
+    if doc.get("assignedDoctor") is not None:
+        doc["assignedDoctor"] = str(doc["assignedDoctor"])
+    doc["insurance"]["cover"] = str(doc["insurance"]["cover"])
+    return doc
+
+
+def timed(fn, docs):
+    samples = []
+    for _ in range(ROUNDS):
+        batch = copy.deepcopy(docs)  # a fresh "cursor result" each round
+        start = time.perf_counter()
+        fn(batch)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    docs = make_patients(PATIENTS)
+
+    before_app = Flask("before")
+    after_app = init_json(Flask("after"))
+
+    def before(batch):
+        with before_app.app_context():
+            return before_app.json.response([serialize_doc(d) for d in batch]).get_data()
+
+    def after(batch):
+        with after_app.app_context():
+            return after_app.json.response(batch).get_data()
+
+    t_before = timed(before, docs)
+    t_after = timed(after, docs)
+    print(f"{PATIENTS} patients, median of {ROUNDS} rounds")
+    print(f"  before (serialize_doc + default provider): {t_before * 1000:8.1f} ms")
+    print(f"  after  (BSONJSONProvider, no mutation):    {t_after * 1000:8.1f} ms")
+    print(f"  speedup: {t_before / t_after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Throughput of the real HTTP servers: the Flask dev server vs gunicorn (wsgi:app).
+
+Starts each server in a subprocess on a seeded dataset, drives the hot read
+endpoints over keep-alive HTTP connections from `--concurrency` client
+threads for `--duration` seconds each, and writes requests/s and latency
+percentiles to a JSON file.
+
+    cd clu_care/backend
+    python -m benchmarks.bench_server --dataset 1k
+    python -m benchmarks.bench_server --servers gunicorn --workers 4 --engine mongo
+
+The dev server runs as app.py starts it (debug on) with the reloader off,
+so the seeded in-memory data survives. gunicorn uses gunicorn.conf.py with
+--preload added: with the memory engine, workers inherit the store the
+master seeded.
+"""
+import argparse
+import datetime
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import types
+
+from benchmarks.bench_endpoints import RESULTS_DIR, configure_environment, git_commit, percentile
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVERS = ("dev", "gunicorn")
+ENDPOINTS = [
+    ("patients_first_page", "/api/patients"),
+    ("staff", "/api/staff"),
+    ("beds", "/api/beds"),
+    ("staff_available", "/staff/available?specialty=general"),
+    ("dashboard_stats", "/api/dashboard/stats"),
+]
+
+
+# ================== SERVER SIDE ==================
+
+def seeded_app():
+    """Seed the dataset named in BENCH_* variables, then load wsgi:app (gunicorn factory)."""
+    args = types.SimpleNamespace(engine=os.environ["BENCH_ENGINE"], db_name=os.environ["BENCH_DB_NAME"])
+    layout_path = configure_environment(args)
+
+    from app.utils.mongo import mongo
+    from benchmarks import datasets
+
+    datasets.write_layout(layout_path, int(os.environ["BENCH_WARDS"]), int(os.environ["BENCH_BEDS_PER_WARD"]))
+    db = mongo.database()
+    datasets.clear(db)
+    datasets.seed(db, datasets.DATASETS[os.environ["BENCH_DATASET"]], staff=int(os.environ["BENCH_STAFF"]))
+
+    import wsgi
+    return wsgi.app
+
+
+def serve_dev(port):
+    seeded_app().run(debug=True, use_reloader=False, host="127.0.0.1", port=port)
+
+
+# ================== CLIENT SIDE ==================
+
+def start_server(server, args, port):
+    env = {
+        **os.environ,
+        "BENCH_ENGINE": args.engine, "BENCH_DB_NAME": args.db_name, "BENCH_DATASET": args.dataset,
+        "BENCH_STAFF": str(args.staff), "BENCH_WARDS": str(args.wards),
+        "BENCH_BEDS_PER_WARD": str(args.beds_per_ward),
+        "LOG_LEVEL": "WARNING", "WEB_CONCURRENCY": str(args.workers), "GUNICORN_THREADS": str(args.threads),
+        "GUNICORN_BIND": f"127.0.0.1:{port}", "GUNICORN_LOG_LEVEL": "warning",
+    }
+    if server == "dev":
+        command = [sys.executable, "-m", "benchmarks.bench_server", "--serve-dev", str(port)]
+    else:
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--preload",
+                   "benchmarks.bench_server:seeded_app()"]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL)
+
+
+def wait_until_up(port, process, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"server did not answer within {timeout}s")
+
+
+def drive(port, path, concurrency, duration):
+    """Keep `concurrency` connections busy on `path` for `duration` seconds."""
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine, codes = [], {}
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Accept-Encoding": "identity"})
+                response = conn.getresponse()
+                response.read()
+                status = str(response.status)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                status = "error"
+            mine.append(time.perf_counter() - start)
+            codes[status] = codes.get(status, 0) + 1
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            for code, count in codes.items():
+                statuses[code] = statuses.get(code, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughputRps": round(len(latencies) / elapsed, 1),
+        "p50Ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95Ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99Ms": round(percentile(latencies, 99) * 1000, 3),
+        "statuses": statuses,
+    }
+
+
+def run(args):
+    results = {}
+    for offset, server in enumerate(args.servers):
+        port = args.port + offset
+        print(f"🚀 Starting {server} on :{port} ({args.dataset}, {args.engine})...")
+        process = start_server(server, args, port)
+        try:
+            wait_until_up(port, process, args.startup_timeout)
+            results[server] = {}
+            for name, path in ENDPOINTS:
+                drive(port, path, args.concurrency, min(1.0, args.duration))  # warm-up, not recorded
+                result = results[server][name] = drive(port, path, args.concurrency, args.duration)
+                print(f"  {name:22s} {result['throughputRps']:8.1f} req/s  p50 {result['p50Ms']:8.2f} ms  "
+                      f"p99 {result['p99Ms']:8.2f} ms")
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+
+    if len(results) == len(SERVERS):
+        print("gunicorn / dev server throughput:")
+        for name, _ in ENDPOINTS:
+            dev, prod = results["dev"][name]["throughputRps"], results["gunicorn"][name]["throughputRps"]
+            print(f"  {name:22s} {prod / dev if dev else float('nan'):5.2f}x")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "dataset": args.dataset,
+            "engine": args.engine,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "workers": args.workers,
+            "threads": args.threads,
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"server-{args.dataset}-{args.engine}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results written to {output}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", choices=["1k", "100k", "1m"], default="1k")
+    parser.add_argument("--engine", choices=["memory", "mongo"], default="memory")
+    parser.add_argument("--db-name", default="hospital_bench")
+    parser.add_argument("--staff", type=int, default=200)
+    parser.add_argument("--wards", type=int, default=5)
+    parser.add_argument("--beds-per-ward", type=int, default=10)
+    parser.add_argument("--servers", nargs="+", choices=SERVERS, default=list(SERVERS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output")
+    parser.add_argument("--verbose", action="store_true", help="show server logs")
+    parser.add_argument("--serve-dev", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve_dev:
+        serve_dev(args.serve_dev)
+        return 0
+    run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
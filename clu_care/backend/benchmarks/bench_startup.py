@@ -0,0 +1,121 @@
+"""Cold-start time: from spawning a fresh interpreter to the app's first response.
+
+For each MONGODB_URI, runs `--runs` fresh processes that import wsgi:app and
+then call /health through the test client, until it answers 200 (ready) or
+`--ready-timeout` passes. It reports the import time, the time to the first
+/health response (whatever its status), and the time until ready, all
+measured from spawn. It writes the medians to a JSON file.
+
+    cd clu_care/backend
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --uris mongodb://localhost:27017/ --runs 10
+
+The default URIs are the in-memory engine and a port nothing listens on,
+i.e. a database that is down. In the second case the app never becomes
+ready (it stays 503 and keeps retrying), so the run shows the time to a
+first "not ready" answer; set MONGODB_MEMORY_FALLBACK=1 to measure the
+development fallback to the in-memory store instead.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_endpoints import RESULTS_DIR, git_commit
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_URIS = ["memory://", "mongodb://127.0.0.1:9/"]
+STEPS = ("importSeconds", "firstResponseSeconds", "readySeconds")
+
+
+def child(ready_timeout):
+    """Runs in the measured process; prints wall-clock timestamps as one JSON line."""
+    stamps = {}
+    import wsgi
+    stamps["imported"] = time.time()
+
+    client = wsgi.app.test_client()
+    response = client.get("/health")
+    stamps["firstResponse"] = time.time()
+    stamps["firstStatus"] = response.status_code
+
+    deadline = time.time() + ready_timeout
+    while response.status_code != 200 and time.time() < deadline:
+        time.sleep(0.05)
+        response = client.get("/health")
+    if response.status_code == 200:
+        stamps["ready"] = time.time()
+    print(json.dumps(stamps), flush=True)
+
+
+def measure(uri, ready_timeout):
+    env = {**os.environ, "MONGODB_URI": uri, "LOG_LEVEL": "ERROR", "READINESS_INTERVAL": "0.1"}
+    spawned = time.time()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", "--ready-timeout", str(ready_timeout)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    stamps = json.loads(output.strip().splitlines()[-1])
+    return {
+        "importSeconds": stamps["imported"] - spawned,
+        "firstResponseSeconds": stamps["firstResponse"] - spawned,
+        "firstStatus": stamps["firstStatus"],
+        "readySeconds": stamps["ready"] - spawned if "ready" in stamps else None,
+    }
+
+
+def run(args):
+    results = {}
+    for uri in args.uris:
+        runs = [measure(uri, args.ready_timeout) for _ in range(args.runs)]
+        summary = {"runs": len(runs), "firstStatus": runs[-1]["firstStatus"]}
+        for step in STEPS:
+            values = [r[step] for r in runs if r[step] is not None]
+            summary[step] = round(statistics.median(values), 3) if values else None
+        results[uri] = summary
+        print(f"  {uri:28s} import {summary['importSeconds']:6.2f} s  first response "
+              f"{summary['firstResponseSeconds']:6.2f} s ({summary['firstStatus']})  ready "
+              f"{summary['readySeconds'] if summary['readySeconds'] is not None else 'never'} s")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results written to {output}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uris", nargs="+", default=DEFAULT_URIS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--output")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.ready_timeout)
+        return 0
+    run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Deterministic synthetic hospital datasets for the benchmarks.
+
+The same (size, seed) always produces the same documents and _ids, so runs
+on different commits query identical data.
+"""
+import datetime
+import json
+import random
+
+from bson import ObjectId
+
+from app.utils.assignment import backfill_caseloads
+from app.utils.bed_index import load_ward_layout
+from app.utils.identity import normalize_email
+from app.utils.passwords import hash_password
+from app.utils.patients import ensure_patient_ids
+from app.utils.triage import ensure_case_ranks, severity_rank
+
+DATASETS = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+DEPARTMENTS = ["general", "cardiology", "neurology", "orthopedics", "pediatrics", "icu"]
+ADMIN_EMAIL = "admin@bench.local"
+BENCH_PASSWORD = "bench-pass"
+# Only the first few patients get a password; hashing a million is not the point
+PATIENTS_WITH_LOGIN = 100
+SEEDED_COLLECTIONS = ["users", "staff", "patients", "identities", "inventory", "emergency_cases", "counters"]
+
+_EPOCH = int(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc).timestamp())
+_KINDS = {"users": 1, "staff": 2, "patients": 3, "inventory": 4, "emergency_cases": 5}
+
+
+def object_id(collection, n):
+    """Stable ObjectId for the n-th document of a collection, increasing with n."""
+    return ObjectId(_EPOCH.to_bytes(4, "big") + bytes([_KINDS[collection]]) + n.to_bytes(7, "big"))
+
+
+def write_layout(path, wards, beds_per_ward):
+    """Write a ward.json with `wards` wards; point WARD_LAYOUT_PATH at it before the app loads."""
+    with open(path, "w") as f:
+        json.dump([{
+            "_id": f"ward{n}",
+            "name": f"Ward-{n}",
+            "specialty": DEPARTMENTS[(n - 1) % len(DEPARTMENTS)],
+            "bedCount": beds_per_ward,
+        } for n in range(1, wards + 1)], f)
+
+
+def staff_email(n):
+    return f"staff{n}@bench.local"
+
+
+def patient_email(n):
+    return f"patient{n}@bench.local"
+
+
+def make_staff(count, rng, password):
+    for n in range(count):
+        role = "doctor" if n % 10 < 6 else "nurse" if n % 10 < 9 else "receptionist"
+        yield {
+            "_id": object_id("staff", n),
+            "staffId": f"S-{n:05d}",
+            "name": f"{'Dr ' if role == 'doctor' else ''}Staff {n}",
+            "email": staff_email(n),
+            "password": password,
+            "role": role,
+            "department": DEPARTMENTS[n % len(DEPARTMENTS)],
+            "phone": f"555-{n:04d}",
+            "status": rng.choice(["active", "active", "active", "unavailable"]),
+        }
+
+
+def make_patients(count, rng, doctor_ids, beds, password):
+    """Patients; the first len(beds) IPD admissions each occupy a distinct bed."""
+    admitted_at = datetime.datetime(2024, 1, 1)
+    for n in range(count):
+        patient_type = "IPD" if n < len(beds) or rng.random() < 0.3 else "OPD"
+        if n < len(beds):
+            status, (ward, bed) = "admitted", beds[n]
+        else:
+            status = "discharged" if patient_type == "IPD" else "registered"
+            ward = bed = None
+        yield {
+            "_id": object_id("patients", n),
+            "patientId": f"P-{n:07d}",
+            "name": f"Patient {n}",
+            "age": rng.randint(1, 95),
+            "gender": rng.choice(["male", "female"]),
+            "bloodGroup": rng.choice(["A+", "A-", "B+", "O+", "O-", "AB+"]),
+            "type": patient_type,
+            "medicalSpecialty": rng.choice(DEPARTMENTS),
+            "description": "Synthetic benchmark patient",
+            "password": password if n < PATIENTS_WITH_LOGIN else None,
+            "contact": {"phone": f"555-{n % 10000:04d}", "email": patient_email(n)},
+            "insurance": {"provider": rng.choice(["Acme", "Globex", "Initech"]), "policy": f"POL{n}"},
+            "status": status,
+            "admissionDate": admitted_at + datetime.timedelta(minutes=n) if patient_type == "IPD" else None,
+            "assignedDoctor": rng.choice(doctor_ids) if doctor_ids else None,
+            "wardNumber": ward,
+            "cartNumber": bed,
+        }
+
+
+def make_inventory(count, rng):
+    for n in range(count):
+        yield {
+            "_id": object_id("inventory", n),
+            "name": f"Item {n}",
+            "quantity": rng.randint(0, 200),
+            "threshold": rng.choice([None, 10, 25]),
+        }
+
+
+def make_emergency_cases(count, rng, patient_count):
+    for n in range(count):
+        priority = rng.choice(["critical", "high", "medium", "low"])
+        yield {
+            "_id": object_id("emergency_cases", n),
+            "caseId": f"E-{n:07d}",
+            "patientId": f"P-{rng.randrange(max(patient_count, 1)):07d}",
+            "priority": priority,
+            "severityRank": severity_rank(priority),
+            "status": rng.choice(["open", "open", "in_progress", "resolved"]),
+            "createdAt": datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=n),
+        }
+
+
+def identity_docs(collection, docs):
+    for doc in docs:
+        yield {"email": normalize_email(doc["email"]), "collection": collection, "userId": doc["_id"],
+               "role": doc["role"]}
+
+
+def insert_batches(collection, docs, batch_size):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def clear(db):
+    """Remove seeded documents, keeping the collections' indexes."""
+    for name in SEEDED_COLLECTIONS:
+        db[name].delete_many({})
+
+
+def seed(db, patients, staff=200, inventory=500, emergency_cases=100, seed=42, batch_size=10_000):
+    """Seed a dataset into `db` and return what was created.
+
+    All accounts share BENCH_PASSWORD; the admin logs in as ADMIN_EMAIL.
+    """
+    rng = random.Random(seed)
+    password = hash_password(BENCH_PASSWORD)
+    layout = load_ward_layout()
+    beds = [(ward["number"], bed) for ward in layout for bed in range(1, ward["bedCount"] + 1)]
+    beds = beds[:int(patients * 0.8)]
+
+    admin = {
+        "_id": object_id("users", 0),
+        "email": ADMIN_EMAIL,
+        "password": password,
+        "role": "admin",
+        "name": "Benchmark Administrator",
+        "permissions": ["all"],
+        "created_at": datetime.datetime(2024, 1, 1),
+    }
+    db.users.insert_one(admin)
+    db.identities.insert_one({"email": ADMIN_EMAIL, "collection": "users", "userId": admin["_id"], "role": "admin"})
+
+    staff_docs = list(make_staff(staff, rng, password))
+    insert_batches(db.staff, staff_docs, batch_size)
+    insert_batches(db.identities, identity_docs("staff", staff_docs), batch_size)
+    doctor_ids = [doc["_id"] for doc in staff_docs if doc["role"] == "doctor"]
+
+    insert_batches(db.patients, make_patients(patients, rng, doctor_ids, beds, password), batch_size)
+    # Regenerated rather than kept around, so 1M patients never sit in memory twice
+    insert_batches(db.identities, (
+        {"email": patient_email(n), "collection": "patients", "userId": object_id("patients", n),
+         "role": "patient"}
+        for n in range(patients)
+    ), batch_size)
+
+    backfill_caseloads(db)  # doctors' caseloads from their admitted patients
+    ensure_patient_ids(db)  # new patients are numbered after P-{patients - 1:07d}
+
+    insert_batches(db.inventory, make_inventory(inventory, rng), batch_size)
+    insert_batches(db.emergency_cases, make_emergency_cases(emergency_cases, rng, patients), batch_size)
+    ensure_case_ranks(db)  # new cases are numbered after E-{emergency_cases - 1:07d}
+
+    return {
+        "patients": patients,
+        "staff": staff,
+        "doctors": len(doctor_ids),
+        "wards": len(layout),
+        "beds": sum(ward["bedCount"] for ward in layout),
+        "occupiedBeds": len(beds),
+        "inventory": inventory,
+        "emergencyCases": emergency_cases,
+    }
@@ -0,0 +1,39 @@
+"""gunicorn settings for wsgi:app. Every value can be overridden from the environment."""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# One process per core; each keeps its own in-memory indexes and Mongo pool
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+# Requests mostly wait on Mongo, so each worker serves from a thread pool
+# instead of one request at a time
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+# /api/beds/stream (SSE) holds a thread for as long as a screen is open. Each
+# worker takes at most SSE_MAX_SUBSCRIBERS streams (default threads // 2) and
+# answers 503 + Retry-After beyond that, so capacity for live bed boards is
+# workers * SSE_MAX_SUBSCRIBERS; raise GUNICORN_THREADS to serve more screens.
+
+# Workers import the app themselves, so `kill -HUP` reloads code
+preload_app = os.getenv("GUNICORN_PRELOAD", "").lower() in ("1", "true", "yes")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recycle workers now and then so slow leaks can't accumulate (0 disables).
+# A recycled worker ends its open SSE streams after graceful_timeout; the
+# browsers' EventSource reconnects to another worker on its own.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# The app logs JSON lines of its own (LOG_FORMAT); keep gunicorn's to errors
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_worker_init(worker):
+    # Runs in the worker after the app is loaded and before it accepts connections
+    from wsgi import warm_up
+
+    warm_up()
@@ -0,0 +1,96 @@
+"""Fixtures for the behaviour suite: the real app on the in-memory store.
+
+Run from clu_care/backend:
+
+    python -m pytest -q
+
+Settings are read when the app modules are imported, so they are set here
+before anything from the app is imported: MONGODB_URI=memory://, a small
+two-ward layout, a low doctor caseload cap and a temporary upload directory.
+"""
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+TMP_DIR = tempfile.mkdtemp(prefix="clucare-tests-")
+WARD_LAYOUT = [
+    {"name": "Ward 1", "number": 1, "specialty": "cardiology", "bedCount": 4},
+    {"name": "Ward 2", "number": 2, "specialty": "neurology", "bedCount": 4},
+]
+with open(os.path.join(TMP_DIR, "ward.json"), "w") as f:
+    json.dump(WARD_LAYOUT, f)
+
+os.environ.update({
+    "MONGODB_URI": "memory://",
+    "MONGODB_DB": "clucare_tests",
+    "FLASK_SECRET_KEY": "clucare-test-secret-key-of-at-least-32-bytes",
+    "LOG_LEVEL": "CRITICAL",
+    "WARD_LAYOUT_PATH": os.path.join(TMP_DIR, "ward.json"),
+    "IMPORT_UPLOAD_DIR": os.path.join(TMP_DIR, "imports"),
+    "DOCTOR_MAX_CASELOAD": "2",
+    "SSE_MAX_SUBSCRIBERS": "2",
+    "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+    "PASSWORD_HASH_WORKERS": "1",
+})
+
+ADMIN_EMAIL = "admin@clucare.com"
+ADMIN_PASSWORD = "admin123"
+
+
+@pytest.fixture(scope="session")
+def wsgi_app():
+    import wsgi
+
+    assert wsgi.main.readiness.wait(10), "the in-memory database never became ready"
+    return wsgi
+
+
+@pytest.fixture
+def db(wsgi_app):
+    """The app's database, emptied (counters aside) and with every in-process cache reset."""
+    import admin_bp
+    from app.utils.db import get_db
+    from app.utils.ids import COUNTERS_COLLECTION
+    from app.utils.mongo import mongo
+    from app.utils.response_cache import response_cache
+    from app.utils.token_cache import token_cache
+
+    database = mongo.database()
+    # Counters stay: the allocators hold reserved blocks that must not be handed out twice
+    for name in database.list_collection_names():
+        if name != COUNTERS_COLLECTION:
+            database[name].delete_many({})
+    get_db().initialize_default_admin()
+
+    admin_bp.bed_index.load(admin_bp.patients_collection, admin_bp.staff_collection)
+    admin_bp.triage_queue.load(admin_bp.emergency_collection)
+    admin_bp.doctor_availability.invalidate()
+    admin_bp.dashboard_snapshot.invalidate()
+    response_cache.clear()
+    token_cache.clear()
+    return database
+
+
+@pytest.fixture
+def client(wsgi_app, db):
+    return wsgi_app.app.test_client()
+
+
+@pytest.fixture
+def add_doctor(client, db):
+    """POST a doctor through the API and return its stored document."""
+    def add(name="Dr Test", department="cardiology", **fields):
+        email = fields.pop("email", f"{name.lower().replace(' ', '.')}@clucare.test")
+        response = client.post("/api/staff", json={
+            "name": name, "role": "doctor", "department": department, "status": "active", "email": email,
+            **fields
+        })
+        assert response.status_code == 201, response.get_json()
+        return db.staff.find_one({"email": email})
+    return add
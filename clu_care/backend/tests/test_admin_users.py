@@ -0,0 +1,68 @@
+"""GET /admin/users: the user collections read in parallel and merged into one paginated list."""
+import json
+
+from bson import ObjectId
+
+from app.models.admin_model import USER_COLLECTIONS
+
+
+def seed_users(db, per_collection=3):
+    ids = {}
+    for collection in USER_COLLECTIONS:
+        docs = [{"_id": ObjectId(), "name": f"{collection} {n}", "password": "secret"} for n in range(per_collection)]
+        db[collection].insert_many(docs)
+        ids[collection] = [d["_id"] for d in docs]
+    return ids
+
+
+def test_pages_merge_every_collection_in_id_order(client, db):
+    ids = seed_users(db)
+    expected = sorted(str(i) for collection in ids.values() for i in collection)
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/admin/users", query_string={"limit": 4, **({"cursor": cursor} if cursor else {})})
+        page = response.get_json()
+        assert len(page) <= 4
+        seen += page
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert [u["_id"] for u in seen] == expected
+    assert {u["role"] for u in seen} == {c[:-1] for c in USER_COLLECTIONS}
+    assert all("password" not in u for u in seen)
+
+
+def test_one_full_collection_still_gets_a_next_cursor(client, db):
+    db.patients.insert_many([{"name": f"Patient {n}"} for n in range(5)])
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/admin/users", query_string={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        seen += response.get_json()
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert (len(seen), pages) == (5, 3)
+
+
+def test_an_exactly_full_last_page_has_no_cursor(client, db):
+    db.patients.insert_many([{"name": f"Patient {n}"} for n in range(2)])
+    response = client.get("/admin/users?limit=2")
+    assert len(response.get_json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_a_tampered_cursor_is_a_400(client):
+    assert client.get("/admin/users?cursor=bm90LWEtY3Vyc29y").status_code == 400
+
+
+def test_the_stream_lists_every_user(client, db):
+    seed_users(db, per_collection=2)
+    response = client.get("/admin/users?stream=1")
+    users = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(users) == 2 * len(USER_COLLECTIONS)
+    assert [u["_id"] for u in users] == sorted(u["_id"] for u in users)
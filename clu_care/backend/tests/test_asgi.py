@@ -0,0 +1,60 @@
+"""The Quart app answers the read endpoints with the same contract as the Flask app."""
+import asyncio
+
+import pytest
+
+asgi = pytest.importorskip("asgi")
+
+
+def quart_get(*requests):
+    """GET each (path, headers) on the ASGI app; returns (status, headers, body) per request."""
+    async def run():
+        async with asgi.app.test_app() as test_app:
+            client = test_app.test_client()
+            responses = []
+            for path, headers in requests:
+                response = await client.get(path, headers=headers or {})
+                responses.append((response.status_code, response.headers, await response.get_data()))
+            return responses
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def seeded(client, add_doctor):
+    doctor = add_doctor("Dr Async")
+    for n in range(3):
+        response = client.post("/api/patients", json={"name": f"P{n}", "password": "secret",
+                                                      "assignedDoctor": str(doctor["_id"])})
+        assert response.status_code == 201, response.get_json()
+    return doctor
+
+
+def test_patients_match_the_flask_response(client, seeded):
+    flask_body = client.get("/api/patients").get_json()
+    assert {p.get("assignedDoctorName") for p in flask_body} == {"Dr Async"}
+    [(status, headers, body)] = quart_get(("/api/patients", None))
+    assert status == 200
+    assert asgi.app.json.loads(body) == flask_body
+    assert all("password" not in p for p in flask_body)
+    assert "Accept" in headers.get("Vary", "")
+
+
+def test_field_projection_and_pages(client, seeded):
+    [(_, headers, body)] = quart_get(("/api/patients?fields=name&limit=2", None))
+    page = asgi.app.json.loads(body)
+    assert [set(p) for p in page] == [{"_id", "name"}] * 2
+    assert headers["X-Next-Cursor"] == page[-1]["_id"]
+
+
+def test_staff_etag_matches_flask_and_revalidates(client, seeded):
+    etag = client.get("/api/staff").headers["ETag"]
+    [(status, headers, _), (revalidated, _, body)] = quart_get(("/api/staff", None),
+                                                               ("/api/staff", {"If-None-Match": etag}))
+    assert (status, headers["ETag"]) == (200, etag)
+    assert (revalidated, body) == (304, b"")
+
+
+def test_ndjson_stream(client, seeded):
+    [(_, headers, body)] = quart_get(("/api/patients", {"Accept": "application/x-ndjson"}))
+    assert headers["Content-Type"].startswith("application/x-ndjson")
+    assert len(body.splitlines()) == 3
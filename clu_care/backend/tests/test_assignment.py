@@ -0,0 +1,63 @@
+"""Doctor assignment: atomic claims under DOCTOR_MAX_CASELOAD, and rollback of failed admissions."""
+from app.utils.assignment import DOCTOR_MAX_CASELOAD, claim_doctor, release_doctor
+
+
+def test_inpatients_go_to_the_least_loaded_doctor_in_their_specialty(client, db, add_doctor):
+    busy = add_doctor("Dr Busy", caseload=1)
+    idle = add_doctor("Dr Idle")
+    add_doctor("Dr Elsewhere", department="neurology")
+
+    response = client.post("/api/patients", json={"name": "A", "type": "IPD", "medicalSpecialty": "cardiology"})
+    assert response.status_code == 201
+    assert response.get_json()["assignedDoctor"] == str(idle["_id"])
+    assert db.staff.find_one({"_id": idle["_id"]})["caseload"] == 1
+    assert db.staff.find_one({"_id": busy["_id"]})["caseload"] == 1
+
+
+def test_claims_stop_at_the_caseload_cap(db, add_doctor):
+    doctor = add_doctor()
+    claimed = [claim_doctor(db.staff, "cardiology") for _ in range(DOCTOR_MAX_CASELOAD + 1)]
+
+    assert claimed[-1] is None
+    assert db.staff.find_one({"_id": doctor["_id"]})["caseload"] == DOCTOR_MAX_CASELOAD
+    release_doctor(db.staff, doctor["_id"])
+    assert claim_doctor(db.staff, doctor_id=doctor["_id"]) is not None
+
+
+def test_a_full_requested_doctor_is_refused_and_the_email_freed(client, db, add_doctor):
+    doctor = add_doctor(caseload=DOCTOR_MAX_CASELOAD)
+    response = client.post("/api/patients", json={
+        "name": "A", "type": "IPD", "assignedDoctor": str(doctor["_id"]), "contact": {"email": "a@clucare.test"}
+    })
+    assert response.status_code == 409
+    assert db.identities.find_one({"email": "a@clucare.test"}) is None
+
+
+def test_a_bed_conflict_gives_back_the_doctor_slot_and_the_email(client, db, add_doctor):
+    doctor = add_doctor()
+    # Taken by another worker, so only the unique index notices
+    db.patients.insert_one({"name": "Elsewhere", "status": "admitted", "wardNumber": 1, "cartNumber": 1})
+
+    response = client.post("/api/patients", json={
+        "name": "A", "type": "IPD", "medicalSpecialty": "cardiology", "wardNumber": 1, "cartNumber": 1,
+        "contact": {"email": "a@clucare.test"}
+    })
+    assert response.status_code == 409
+    assert db.staff.find_one({"_id": doctor["_id"]})["caseload"] == 0
+    assert db.identities.find_one({"email": "a@clucare.test"}) is None
+
+
+def test_discharge_frees_the_doctor_slot(client, db, add_doctor):
+    doctor = add_doctor()
+    client.post("/api/patients", json={"name": "A", "type": "IPD", "medicalSpecialty": "cardiology"})
+    patient = db.patients.find_one({"name": "A"})
+
+    assert client.put(f"/api/patients/{patient['_id']}/discharge").status_code == 200
+    assert db.staff.find_one({"_id": doctor["_id"]})["caseload"] == 0
+
+
+def test_available_doctors_leave_out_full_ones(client, add_doctor):
+    add_doctor("Dr Full", caseload=DOCTOR_MAX_CASELOAD)
+    free = add_doctor("Dr Free")
+    names = [d["name"] for d in client.get("/staff/available?specialty=cardiology").get_json()]
+    assert names == [free["name"]]
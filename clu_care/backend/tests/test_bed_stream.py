@@ -0,0 +1,42 @@
+"""The live bed board over Server-Sent Events (/api/beds/stream)."""
+import admin_bp
+
+
+def test_the_stream_starts_with_a_snapshot(client):
+    response = client.get("/api/beds/stream", buffered=False)
+    try:
+        assert response.mimetype == "text/event-stream"
+        first = next(response.response).decode()
+        assert first.startswith("retry: ")
+        assert "event: snapshot" in first
+    finally:
+        response.close()
+
+
+def test_streams_past_the_per_worker_cap_get_503(client):
+    # SSE_MAX_SUBSCRIBERS=2 in conftest
+    first = client.get("/api/beds/stream", buffered=False)
+    second = client.get("/api/beds/stream", buffered=False)
+    try:
+        refused = client.get("/api/beds/stream")
+        assert refused.status_code == 503
+        assert refused.headers["Retry-After"]
+    finally:
+        # Closing frees the slot even though nothing was read from the stream
+        second.close()
+        first.close()
+    assert admin_bp.bed_events.subscribers == 0
+    again = client.get("/api/beds/stream", buffered=False)
+    assert again.status_code == 200
+    again.close()
+
+
+def test_published_bed_changes_reach_subscribers():
+    subscriber = admin_bp.bed_events.subscribe()
+    try:
+        admin_bp.bed_events.publish("bed", {"ward": 1, "bedNumber": 1, "status": "Admitted"})
+        payload = subscriber.get(timeout=1).decode()
+        assert "event: bed" in payload and '"status":"Admitted"' in payload
+    finally:
+        admin_bp.bed_events.unsubscribe(subscriber)
+
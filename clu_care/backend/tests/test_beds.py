@@ -0,0 +1,47 @@
+"""Bed occupancy index behind /api/beds and /api/wards, and the unique admitted-bed index."""
+import admin_bp
+
+
+def bed(board, ward, number):
+    return next(w for w in board if w["name"] == f"Ward {ward}")["beds"][number - 1]
+
+
+def admit(client, ward, number, **fields):
+    return client.post("/api/patients", json={"name": "Bed patient", "type": "IPD", "wardNumber": ward,
+                                              "cartNumber": number, **fields})
+
+
+def test_admitting_and_discharging_updates_the_board(client):
+    response = admit(client, 1, 2)
+    assert response.status_code == 201
+    assert bed(client.get("/api/beds").get_json(), 1, 2)["status"] == "Admitted"
+
+    wards = {w["name"]: w for w in client.get("/api/wards").get_json()}
+    assert wards["Ward 1"]["availableBeds"] == 3
+    assert 2 not in wards["Ward 1"]["freeBedNumbers"]
+
+    patient = client.get("/api/patients").get_json()[0]
+    assert client.put(f"/api/patients/{patient['_id']}/discharge").status_code == 200
+    assert bed(client.get("/api/beds").get_json(), 1, 2)["status"] == "Available"
+
+
+def test_an_occupied_bed_is_refused(client):
+    assert admit(client, 2, 1).status_code == 201
+    response = admit(client, 2, 1)
+    assert response.status_code == 409
+    assert response.get_json() == {"error": "Bed is already occupied"}
+
+
+def test_the_unique_index_catches_a_bed_this_worker_has_not_seen(client, db):
+    # Written by "another worker": this process's index does not know about it
+    db.patients.insert_one({"name": "Elsewhere", "status": "admitted", "wardNumber": 1, "cartNumber": 3})
+    assert not admin_bp.bed_index.is_occupied(1, 3)
+
+    response = admit(client, 1, 3)
+    assert response.status_code == 409
+    assert db.patients.count_documents({"wardNumber": 1, "cartNumber": 3}) == 1
+
+
+def test_a_discharged_patient_does_not_hold_the_bed(client, db):
+    db.patients.insert_one({"name": "Gone", "status": "discharged", "wardNumber": 1, "cartNumber": 4})
+    assert admit(client, 1, 4).status_code == 201
@@ -0,0 +1,33 @@
+"""Benchmark datasets are reproducible."""
+import itertools
+
+from benchmarks.datasets import seed
+from app.utils.memory_store import MemoryClient
+
+_databases = itertools.count()
+
+
+def seeded(**kwargs):
+    db = MemoryClient()[f"bench_tests_{next(_databases)}"]
+    summary = seed(db, patients=20, staff=10, inventory=5, emergency_cases=6, **kwargs)
+    return db, summary
+
+
+def documents(db, name):
+    # Password hashes are salted, so they differ between runs
+    return [{k: v for k, v in doc.items() if k != "password"} for doc in db[name].find({}).sort("_id", 1)]
+
+
+def test_the_same_seed_builds_the_same_dataset():
+    first, summary = seeded()
+    second, _ = seeded()
+    for name in ("staff", "patients", "inventory", "emergency_cases"):
+        assert documents(first, name) == documents(second, name)
+    assert summary["patients"] == 20
+
+
+def test_emergency_cases_are_ranked_and_numbered():
+    db, _ = seeded()
+    cases = list(db.emergency_cases.find({}))
+    assert all(case["caseId"].startswith("E-") and len(case["caseId"]) == 9 for case in cases)
+    assert all(isinstance(case["severityRank"], int) for case in cases)
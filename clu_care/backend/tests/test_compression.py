@@ -0,0 +1,58 @@
+"""Negotiated compression of JSON responses and ?fields= projection on the list endpoints."""
+import gzip
+
+from bson import ObjectId
+
+from app.utils.compression import COMPRESS_MIN_SIZE, choose_encoding
+
+
+def fill_patients(db, count=50):
+    db.patients.insert_many([{"_id": ObjectId(), "name": f"Patient number {n}", "description": "x" * 40}
+                             for n in range(count)])
+
+
+def test_large_json_is_gzipped_when_asked(client, db):
+    fill_patients(db)
+    response = client.get("/api/patients", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    plain = client.get("/api/patients", headers={"Accept-Encoding": "identity"}).data
+    assert gzip.decompress(response.data) == plain
+    assert len(plain) >= COMPRESS_MIN_SIZE
+
+
+def test_small_bodies_and_streams_go_out_as_they_are(client, db):
+    small = client.get("/test", headers={"Accept-Encoding": "gzip"})
+    assert len(small.data) < COMPRESS_MIN_SIZE and "Content-Encoding" not in small.headers
+    fill_patients(db)
+    stream = client.get("/api/patients?stream=1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in stream.headers
+
+
+def test_compressed_responses_keep_a_weak_etag_that_still_validates(client, db):
+    db.staff.insert_many([{"name": f"Nurse {n}", "role": "nurse", "department": "general" * 5} for n in range(40)])
+    response = client.get("/api/staff", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["ETag"].startswith('W/"')
+
+    again = client.get("/api/staff", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_encoding_negotiation_honours_q_values():
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*") is not None
+
+
+def test_fields_narrows_each_document(client, db):
+    db.patients.insert_many([{"name": f"P{n}", "age": 40, "gender": "F"} for n in range(2)])
+    patients = client.get("/api/patients?fields=name,age").get_json()
+    assert all(set(p) == {"_id", "name", "age"} for p in patients)
+
+
+def test_malformed_field_names_are_a_400(client):
+    response = client.get("/api/patients?fields=name,$where")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid field: $where"}
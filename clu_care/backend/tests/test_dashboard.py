@@ -0,0 +1,83 @@
+"""GET /api/dashboard/stats: one $facet per collection behind a write-invalidated snapshot."""
+import asyncio
+
+from app.utils.queries import DASHBOARD_FACETS, facet_pipeline, facet_values
+from app.utils.snapshot import AsyncSnapshot, Snapshot
+
+
+def stats(client):
+    return client.get("/api/dashboard/stats").get_json()
+
+
+def test_counts_reflect_every_collection(client, db, add_doctor):
+    add_doctor()
+    client.post("/api/staff", json={"name": "Nurse", "role": "nurse"})
+    client.post("/api/patients", json={"name": "In", "type": "IPD", "wardNumber": 1, "cartNumber": 1})
+    client.post("/api/patients", json={"name": "Out"})
+    db.inventory.insert_many([{"name": "Gauze", "quantity": 3}, {"name": "Masks", "quantity": 50, "threshold": 100},
+                              {"name": "Gloves", "quantity": 500}])
+    client.post("/api/emergency", json={"patientName": "E", "priority": "critical"})
+
+    body = stats(client)
+    assert (body["patients"], body["admitted"], body["staff"], body["doctors"], body["nurses"]) == (2, 1, 2, 1, 1)
+    assert (body["inventoryItems"], body["lowStock"]) == (3, 2)
+    assert (body["alerts"], body["criticalAlerts"]) == (1, 1)
+    assert (body["totalBeds"], body["occupiedBeds"], body["bedOccupancy"]) == (8, 1, "12%")
+
+
+def test_writes_invalidate_the_snapshot(client):
+    assert stats(client)["patients"] == 0
+    client.post("/api/patients", json={"name": "New"})
+    body = stats(client)
+    assert body["patients"] == 1
+    assert body["snapshotAge"] < 1
+
+
+def test_unchanged_data_is_served_from_the_snapshot(client, db):
+    stats(client)
+    # Not through the API, so nothing invalidates the snapshot
+    db.patients.insert_one({"name": "Direct"})
+    assert stats(client)["patients"] == 0
+
+
+def test_facet_pipeline_counts_every_filter_in_one_aggregation(db):
+    db.patients.insert_many([{"status": "admitted"}, {"status": "admitted"}, {"status": "discharged"}])
+    facets = DASHBOARD_FACETS["patients"]
+    result = next(db.patients.aggregate(facet_pipeline(facets)))
+    assert facet_values(result, facets) == {"total": 3, "admitted": 2, "discharged": 1}
+
+
+def test_a_write_during_a_load_is_not_lost():
+    data = {"patients": 0}
+    snapshot = None
+
+    def loader():
+        value = dict(data)
+        if value["patients"] == 0:
+            # A write lands after the loader has read, before it returns
+            data["patients"] = 1
+            snapshot.invalidate()
+        return value
+
+    snapshot = Snapshot(loader, ttl=60)
+    assert snapshot.get()[0] == {"patients": 0}
+    assert snapshot.get()[0] == {"patients": 1}
+    assert snapshot.get()[0] == {"patients": 1}
+
+
+def test_the_async_snapshot_keeps_writes_during_a_load():
+    data = {"patients": 0}
+    snapshot = None
+
+    async def loader():
+        value = dict(data)
+        if value["patients"] == 0:
+            data["patients"] = 1
+            snapshot.invalidate()
+        return value
+
+    async def reads():
+        return [(await snapshot.get())[0]["patients"] for _ in range(3)]
+
+    snapshot = AsyncSnapshot(loader, ttl=60)
+    assert asyncio.run(reads()) == [0, 1, 1]
@@ -0,0 +1,108 @@
+"""Login through the identity index, and keeping identities in step with account changes."""
+from bson import ObjectId
+
+from app.utils.identity import backfill_identities, ensure_identity_index
+from app.utils.metrics import request_metrics
+from conftest import ADMIN_EMAIL, ADMIN_PASSWORD
+
+
+def login(client, email, password, role):
+    return client.post("/login", json={"email": email, "password": password, "role": role})
+
+
+def add_staff(client, db, email, password="pw", role="nurse"):
+    response = client.post("/api/staff", json={"name": "Staff", "role": role, "email": email, "password": password})
+    assert response.status_code == 201
+    return db.staff.find_one({"email": email})
+
+
+def test_the_seeded_admin_can_log_in(client):
+    response = login(client, ADMIN_EMAIL, ADMIN_PASSWORD, "admin")
+    assert response.status_code == 200
+    assert response.get_json()["token"]
+
+
+def test_wrong_password_role_and_email_are_told_apart(client):
+    assert login(client, ADMIN_EMAIL, "nope", "admin").status_code == 401
+    assert login(client, ADMIN_EMAIL, ADMIN_PASSWORD, "doctor").status_code == 403
+    assert login(client, "nobody@clucare.test", "x", "admin").status_code == 404
+
+
+def test_emails_are_unique_across_account_collections(client, db):
+    add_staff(client, db, "taken@clucare.test")
+    response = client.post("/api/patients", json={"name": "P", "contact": {"email": "Taken@clucare.test"}})
+    assert response.status_code == 409
+
+
+def test_an_unknown_email_costs_one_query(client):
+    login(client, "nobody@clucare.test", "x", "admin").close()
+    before = request_metrics.routes[("POST", "/login")].queries
+    login(client, "nobody@clucare.test", "x", "admin").close()
+    assert request_metrics.routes[("POST", "/login")].queries - before == 1
+
+
+def test_startup_backfills_accounts_written_around_the_api(client, db):
+    # Written directly, e.g. by a seed script or a migration that predates the identity index
+    db.staff.insert_one({"name": "Direct", "role": "nurse", "email": "direct@clucare.test", "password": "pw"})
+    db.patients.insert_one({"name": "Contact", "contact": {"email": "Contact@clucare.test"}})
+    db.patients.insert_one({"name": "No email"})
+    assert login(client, "direct@clucare.test", "pw", "nurse").status_code == 404
+
+    assert ensure_identity_index(db) == 2
+    assert login(client, "direct@clucare.test", "pw", "nurse").status_code == 200
+    assert db.identities.find_one({"email": "contact@clucare.test"})["collection"] == "patients"
+    assert ensure_identity_index(db) == 0
+
+
+def test_the_backfill_leaves_a_claimed_email_with_its_owner(client, db):
+    add_staff(client, db, "shared@clucare.test")
+    patient_id = db.patients.insert_one({"name": "Late", "email": "shared@clucare.test"}).inserted_id
+    assert backfill_identities(db) == 0
+    assert db.identities.find_one({"userId": patient_id}) is None
+
+
+def test_plain_text_passwords_are_rehashed_on_login(client, db):
+    staff = add_staff(client, db, "plain@clucare.test", password="pw")
+    assert login(client, "plain@clucare.test", "pw", "nurse").status_code == 200
+    assert db.staff.find_one({"_id": staff["_id"]})["password"] != "pw"
+    assert login(client, "plain@clucare.test", "pw", "nurse").status_code == 200
+
+
+def test_changing_a_staff_email_moves_the_login(client, db):
+    staff = add_staff(client, db, "old@clucare.test")
+    response = client.put(f"/staff/{staff['_id']}", json={"email": "new@clucare.test"})
+    assert response.status_code == 200
+    assert "password" not in response.get_json()
+
+    assert login(client, "new@clucare.test", "pw", "nurse").status_code == 200
+    assert login(client, "old@clucare.test", "pw", "nurse").status_code == 404
+
+
+def test_an_email_already_in_use_is_refused_and_nothing_changes(client, db):
+    add_staff(client, db, "first@clucare.test")
+    second = add_staff(client, db, "second@clucare.test")
+
+    response = client.put(f"/staff/{second['_id']}", json={"email": "first@clucare.test", "name": "Renamed"})
+    assert response.status_code == 409
+    assert db.staff.find_one({"_id": second["_id"]})["name"] == "Staff"
+    assert login(client, "second@clucare.test", "pw", "nurse").status_code == 200
+
+
+def test_malformed_and_unknown_staff_ids(client):
+    assert client.get("/staff/not-an-id").status_code == 400
+    assert client.put("/staff/not-an-id", json={"name": "x"}).status_code == 400
+    assert client.delete("/staff/not-an-id").status_code == 400
+    assert client.put(f"/staff/{ObjectId()}", json={"name": "x"}).status_code == 404
+
+
+def test_deleting_staff_frees_the_email(client, db):
+    staff = add_staff(client, db, "leaving@clucare.test")
+    assert client.delete(f"/staff/{staff['_id']}").status_code == 200
+    assert login(client, "leaving@clucare.test", "pw", "nurse").status_code == 404
+    add_staff(client, db, "leaving@clucare.test")
+
+
+
+
+def test_deleting_with_a_malformed_id_is_a_400(client):
+    assert client.delete("/admin/user/user/nope").status_code == 400
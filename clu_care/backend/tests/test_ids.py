@@ -0,0 +1,123 @@
+"""Block-reserved id allocator, counter seeding and the once-only renumbering migration."""
+import itertools
+import threading
+
+from app.utils.ids import IdAllocator, run_once, seed_counter
+from app.utils.memory_store import MemoryClient
+from app.utils.patients import ensure_patient_ids
+
+
+_databases = itertools.count()
+
+
+def fresh_db():
+    # Memory databases are shared by every client in the process, so each test takes a new one
+    return MemoryClient()[f"ids_tests_{next(_databases)}"]
+
+
+def test_workers_never_get_overlapping_ids():
+    db = fresh_db()
+    # Two processes' allocators over the same counter
+    workers = [IdAllocator(db.counters, "patientId", "P-", block_size=10) for _ in range(2)]
+    ids = []
+    for _ in range(25):
+        for worker in workers:
+            ids.append(worker.next())
+    assert len(set(ids)) == len(ids) == 50
+    assert all(len(i) == 9 for i in ids)
+
+
+def test_take_reserves_whole_blocks_in_one_round_trip():
+    db = fresh_db()
+    allocator = IdAllocator(db.counters, "patientId", "P-", block_size=100)
+    assert allocator.take(250)[-1] == "P-0000250"
+    assert allocator.blocks_reserved == 1
+    allocator.take(50)
+    assert allocator.blocks_reserved == 1
+
+
+def test_concurrent_threads_get_unique_ids():
+    db = fresh_db()
+    allocator = IdAllocator(db.counters, "caseId", "E-", block_size=7)
+    ids, lock = [], threading.Lock()
+
+    def work():
+        got = [allocator.next() for _ in range(100)]
+        with lock:
+            ids.extend(got)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids)) == 800
+
+
+def test_seeding_skips_legacy_ids_and_compares_numbers():
+    db = fresh_db()
+    allocator = IdAllocator(db.counters, "patientId", "P-")
+    db.patients.insert_many([
+        {"patientId": "P-65123456"},   # old ObjectId-based id, all digits
+        {"patientId": "P-6512a4f0"},
+        {"patientId": "P-0000042"},
+        {"patientId": "P-0000009"},
+    ])
+    seed_counter(db.patients, "patientId", allocator)
+    assert allocator.next() == "P-0000043"
+    assert allocator.number("P-65123456") is None
+
+
+def test_observe_only_moves_the_counter_forward():
+    db = fresh_db()
+    allocator = IdAllocator(db.counters, "patientId", "P-")
+    allocator.observe(["P-0000100"])
+    allocator.observe(["P-0000050", "kept-from-source"])
+    assert allocator.next() == "P-0000101"
+
+
+def test_a_migration_runs_once_while_the_other_workers_wait():
+    db = fresh_db()
+    runs, results = [], []
+
+    def migrate():
+        runs.append(1)
+        threading.Event().wait(0.2)
+        return "done"
+
+    threads = [threading.Thread(target=lambda: results.append(run_once(db.counters, "m", migrate, poll=0.02)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert runs == [1]
+    assert results.count("done") == 1 and results.count(None) == 3
+    assert run_once(db.counters, "m", migrate) is None
+
+
+def test_an_expired_lease_is_taken_over():
+    db = fresh_db()
+    db.counters.insert_one({"_id": "migration:m", "done": False, "leaseUntil": 0})
+    assert run_once(db.counters, "m", lambda: "taken over") == "taken over"
+
+
+def test_duplicate_patient_ids_are_renumbered_once():
+    # Written before the unique patientId index existed
+    db = fresh_db()
+    db.patients.insert_many([{"name": n, "patientId": "P-65123456"} for n in "abc"])
+
+    assert ensure_patient_ids(db) == 2
+    assert len({p["patientId"] for p in db.patients.find({})}) == 3
+    # A second worker (or restart) does not renumber again
+    db.patients.insert_one({"name": "d", "patientId": "P-65123456"})
+    assert ensure_patient_ids(db) == 0
+
+
+def test_new_patients_get_sequential_ids(client):
+    first = client.post("/api/patients", json={"name": "A"}).get_json()["patientId"]
+    second = client.post("/api/patients", json={"name": "B"}).get_json()["patientId"]
+    assert first.startswith("P-") and len(first) == 9
+    assert int(second[2:]) == int(first[2:]) + 1
+
@@ -0,0 +1,74 @@
+"""POST /api/patients/import: batched writes, per-row errors, doctor claims and upload cleanup."""
+import io
+import json
+import os
+
+from app.utils.assignment import DOCTOR_MAX_CASELOAD
+
+
+def upload(client, body, fmt="csv", **params):
+    return client.post("/api/patients/import", query_string={"format": fmt, **params},
+                       data={"file": (io.BytesIO(body.encode()), f"patients.{fmt}")},
+                       content_type="multipart/form-data")
+
+
+def test_rows_are_inserted_in_batches_with_new_ids(client, db):
+    rows = "\n".join(f"Patient {n},OPD" for n in range(5))
+    report = upload(client, "name,type\n" + rows + "\n", batchSize=2).get_json()
+
+    assert report["inserted"] == 5 and report["failed"] == 0 and report["batches"] == 3
+    ids = [p["patientId"] for p in db.patients.find({})]
+    assert len(set(ids)) == 5 and all(i.startswith("P-") for i in ids)
+
+
+def test_bad_rows_are_reported_and_the_rest_go_in(client, db):
+    body = "\n".join(json.dumps(row) for row in [
+        {"name": "Good"},
+        {"type": "IPD"},
+        {"name": "Bad type", "type": "XYZ"},
+        {"name": "Bed", "type": "IPD", "wardNumber": 1, "cartNumber": 1},
+        {"name": "Same bed", "type": "IPD", "wardNumber": 1, "cartNumber": 1},
+    ]) + "\nnot json\n"
+    report = upload(client, body, fmt="ndjson").get_json()
+
+    assert report["inserted"] == 2
+    assert [e["row"] for e in report["errors"]] == [2, 3, 5, 6]
+    assert report["errors"][2]["error"] == "Bed is already occupied"
+
+
+def test_inpatients_claim_doctors_within_the_caseload_cap(client, db, add_doctor):
+    doctor = add_doctor()
+    rows = "\n".join(f"IPD {n},IPD,cardiology" for n in range(DOCTOR_MAX_CASELOAD + 1))
+    report = upload(client, "name,type,medicalSpecialty\n" + rows + "\n").get_json()
+
+    assert report["inserted"] == DOCTOR_MAX_CASELOAD + 1
+    assert db.staff.find_one({"_id": doctor["_id"]})["caseload"] == DOCTOR_MAX_CASELOAD
+    assigned = db.patients.count_documents({"assignedDoctor": doctor["_id"]})
+    assert assigned == DOCTOR_MAX_CASELOAD
+
+
+def test_a_row_for_a_full_doctor_is_rejected(client, db, add_doctor):
+    doctor = add_doctor(caseload=DOCTOR_MAX_CASELOAD)
+    report = upload(client, f"name,type,assignedDoctor\nA,IPD,{doctor['_id']}\n").get_json()
+
+    assert report["inserted"] == 0
+    assert report["errors"] == [{"row": 1, "error": "Doctor is no longer available"}]
+
+
+def test_duplicate_emails_fail_only_their_row(client, db):
+    body = "name,contact.email\nA,same@clucare.test\nB,same@clucare.test\nC,\n"
+    report = upload(client, body).get_json()
+
+    assert report["inserted"] == 2
+    assert report["errors"] == [{"row": 2, "error": "Email already registered"}]
+
+
+def test_the_uploaded_file_is_deleted(client):
+    upload(client, "name\nA\n")
+    directory = os.environ["IMPORT_UPLOAD_DIR"]
+    assert os.listdir(directory) == []
+
+
+def test_an_unknown_format_is_rejected(client):
+    response = client.post("/api/patients/import", data=b"x", content_type="application/octet-stream")
+    assert response.status_code == 400
@@ -0,0 +1,45 @@
+"""Registered indexes and the hot-query plan check."""
+from app.utils.indexes import HOT_QUERIES, INDEXES, check_query_plans, ensure_indexes
+
+
+def test_every_registered_index_exists(db):
+    for collection, specs in INDEXES.items():
+        existing = set(db[collection].index_information())
+        assert {options["name"] for _, options in specs} <= existing
+
+
+def test_ensure_indexes_is_repeatable(db):
+    created, failed = ensure_indexes(db, collections=["patients"])
+    assert failed == []
+    assert ensure_indexes(db, collections=["patients"]) == (created, [])
+
+
+def test_an_index_that_fails_does_not_stop_the_rest(db):
+    # Legacy data: two admitted patients in one bed, so the unique bed index can't be built
+    db.patients.drop_index("ward_bed_admitted_unique")
+    db.emergency_cases.drop_index("caseId_unique")
+    db.patients.insert_many([{"name": n, "status": "admitted", "wardNumber": 1, "cartNumber": 1} for n in "ab"])
+
+    created, failed = ensure_indexes(db)
+    assert [(collection, name) for collection, name, _ in failed] == [("patients", "ward_bed_admitted_unique")]
+    assert "caseId_unique" in created
+    assert "caseId_unique" in db.emergency_cases.index_information()
+
+
+def only_negations(query):
+    return all(isinstance(c, dict) and set(c) <= {"$ne", "$nin"} for c in query.values())
+
+
+# The in-memory planner uses indexes for equality, $in and _id ranges only; on MongoDB
+# the $ne/$nin queries are bounded index scans too
+PLANNABLE = [q for q in HOT_QUERIES if not only_negations(q[1])]
+
+
+def test_no_hot_query_scans_a_collection(db):
+    assert len(PLANNABLE) >= len(HOT_QUERIES) - 2
+    assert check_query_plans(db, PLANNABLE) == []
+
+
+def test_a_query_without_an_index_is_reported(db):
+    queries = [("patients", {"diagnosis": "flu"}, None)] + PLANNABLE
+    assert check_query_plans(db, queries) == [("patients", {"diagnosis": "flu"})]
@@ -0,0 +1,25 @@
+"""BSON-aware JSON encoding of raw Mongo documents."""
+import datetime
+import json
+from decimal import Decimal
+
+from bson import Decimal128, ObjectId
+
+from app.utils.json_provider import dumps_bytes
+
+
+def test_bson_types_are_encoded_at_any_depth():
+    oid = ObjectId()
+    at = datetime.datetime(2024, 5, 1, 12, 30)
+    doc = {"_id": oid, "visits": [{"at": at, "fee": Decimal128("12.50")}], "total": Decimal("3.1")}
+    assert json.loads(dumps_bytes(doc)) == {
+        "_id": str(oid), "visits": [{"at": "2024-05-01T12:30:00", "fee": "12.50"}], "total": "3.1"
+    }
+    # Encoded without copying: the document keeps its BSON values
+    assert doc["_id"] is oid and doc["visits"][0]["at"] is at
+
+
+def test_responses_keep_document_key_order(client, db):
+    db.patients.insert_one({"zeta": 1, "alpha": 2, "name": "P"})
+    body = client.get("/api/patients").get_data(as_text=True)
+    assert body.index('"zeta"') < body.index('"alpha"')
@@ -0,0 +1,45 @@
+"""Structured logging that never blocks a request."""
+import json
+import logging
+import queue
+
+from app.utils.logs import DroppingQueueHandler, JSONFormatter, SamplingFilter, parse_sample_rates
+
+
+def record(message="hello", level=logging.INFO, **extra):
+    log_record = logging.LogRecord("tests", level, __file__, 1, message, (), None)
+    log_record.__dict__.update(extra)
+    return log_record
+
+
+def test_a_full_queue_drops_records_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.emit(record())
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_json_lines_carry_the_event_and_extras():
+    line = json.loads(JSONFormatter().format(record(event="patient_created", patientId="P-0000001")))
+    assert line["event"] == "patient_created"
+    assert line["patientId"] == "P-0000001"
+    assert line["level"] == "INFO"
+
+
+def test_repeated_events_are_rate_limited():
+    sampler = SamplingFilter(rate=0.001, burst=3)
+    kept = [sampler.filter(record(event="noisy")) for _ in range(10)]
+    assert kept.count(True) == 3
+    # Other events have their own bucket
+    assert sampler.filter(record(event="quiet"))
+
+
+def test_sampling_never_drops_warnings():
+    sampler = SamplingFilter({"chatty": 0.0}, rate=0)
+    assert not sampler.filter(record(event="chatty"))
+    assert sampler.filter(record(event="chatty", level=logging.WARNING))
+
+
+def test_sample_rates_parse_from_the_environment_format():
+    assert parse_sample_rates("request_finished=0.1,cache_hit=0") == {"request_finished": 0.1, "cache_hit": 0.0}
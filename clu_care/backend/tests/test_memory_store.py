@@ -0,0 +1,132 @@
+"""The in-memory store behind MONGODB_URI=memory:// behaves like the pymongo calls the app makes."""
+import itertools
+
+import pytest
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.utils.memory_store import MemoryClient
+
+_databases = itertools.count()
+
+
+@pytest.fixture
+def collection():
+    return MemoryClient()[f"memory_tests_{next(_databases)}"].things
+
+
+def names(cursor):
+    return [doc["name"] for doc in cursor]
+
+
+def test_query_operators(collection):
+    collection.insert_many([
+        {"name": "a", "n": 1, "tags": ["x", "y"], "ward": {"number": 1}},
+        {"name": "b", "n": 5, "tags": ["y"], "ward": {"number": 2}},
+        {"name": "c", "n": 9},
+    ])
+    assert names(collection.find({"n": {"$gte": 2, "$lt": 9}})) == ["b"]
+    assert names(collection.find({"tags": "x"})) == ["a"]
+    assert names(collection.find({"ward.number": {"$in": [2, 3]}})) == ["b"]
+    assert names(collection.find({"tags": {"$exists": False}})) == ["c"]
+    assert names(collection.find({"$or": [{"n": 1}, {"name": {"$regex": "^c"}}]})) == ["a", "c"]
+    assert names(collection.find({"n": {"$not": {"$gt": 1}}})) == ["a"]
+    assert names(collection.find({"$expr": {"$gt": ["$n", 4]}})) == ["b", "c"]
+
+
+def test_sort_skip_limit_and_projection(collection):
+    collection.insert_many([{"name": n, "rank": r} for n, r in [("a", 2), ("b", 1), ("c", 2), ("d", None)]])
+    cursor = collection.find({}, {"name": 1, "_id": 0}).sort([("rank", DESCENDING), ("name", ASCENDING)])
+    docs = list(cursor.skip(1).limit(2))
+    assert docs == [{"name": "c"}, {"name": "b"}]
+    # null sorts before numbers
+    assert collection.find_one({}, sort=[("rank", ASCENDING)])["name"] == "d"
+
+
+def test_update_operators_and_upsert(collection):
+    collection.insert_one({"_id": 1, "n": 1, "items": ["a"]})
+    collection.update_one({"_id": 1}, {"$inc": {"n": 2}, "$push": {"items": "b"}, "$set": {"x.y": 1}})
+    collection.update_one({"_id": 1}, {"$max": {"n": 2}, "$pull": {"items": "a"}})
+    assert collection.find_one({"_id": 1}) == {"_id": 1, "n": 3, "items": ["b"], "x": {"y": 1}}
+
+    after = collection.find_one_and_update({"_id": 2}, {"$setOnInsert": {"n": 0}, "$inc": {"seq": 5}},
+                                           upsert=True, return_document=ReturnDocument.AFTER)
+    assert after == {"_id": 2, "n": 0, "seq": 5}
+
+
+def test_returned_documents_are_copies(collection):
+    collection.insert_one({"_id": 1, "items": ["a"]})
+    collection.find_one({"_id": 1})["items"].append("changed")
+    assert collection.find_one({"_id": 1})["items"] == ["a"]
+
+
+def test_unique_index_reports_its_key_pattern(collection):
+    collection.create_index([("email", ASCENDING)], name="email_unique", unique=True)
+    collection.insert_one({"email": "a@x"})
+    with pytest.raises(DuplicateKeyError) as error:
+        collection.insert_one({"email": "a@x"})
+    assert error.value.details["keyPattern"] == {"email": 1}
+
+
+def test_partial_unique_index_only_constrains_matching_documents(collection):
+    collection.create_index([("ward", ASCENDING), ("bed", ASCENDING)], unique=True,
+                            partialFilterExpression={"status": "admitted"})
+    collection.insert_many([{"ward": 1, "bed": 1, "status": "admitted"},
+                            {"ward": 1, "bed": 1, "status": "discharged"}])
+    with pytest.raises(DuplicateKeyError):
+        collection.insert_one({"ward": 1, "bed": 1, "status": "admitted"})
+    collection.update_one({"status": "admitted"}, {"$set": {"status": "discharged"}})
+    collection.insert_one({"ward": 1, "bed": 1, "status": "admitted"})
+
+
+def test_unordered_bulk_write_keeps_going_past_errors(collection):
+    collection.create_index("code", unique=True)
+    with pytest.raises(BulkWriteError) as error:
+        collection.insert_many([{"code": 1}, {"code": 1}, {"code": 2}], ordered=False)
+    assert error.value.details["nInserted"] == 2
+    assert [e["index"] for e in error.value.details["writeErrors"]] == [1]
+
+    result = collection.bulk_write([UpdateOne({"code": 2}, {"$set": {"x": 1}}),
+                                    UpdateOne({"code": 3}, {"$set": {"x": 1}}, upsert=True)])
+    assert (result.matched_count, result.upserted_count) == (1, 1)
+
+
+def test_aggregation_stages(collection):
+    doctor = ObjectId()
+    collection.database.staff.insert_one({"_id": doctor, "name": "Dr. A"})
+    collection.insert_many([{"doctor": doctor, "status": "admitted"}, {"doctor": doctor, "status": "admitted"},
+                            {"status": "discharged"}])
+    grouped = list(collection.aggregate([
+        {"$match": {"status": "admitted"}},
+        {"$group": {"_id": "$doctor", "n": {"$sum": 1}}},
+        {"$lookup": {"from": "staff", "localField": "_id", "foreignField": "_id", "as": "staff"}},
+    ]))
+    assert [(g["n"], g["staff"][0]["name"]) for g in grouped] == [(2, "Dr. A")]
+
+    facets = next(collection.aggregate([{"$facet": {"all": [{"$count": "n"}],
+                                                     "out": [{"$match": {"status": "discharged"}}, {"$count": "n"}]}}]))
+    assert facets == {"all": [{"n": 3}], "out": [{"n": 1}]}
+
+
+def test_command_listeners_see_each_operation():
+    from pymongo import monitoring
+
+    class Recorder(monitoring.CommandListener):
+        def __init__(self):
+            self.commands = []
+
+        def started(self, event):
+            self.commands.append((event.command_name, event.command.get(event.command_name)))
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    recorder = Recorder()
+    database = MemoryClient(event_listeners=[recorder])[f"memory_tests_{next(_databases)}"]
+    database.things.insert_one({"n": 1})
+    list(database.things.find({}))
+    assert recorder.commands == [("insert", "things"), ("find", "things")]
@@ -0,0 +1,30 @@
+"""Per-request Mongo command accounting and /metrics."""
+from collections import Counter
+
+from app.utils.metrics import N_PLUS_ONE_THRESHOLD, request_metrics
+
+
+def test_metrics_report_requests_and_their_mongo_commands(client, db):
+    db.patients.insert_one({"name": "P"})
+    client.get("/api/patients").close()
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'http_requests_total{method="GET",route="/api/patients",status="200"}' in body
+    assert 'mongo_request_queries_total{method="GET",route="/api/patients"}' in body
+    assert "mongo_pool_max_size" in body
+
+
+def test_repeating_one_command_is_flagged_as_n_plus_one():
+    before = request_metrics._route("GET", "/n-plus-one").n_plus_one
+    repeats = N_PLUS_ONE_THRESHOLD + 1
+    request_metrics.observe_request("GET", "/n-plus-one", 200, 0.01, {
+        "queries": repeats, "documents": repeats, "micros": 500, "shapes": Counter({("find", "staff"): repeats})
+    })
+    assert request_metrics._route("GET", "/n-plus-one").n_plus_one == before + 1
+
+
+def test_health_includes_the_route_summary(client):
+    client.get("/test").close()
+    body = client.get("/health").get_json()
+    assert body["ready"] is True
+    assert "GET /test" in body["routes"]
@@ -0,0 +1,33 @@
+"""The per-process MongoClient."""
+import os
+
+from app.utils.memory_store import MemoryClient
+from app.utils.mongo import MEMORY_URI, MongoConnectionManager
+
+
+def test_the_client_is_built_once_per_process():
+    manager = MongoConnectionManager(MEMORY_URI, "mongo_tests")
+    assert isinstance(manager.client, MemoryClient)
+    assert manager.client is manager.client
+    assert manager.stats()["engine"] == "memory"
+
+
+def test_a_forked_worker_gets_its_own_client(monkeypatch):
+    manager = MongoConnectionManager(MEMORY_URI, "mongo_tests")
+    parent = manager.client
+    collection = manager.lazy_database().patients
+    collection.find_one({})
+
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert manager.client is not parent
+    # Lazy handles resolve the child's client on their next call
+    assert manager.collection("patients").database.client is manager.client
+    collection.find_one({})
+    assert manager.stats()["pid"] == -1
+
+
+def test_close_drops_the_client():
+    manager = MongoConnectionManager(MEMORY_URI, "mongo_tests")
+    first = manager.client
+    manager.close()
+    assert manager.client is not first
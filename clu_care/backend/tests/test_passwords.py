@@ -0,0 +1,70 @@
+"""Password hashing off the request threads."""
+import threading
+import time
+
+import pytest
+
+from app.utils.passwords import (HashingBusy, PasswordHasher, hash_password, is_plain_text, needs_rehash,
+                                 verify_password)
+
+
+def test_hash_and_verify_round_trip():
+    stored = hash_password("s3cret", method="pbkdf2:sha256:1000")
+    assert verify_password(stored, "s3cret")
+    assert not verify_password(stored, "wrong")
+    assert not is_plain_text(stored)
+
+
+def test_legacy_plain_text_still_verifies_and_is_rehashed():
+    assert verify_password("s3cret", "s3cret")
+    assert is_plain_text("s3cret")
+    assert needs_rehash("s3cret")
+
+
+def test_the_pool_hashes_and_verifies():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    try:
+        stored = hasher.hash("s3cret")
+        assert hasher.verify(stored, "s3cret")
+        assert all(verify_password(h, p) for h, p in zip(hasher.hash_many(["a", "b", "c"]), "abc"))
+    finally:
+        hasher.shutdown()
+
+
+def test_pool_processes_are_not_forked_from_the_threaded_worker():
+    hasher = PasswordHasher(workers=1)
+    try:
+        assert hasher._pool()._mp_context.get_start_method() in ("forkserver", "spawn")
+        assert verify_password(hasher.hash("s3cret"), "s3cret")
+    finally:
+        hasher.shutdown()
+
+
+def test_a_saturated_pool_answers_busy_instead_of_queueing():
+    hasher = PasswordHasher(workers=1, max_pending=1, timeout=30)
+    try:
+        hasher._slots.acquire()   # a job already holds the only slot
+        with pytest.raises(HashingBusy):
+            hasher.hash("s3cret")
+    finally:
+        hasher._slots.release()
+        hasher.shutdown()
+
+
+def test_bulk_jobs_leave_slots_for_logins():
+    hasher = PasswordHasher(workers=1, max_pending=4, bulk_share=0.5)
+    stored = hash_password("s3cret", method="pbkdf2:sha256:1000")
+
+    def bulk_job():
+        futures = [hasher._submit(time.sleep, 0.2, bulk=True) for _ in range(6)]
+        for future in futures:
+            future.result()
+
+    try:
+        importer = threading.Thread(target=bulk_job)
+        importer.start()
+        time.sleep(0.1)   # the import now holds every slot it may
+        assert hasher.verify(stored, "s3cret")
+        importer.join()
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,61 @@
+"""GET /api/patients: keyset pages, one query for doctor names, no secret fields."""
+from bson import ObjectId
+
+from app.utils.metrics import request_metrics
+
+
+def route_queries(method, rule):
+    stats = request_metrics.routes.get((method, rule))
+    return stats.queries if stats else 0
+
+
+def insert_patients(db, count, **fields):
+    docs = [{"_id": ObjectId(), "name": f"Patient {n}", "password": "secret", "status": "registered", **fields}
+            for n in range(count)]
+    db.patients.insert_many(docs)
+    return docs
+
+
+def test_pages_follow_the_next_cursor_until_the_last_page(client, db):
+    docs = insert_patients(db, 5)
+
+    seen, after, pages = [], None, 0
+    while True:
+        response = client.get("/api/patients", query_string={"limit": 2, **({"after": after} if after else {})})
+        assert response.status_code == 200
+        seen += [p["_id"] for p in response.get_json()]
+        pages += 1
+        after = response.headers.get("X-Next-Cursor")
+        if not after:
+            break
+
+    assert seen == [str(d["_id"]) for d in sorted(docs, key=lambda d: d["_id"])]
+    assert pages == 3
+
+
+def test_a_malformed_cursor_is_rejected(client):
+    response = client.get("/api/patients?after=not-an-id")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_doctor_names_come_from_one_query_not_one_per_patient(client, db, add_doctor):
+    doctors = [add_doctor(f"Dr {n}") for n in range(3)]
+    for n in range(12):
+        db.patients.insert_one({"name": f"P{n}", "assignedDoctor": doctors[n % 3]["_id"], "status": "registered"})
+
+    before = route_queries("GET", "/api/patients")
+    response = client.get("/api/patients")
+    patients = response.get_json()
+    response.close()  # requests are accounted for when the response closes
+
+    assert {p["assignedDoctorName"] for p in patients} == {"Dr 0", "Dr 1", "Dr 2"}
+    # One find for the page, one $in for every doctor on it
+    assert route_queries("GET", "/api/patients") - before == 2
+
+
+def test_passwords_are_never_returned(client, db):
+    insert_patients(db, 2)
+    patients = client.get("/api/patients").get_json()
+    assert patients and all("password" not in p for p in patients)
+    assert "password" not in client.get("/api/patients?fields=name,password").get_json()[0]
@@ -0,0 +1,75 @@
+"""ETag revalidation and the collection-versioned response cache (/api/staff, /api/departments)."""
+import json
+
+from app.utils.response_cache import CollectionVersions, ResponseCache, etag_matches, response_cache
+
+
+def test_a_matching_if_none_match_gets_a_304(client, add_doctor):
+    add_doctor()
+    first = client.get("/api/staff")
+    etag = first.headers["ETag"]
+
+    again = client.get("/api/staff", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_a_write_changes_the_etag(client, add_doctor):
+    add_doctor("Dr One")
+    etag = client.get("/api/staff").headers["ETag"]
+    add_doctor("Dr Two")
+
+    response = client.get("/api/staff", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.get_json()) == 2
+
+
+def test_repeat_requests_are_served_from_the_cache(client, add_doctor):
+    add_doctor()
+    client.get("/api/staff")
+    hits = response_cache.hits
+    client.get("/api/staff")
+    assert response_cache.hits == hits + 1
+
+
+def test_ndjson_is_never_answered_from_the_json_cache(client, add_doctor):
+    add_doctor("Dr One")
+    add_doctor("Dr Two")
+    client.get("/api/staff")  # caches the JSON body
+
+    response = client.get("/api/staff", headers={"Accept": "application/x-ndjson"})
+    assert response.mimetype == "application/x-ndjson"
+    assert len([json.loads(line) for line in response.get_data(as_text=True).splitlines()]) == 2
+
+    # ... and a stream does not poison the cache for JSON clients either
+    assert client.get("/api/staff").mimetype == "application/json"
+
+
+def test_negotiated_responses_vary_on_accept(client, add_doctor):
+    add_doctor()
+    assert "Accept" in client.get("/api/staff").headers["Vary"]
+    assert "Accept" in client.get("/api/staff?stream=1").headers["Vary"]
+    assert "Accept" in client.get("/api/patients").headers["Vary"]
+
+
+def test_fields_are_part_of_the_cache_key(client, add_doctor):
+    add_doctor()
+    full = client.get("/api/staff").get_json()[0]
+    narrow = client.get("/api/staff?fields=name").get_json()[0]
+    assert set(narrow) == {"_id", "name"}
+    assert set(full) > set(narrow)
+
+
+def test_entries_expire_after_the_ttl():
+    cache = ResponseCache(CollectionVersions(), ttl=0)
+    cache.put("key", '"etag"', b"{}", "application/json")
+    assert cache.get("key") is None
+
+
+def test_weak_and_listed_etags_match():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"x"', '"abc"')
@@ -0,0 +1,73 @@
+"""Lazy startup and readiness."""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from app.utils.readiness import Readiness
+from conftest import BACKEND_DIR
+
+# Imports the app against `uri`, waits briefly for readiness and prints what /health said
+HEALTH_PROBE = """
+import json, wsgi
+from app.utils.mongo import mongo
+wsgi.main.readiness.wait(1.5)
+response = wsgi.app.test_client().get("/health")
+print(json.dumps({"status": response.status_code, "memory": mongo.uses_memory_engine,
+                  "attempts": response.get_json()["startup"]["startupAttempts"]}))
+"""
+
+
+def probe_health(**env):
+    env = {**os.environ, "LOG_LEVEL": "CRITICAL", "MONGO_SERVER_SELECTION_TIMEOUT_MS": "100", **env}
+    output = subprocess.run([sys.executable, "-c", HEALTH_PROBE], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=60, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_an_unreachable_mongo_keeps_the_app_not_ready():
+    result = probe_health(MONGODB_URI="mongodb://127.0.0.1:9/")
+    assert result["status"] == 503
+    assert result["memory"] is False
+    assert result["attempts"] >= 1
+
+
+def test_the_memory_fallback_is_opt_in():
+    result = probe_health(MONGODB_URI="mongodb://127.0.0.1:9/", MONGODB_MEMORY_FALLBACK="1")
+    assert result == {"status": 200, "memory": True, "attempts": 1}
+
+
+def test_readiness_retries_startup_until_it_succeeds():
+    failures = iter([RuntimeError("down")])
+
+    def startup():
+        error = next(failures, None)
+        if error:
+            raise error
+
+    readiness = Readiness(startup, lambda: {"status": "healthy"}, interval=0.05).start()
+    assert not readiness.ready
+    assert readiness.wait(5)
+    assert readiness.status()["startupAttempts"] == 2
+
+
+def test_an_unhealthy_check_clears_readiness():
+    healthy = threading.Event()
+    healthy.set()
+    readiness = Readiness(lambda: None, lambda: {"status": "healthy" if healthy.is_set() else "unhealthy"},
+                          interval=0.02).start()
+    assert readiness.wait(2)
+    healthy.clear()
+    for _ in range(100):
+        if not readiness.ready:
+            break
+        time.sleep(0.02)
+    assert not readiness.ready
+
+
+def test_health_is_ready_once_the_database_is_seeded(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.get_json()["startup"]["startedUp"] is True
@@ -0,0 +1,32 @@
+"""NDJSON streaming of the list endpoints."""
+import json
+
+from bson import ObjectId
+
+
+def insert_patients(db, count):
+    db.patients.insert_many([{"_id": ObjectId(), "name": f"Patient {n}", "password": "secret"} for n in range(count)])
+
+
+def test_ndjson_stream_returns_every_patient_one_per_line(client, db):
+    insert_patients(db, 7)
+    response = client.get("/api/patients", headers={"Accept": "application/x-ndjson"})
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 7
+    assert all("password" not in line for line in lines)
+
+
+def test_stream_query_parameter_streams_too(client, db):
+    insert_patients(db, 3)
+    response = client.get("/api/patients?stream=1&limit=2")
+    assert response.mimetype == "application/x-ndjson"
+    assert len(response.get_data(as_text=True).splitlines()) == 2
+
+
+def test_json_stays_the_default(client, db):
+    insert_patients(db, 3)
+    response = client.get("/api/patients")
+    assert response.mimetype == "application/json"
+    assert len(response.get_json()) == 3
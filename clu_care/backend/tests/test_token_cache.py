@@ -0,0 +1,57 @@
+"""The verified-token cache used by token_required."""
+import time
+
+from app.utils.token_cache import TokenCache
+from conftest import ADMIN_EMAIL, ADMIN_PASSWORD
+
+
+def test_entries_expire_with_the_token():
+    cache = TokenCache(ttl=60)
+    cache.put("live", {"_id": 1}, time.time() + 30)
+    cache.put("expired", {"_id": 1}, time.time() - 1)
+    assert cache.get("live") == {"_id": 1}
+    assert cache.get("expired") is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_least_recently_used_tokens_are_evicted():
+    cache = TokenCache(maxsize=2)
+    exp = time.time() + 30
+    cache.put("a", {"_id": 1}, exp)
+    cache.put("b", {"_id": 2}, exp)
+    cache.get("a")
+    cache.put("c", {"_id": 3}, exp)
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+
+
+def test_invalidating_a_user_drops_all_their_tokens():
+    cache = TokenCache()
+    exp = time.time() + 30
+    cache.put("laptop", {"_id": 7}, exp)
+    cache.put("phone", {"_id": 7}, exp)
+    cache.put("other", {"_id": 8}, exp)
+    cache.invalidate_user(7)
+    assert cache.get("laptop") is None and cache.get("phone") is None
+    assert cache.get("other")
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_a_deleted_users_token_stops_working(wsgi_app, client, db):
+    main = wsgi_app.main
+    token = client.post("/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD,
+                                        "role": "admin"}).get_json()["token"]
+    protected = main.token_required(lambda user: main.jsonify({"email": user["email"]}))
+
+    def call():
+        with main.app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+            response = main.app.make_response(protected())
+            return response.status_code
+
+    assert call() == 200
+    assert call() == 200  # served from the token cache
+
+    admin = db.users.find_one({"email": ADMIN_EMAIL})
+    assert client.delete(f"/admin/user/user/{admin['_id']}").status_code == 200
+    assert call() == 401
+    assert db.identities.find_one({"email": ADMIN_EMAIL}) is None
@@ -0,0 +1,97 @@
+"""Emergency triage: severity-ranked order, atomic next case across workers, allocated caseIds."""
+import datetime
+
+from bson import ObjectId
+
+import admin_bp
+from app.utils.triage import SEVERITY, TriageQueue, ensure_case_ranks, severity_rank
+
+
+def open_case(client, name, priority):
+    response = client.post("/api/emergency", json={"patientName": name, "priority": priority})
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_cases_come_out_by_severity_then_arrival(client):
+    open_case(client, "low", "low")
+    open_case(client, "critical first", "critical")
+    open_case(client, "high", "high")
+    open_case(client, "critical second", "critical")
+
+    taken = [client.post("/api/emergency/next").get_json()["patientName"] for _ in range(4)]
+    assert taken == ["critical first", "critical second", "high", "low"]
+    assert client.post("/api/emergency/next").status_code == 404
+
+
+def test_next_sees_a_case_opened_on_another_worker(client, db):
+    open_case(client, "medium", "medium")
+    # Written by another worker: this process's queue has not seen it
+    db.emergency_cases.insert_one({
+        "_id": ObjectId(), "caseId": "E-9999999", "patientName": "elsewhere", "priority": "critical",
+        "severityRank": severity_rank("critical"), "status": "open", "createdAt": datetime.datetime.now()
+    })
+
+    assert client.get("/api/emergency/next").get_json()["patientName"] == "elsewhere"
+    taken = client.post("/api/emergency/next").get_json()
+    assert taken["patientName"] == "elsewhere" and taken["status"] == "in_progress"
+
+
+def test_a_case_taken_by_another_worker_is_not_handed_out_again(client, db):
+    case = open_case(client, "only", "high")
+    admin_bp.triage_queue.ensure_loaded(admin_bp.emergency_collection)
+    # Another worker takes it; this worker's queue still lists it as waiting
+    db.emergency_cases.update_one({"_id": ObjectId(case["_id"])}, {"$set": {"status": "in_progress"}})
+
+    assert client.post("/api/emergency/next").status_code == 404
+
+
+def test_reprioritizing_moves_the_case(client):
+    low = open_case(client, "was low", "low")
+    open_case(client, "high", "high")
+
+    response = client.put(f"/api/emergency/{low['_id']}", json={"priority": "critical"})
+    assert response.get_json()["severityRank"] == SEVERITY["critical"]
+    assert client.post("/api/emergency/next").get_json()["patientName"] == "was low"
+
+
+def test_case_ids_are_allocated_not_derived_from_the_object_id(client):
+    ids = [open_case(client, f"c{n}", "low")["caseId"] for n in range(3)]
+    numbers = [int(i[2:]) for i in ids]
+    assert all(i.startswith("E-") and len(i) == 9 for i in ids)
+    assert numbers == sorted(numbers) and len(set(numbers)) == 3
+
+
+def test_invalid_priority_and_status_are_rejected(client):
+    assert client.post("/api/emergency", json={"patientName": "x", "priority": "urgent"}).status_code == 400
+    case = open_case(client, "x", "low")
+    assert client.put(f"/api/emergency/{case['_id']}", json={"status": "done"}).status_code == 400
+
+
+def test_old_cases_get_a_rank_on_startup(db):
+    db.emergency_cases.insert_one({"patientName": "old", "priority": "high", "status": "open"})
+    assert ensure_case_ranks(db) == 1
+    assert db.emergency_cases.find_one({"patientName": "old"})["severityRank"] == SEVERITY["high"]
+    assert ensure_case_ranks(db) == 0
+
+
+def test_the_queue_lists_waiting_cases_in_triage_order():
+    queue = TriageQueue()
+    now = datetime.datetime.now()
+    for name, priority, minutes in [("a", "low", 0), ("b", "critical", 2), ("c", "critical", 1)]:
+        queue.update({"_id": ObjectId(), "patientName": name, "priority": priority, "status": "open",
+                      "createdAt": now + datetime.timedelta(minutes=minutes)})
+    assert [c["patientName"] for c in queue.cases()] == ["c", "b", "a"]
+
+
+def test_the_listing_skips_superseded_heap_entries():
+    queue = TriageQueue()
+    case = {"_id": ObjectId(), "patientName": "a", "priority": "low", "status": "open"}
+    other = {"_id": ObjectId(), "patientName": "b", "priority": "high", "status": "open"}
+    queue.update(case)
+    queue.update(other)
+    queue.update({**case, "priority": "critical"})
+    queue.update({**other, "status": "in_progress"})
+    assert [(c["patientName"], c["priority"], c["status"]) for c in queue.cases()] == [
+        ("a", "critical", "open"), ("b", "high", "in_progress")]
+    assert queue.waiting == 1 and queue.in_progress == 1
@@ -0,0 +1,13 @@
+"""The production entry point: every route in one app, warmed up per worker."""
+import admin_bp
+
+
+def test_one_app_serves_app_py_and_the_blueprints(wsgi_app, client):
+    rules = {rule.rule for rule in wsgi_app.app.url_map.iter_rules()}
+    assert {"/login", "/health", "/api/patients", "/api/beds", "/admin/users"} <= rules
+    assert client.get("/api/beds").status_code == 200
+
+
+def test_warm_up_builds_every_index(client):
+    assert admin_bp.warm_up() == ["beds", "doctors", "triage", "dashboard"]
+
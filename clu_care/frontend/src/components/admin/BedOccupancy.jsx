@@ -16,7 +16,7 @@ import {
   Info as InfoIcon,
   LocalHospital as HospitalIcon
 } from "@mui/icons-material";
-import axios from "axios";
+import api, { API_ORIGIN } from "../../services/api";
 import "./BedOccupancy.css";
 
 const BedOccupancy = () => {
@@ -24,18 +24,37 @@ const BedOccupancy = () => {
   const [selectedBed, setSelectedBed] = useState(null);
   const [viewMode, setViewMode] = useState("grid"); // 'grid' or 'list'
 
-  // Fetch beds from backend
+  // Live bed board: full snapshot on connect, then one event per changed bed
   useEffect(() => {
     const fetchBeds = async () => {
       try {
-        const res = await axios.get("http://localhost:5000/api/beds");
+        const res = await api.get("/beds");
         setWards(res.data || []);
       } catch (err) {
         console.error("Error fetching beds:", err);
         setWards([]);
       }
     };
-    fetchBeds();
+
+    if (typeof EventSource === "undefined") {
+      fetchBeds();
+      return undefined;
+    }
+
+    const source = new EventSource(`${API_ORIGIN}/api/beds/stream`);
+    source.addEventListener("snapshot", (e) => setWards(JSON.parse(e.data) || []));
+    source.addEventListener("bed", (e) => {
+      const { wardId, ...bed } = JSON.parse(e.data);
+      setWards((current) =>
+        current.map((ward) =>
+          ward._id !== wardId
+            ? ward
+            : { ...ward, beds: ward.beds.map((b) => (b.bedNumber === bed.bedNumber ? bed : b)) }
+        )
+      );
+    });
+    source.onerror = (err) => console.error("Bed stream error (reconnecting):", err);
+    return () => source.close();
   }, []);
 
   const handleOpen = (bed, wardName) => {
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import './PatientTable.css';
-import api from '../../services/api';
+import api, { API_ORIGIN, getAllPages } from '../../services/api';
 
 const PatientTable = ({ showAddForm = true }) => {
   const [patients, setPatients] = useState([]);
@@ -39,11 +39,10 @@ const PatientTable = ({ showAddForm = true }) => {
     }
   };
 
-  // Fetch patients
+  // Fetch patients (every page; the API returns at most 500 per request)
   const fetchPatients = async () => {
     try {
-      const res = await api.get('http://localhost:5000/api/patients');
-      setPatients(res.data);
+      setPatients(await getAllPages('/patients'));
     } catch (err) {
       console.error('Error fetching patients:', err);
     }
@@ -62,7 +61,7 @@ const PatientTable = ({ showAddForm = true }) => {
         return;
       }
       try {
-        const res = await api.get(`http://localhost:5000/staff/available?specialty=${formData.medicalSpecialty}`);
+        const res = await api.get(`${API_ORIGIN}/staff/available`, { params: { specialty: formData.medicalSpecialty } });
 
         setAvailableDoctors(res.data);
       } catch (err) {
@@ -1,8 +1,23 @@
 import axios from 'axios';
 
+// Backend origin; set REACT_APP_API_ORIGIN at build time for other environments
+export const API_ORIGIN = process.env.REACT_APP_API_ORIGIN || 'http://localhost:5000';
+
 const api = axios.create({
-  baseURL: 'http://localhost:5000/api', // ⚠ Make sure this is correct
+  baseURL: `${API_ORIGIN}/api`,
 //   timeout: 5000
 });
 
+// GET every page of a keyset-paginated list, following the X-Next-Cursor header
+export const getAllPages = async (url, { limit = 500, params = {} } = {}) => {
+  const items = [];
+  let after;
+  do {
+    const res = await api.get(url, { params: { ...params, limit, ...(after ? { after } : {}) } });
+    items.push(...res.data);
+    after = res.headers['x-next-cursor'];
+  } while (after);
+  return items;
+};
+
 export default api;